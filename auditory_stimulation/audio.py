@@ -1,51 +1,234 @@
+import hashlib
+import struct
 import wave
 from dataclasses import dataclass
+from enum import Enum
+from functools import cached_property
 from os import PathLike
+from typing import BinaryIO, Optional, Union
 
 import numpy as np
 import numpy.typing as npt
 
+from auditory_stimulation.validation import is_in_range
+
+
+def array_digest(array: npt.NDArray, *extra: object) -> bytes:
+    """Computes a content digest of the given array. The digest covers the raw buffer, as well as the type and shape of
+    the array, so two arrays have the same digest only if they hold the same samples in the same layout.
+
+    :param array: The array to be digested.
+    :param extra: Additional values (e.g. the sampling frequency), which are included in the digest.
+    :return: A 16 byte blake2b digest.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(repr((array.dtype.str, array.shape, extra)).encode())
+    # hashlib reads the buffer of a contiguous array directly, so this does not create a copy for such arrays
+    hasher.update(np.ascontiguousarray(array))
+    return hasher.digest()
+
+
+_PCM16_SCALE = 2 ** 15  # used when 16 bit PCM samples are read
+_PCM16_MAX = 2 ** 15 - 1  # used when 16 bit PCM samples are written
+_DIGEST_BLOCK_FRAMES = 2 ** 16
+
+
+def pcm16_to_float32(array: npt.NDArray[np.int16],
+                     out: Optional[npt.NDArray[np.float32]] = None) -> npt.NDArray[np.float32]:
+    """Converts 16 bit PCM samples to float32 samples in the range -1 and 1. Uses the same scaling as the wav loaders.
+
+    :param array: The int16 samples.
+    :param out: Optional float32 array of the same shape, into which the converted samples are written.
+    :return: A new float32 array, or out if given.
+    """
+    if out is None:
+        out = array.astype(np.float32)
+    else:
+        out[...] = array
+
+    out *= np.float32(1 / _PCM16_SCALE)
+    return out
+
+
+def float32_to_pcm16(array: npt.NDArray[np.float32],
+                     out: Optional[npt.NDArray[np.int16]] = None) -> npt.NDArray[np.int16]:
+    """Converts float32 samples in the range -1 and 1 to 16 bit PCM samples, the same way as they are written to a wav
+    file (scaled by 2^15 - 1 and truncated). This is the only conversion to 16 bit PCM, so compact audio holds exactly
+    the samples, which are written when the (float32) audio is saved.
+
+    :param array: The float32 samples.
+    :param out: Optional int16 array of the same shape, into which the converted samples are written.
+    :return: A new int16 array, or out if given.
+    """
+    scaled = np.multiply(array, np.float32(_PCM16_MAX), dtype=np.float32)
+    # in range samples never leave the int16 range, the clip only guards against unchecked (trusted) samples
+    np.clip(scaled, -_PCM16_SCALE, _PCM16_MAX, out=scaled)
+    if out is None:
+        # the cast truncates towards zero
+        return scaled.astype(np.int16)
+
+    np.copyto(out, scaled, casting="unsafe")
+    return out
+
+
+def as_float32_array(array: npt.NDArray[Union[np.float32, np.int16]]) -> npt.NDArray[np.float32]:
+    """Returns the samples of an audio array as float32. A float32 array is returned as is (not copied), an int16 array
+    is converted.
+
+    :param array: The samples of an audio, either float32 or int16.
+    :return: The float32 samples.
+    """
+    if array.dtype == np.float32:
+        return array
+
+    if array.dtype == np.int16:
+        return pcm16_to_float32(array)
+
+    raise TypeError("The provided audio must be a numpy array of type np.float32 or np.int16!")
+
+
+def copy_as_float32(array: npt.NDArray[Union[np.float32, np.int16]], out: npt.NDArray[np.float32]) -> None:
+    """Copies the samples of an audio array into the given float32 array, converting int16 samples on the way.
+
+    :param array: The samples of an audio, either float32 or int16.
+    :param out: The float32 array of the same shape, into which the samples are written.
+    :return: None
+    """
+    if array.dtype == np.int16:
+        pcm16_to_float32(array, out)
+    else:
+        out[...] = as_float32_array(array)
+
 
 @dataclass(frozen=True)
 class Audio:
     """A store of all audio related information.
 
-    :param array: An array storing the actual audio information. Needs to be between -1 and 1
+    The samples are either stored as float32 in the range -1 and 1, or compactly, as 16 bit PCM (int16). The compact
+    representation takes half the memory and is meant for audio, which is kept around for long, but rarely processed.
+    Use as_float32() to access the samples in float32, regardless of the representation.
+
+    :param array: An array of shape NxC (samples x channels) storing the actual audio information. Needs to be between
+     -1 and 1, if of type float32.
     :param sampling_frequency: The sampling frequency of the used audio. Needs to be a positive integer.
     """
-    array: npt.NDArray[np.float32]
+    array: npt.NDArray[Union[np.float32, np.int16]]
     sampling_frequency: int
 
     def __post_init__(self):
-        if len(self.array.shape) != 2 or self.array.shape[1] != 2:
-            raise ValueError("The supplied audio must be of shape Nx2!")
+        self.__validate_layout()
 
-        if self.array.dtype != np.float32:
-            raise TypeError("The provided audio must be a numpy array of type np.float32!")
+        # int16 samples are always in range
+        if self.array.dtype == np.float32 and not is_in_range(self.array):
+            raise ValueError("The supplied audio must be in the range -1 and 1")
+
+    def __validate_layout(self) -> None:
+        if len(self.array.shape) != 2 or self.array.shape[1] < 1:
+            raise ValueError("The supplied audio must be of shape NxC, with at least one channel!")
+
+        if self.array.dtype != np.float32 and self.array.dtype != np.int16:
+            raise TypeError("The provided audio must be a numpy array of type np.float32 or np.int16!")
 
         if self.sampling_frequency <= 0:
             raise ValueError("The sampling frequency must be a positive integer!")
 
-        if np.any(self.array > 1) or np.any(self.array < -1):
-            raise ValueError("The supplied audio must be in the range -1 and 1")
+    @classmethod
+    def _trusted(cls, array: npt.NDArray[Union[np.float32, np.int16]], sampling_frequency: int) -> "Audio":
+        """Constructs the audio without the range check, bypassing __post_init__. Unlike the TRUSTED validation level,
+        this affects only the constructed audio, not the audio built by other threads at the same time."""
+        audio = object.__new__(cls)
+        object.__setattr__(audio, "array", array)
+        object.__setattr__(audio, "sampling_frequency", sampling_frequency)
+        audio.__validate_layout()
+        return audio
+
+    @property
+    def n_channels(self) -> int:
+        return self.array.shape[1]
+
+    @property
+    def is_compact(self) -> bool:
+        return self.array.dtype == np.int16
+
+    def as_float32(self) -> npt.NDArray[np.float32]:
+        """Returns the samples as float32. If the audio is not compact, this is the stored array itself, otherwise the
+        samples are converted on demand.
+        """
+        return as_float32_array(self.array)
+
+    def compact(self) -> "Audio":
+        """Returns the audio backed by 16 bit PCM samples, the samples written when the audio is saved as a wav file."""
+        if self.is_compact:
+            return self
+        return Audio(float32_to_pcm16(self.array), self.sampling_frequency)
+
+    def expand(self) -> "Audio":
+        """Returns the audio backed by float32 samples."""
+        if not self.is_compact:
+            return self
+        return trusted_audio(pcm16_to_float32(self.array), self.sampling_frequency)
 
     @property
     def secs(self) -> float:
         return self.array.shape[0] / self.sampling_frequency
 
+    @cached_property
+    def digest(self) -> bytes:
+        """A digest of the audio content and the sampling frequency. It is computed only once, as the audio must not be
+        modified after its creation. The digest covers the float32 samples, so compact audio has the same digest as
+        its expanded audio."""
+        if not self.is_compact:
+            return array_digest(self.array, self.sampling_frequency)
+
+        # the same digest as array_digest of the expanded array, converted block by block
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(repr((np.dtype(np.float32).str, self.array.shape, (self.sampling_frequency,))).encode())
+        for start in range(0, self.array.shape[0], _DIGEST_BLOCK_FRAMES):
+            hasher.update(pcm16_to_float32(self.array[start:start + _DIGEST_BLOCK_FRAMES]))
+        return hasher.digest()
+
     def __copy__(self) -> "Audio":
-        return Audio(np.copy(self.array), self.sampling_frequency)
+        return trusted_audio(np.copy(self.array), self.sampling_frequency)
 
     def __eq__(self, other: "Audio") -> bool:
-        return np.all(self.array == other.array) and self.sampling_frequency == other.sampling_frequency
+        if not isinstance(other, Audio):
+            return NotImplemented
+
+        if self is other:
+            return True
+
+        if self.sampling_frequency != other.sampling_frequency or self.array.shape != other.array.shape:
+            return False
+
+        # a matching digest is enough to know the audios are the same, a different digest can still mean equal samples
+        # (e.g. -0.0 and 0.0), hence fall back to comparing the arrays
+        if self.digest == other.digest:
+            return True
+
+        if self.is_compact != other.is_compact:
+            return bool(np.all(self.as_float32() == other.as_float32()))
+
+        return bool(np.all(self.array == other.array))
 
     def __hash__(self):
-        return hash(str(self.array) + str(self.sampling_frequency))
+        return int.from_bytes(self.digest[:8], "little")
 
     def __repr__(self) -> str:
         return f"Audio(audio-shape={self.array.shape}, sampling_frequency={self.sampling_frequency})"
 
 
+def trusted_audio(array: npt.NDArray[Union[np.float32, np.int16]], sampling_frequency: int) -> Audio:
+    """Constructs an Audio from samples, which are known to be in range already, e.g. samples converted from 16 bit PCM,
+    or copied from already checked audio. The range check is skipped, all other checks still run. The process-wide
+    validation level is neither consulted nor changed.
+
+    :param array: The samples of the audio (NxC).
+    :param sampling_frequency: The sampling frequency of the audio.
+    :return: The Audio holding the given array.
+    """
+    return Audio._trusted(array, sampling_frequency)
+
+
 def load_wav_as_audio(wav_path: PathLike) -> Audio:
     """Opens the specified wav file and creates an Audio class. wav must be a PCM-wav file
 
@@ -59,20 +242,217 @@ def load_wav_as_audio(wav_path: PathLike) -> Audio:
         interleaved = np.frombuffer(buffer, dtype=f"int{f.getsampwidth() * 8}")
         audio_data = np.reshape(interleaved, (-1, f.getnchannels()))
 
-    return Audio(audio_data.astype(np.float32) / 2 ** (bit_depth - 1), frequency)
+    # PCM samples divided by 2^(bit_depth - 1) are always in range
+    return trusted_audio(audio_data.astype(np.float32) / 2 ** (bit_depth - 1), frequency)
 
 
-def save_audio_as_wav(audio: Audio, target_file_path: PathLike) -> None:
-    """Saves the given audio as a 16 bit PCM wav file in the specified target location.
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+_PCM_DTYPES = {2: np.dtype("<i2"), 4: np.dtype("<i4")}
+_FLOAT_DTYPE = np.dtype("<f4")
+
+
+@dataclass(frozen=True)
+class _WavLayout:
+    """Describes where and how the samples of a wav file are stored."""
+    format_tag: int
+    n_channels: int
+    sampling_frequency: int
+    sample_width: int  # in bytes
+    data_offset: int  # in bytes, from the start of the file
+    n_frames: int
+
+
+def _read_wav_layout(wav_path: PathLike) -> _WavLayout:
+    """Walks the RIFF chunks of the given wav file and locates the fmt and the data chunk, without reading the samples.
+
+    :param wav_path: Path to the wav file.
+    :return: The layout of the wav file.
+    """
+    with open(wav_path, "rb") as f:
+        riff_id, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff_id != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"The file {wav_path} is not a RIFF/WAVE file!")
+
+        fmt = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                raise ValueError(f"The file {wav_path} does not contain a data chunk!")
+
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+            if chunk_id == b"data":
+                break
+
+            chunk_start = f.tell()
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+
+            # chunks are always aligned to an even number of bytes
+            f.seek(chunk_start + chunk_size + chunk_size % 2)
+
+        data_offset = f.tell()
+        file_size = f.seek(0, 2)
+
+    if fmt is None:
+        raise ValueError(f"The file {wav_path} does not contain a fmt chunk before the data chunk!")
+
+    format_tag, n_channels, sampling_frequency, _, block_align, bits_per_sample = struct.unpack("<HHIIHH", fmt[:16])
+    if format_tag == _WAVE_FORMAT_EXTENSIBLE:
+        # the actual format is stored in the first two bytes of the sub-format GUID
+        format_tag = struct.unpack("<H", fmt[24:26])[0]
+
+    # some writers do not fill in the size of the data chunk correctly, never read past the end of the file
+    data_size = min(chunk_size, file_size - data_offset)
+
+    return _WavLayout(format_tag=format_tag,
+                      n_channels=n_channels,
+                      sampling_frequency=sampling_frequency,
+                      sample_width=bits_per_sample // 8,
+                      data_offset=data_offset,
+                      n_frames=data_size // block_align)
+
+
+def is_pcm16_wav(wav_path: PathLike) -> bool:
+    """Checks whether the given wav file stores 16 bit PCM samples, i.e. whether it can be loaded as compact audio (see
+    load_wav_as_audio_memmap). Only the header of the file is read.
+
+    :param wav_path: Path to the wav file.
+    :return: Whether the samples are 16 bit PCM.
+    """
+    layout = _read_wav_layout(wav_path)
+    return layout.format_tag == _WAVE_FORMAT_PCM and layout.sample_width == 2
+
+
+def load_wav_as_audio_memmap(wav_path: PathLike, block_frames: int = 2 ** 16, compact: bool = False) -> Audio:
+    """Alternative to load_wav_as_audio, which memory-maps the samples of the wav file instead of reading them into
+    a buffer. The samples are converted to float32 block by block, directly into the resulting array, so the only full
+    sized allocation is the returned audio. wav must be a 16 or 32 bit PCM-wav file, or a 32 bit float wav file.
+
+    :param wav_path: Path to the to be opened wav file
+    :param block_frames: How many frames are converted at once.
+    :param compact: If set, the 16 bit samples are not converted at all and a compact Audio is returned. Only possible
+     for 16 bit PCM-wav files.
+    :return: An Audio object created from the wav file. Equal to the output of load_wav_as_audio.
+    """
+    if block_frames <= 0:
+        raise ValueError("block_frames must be a positive integer!")
+
+    layout = _read_wav_layout(wav_path)
+
+    if layout.format_tag == _WAVE_FORMAT_PCM and layout.sample_width in _PCM_DTYPES:
+        sample_dtype = _PCM_DTYPES[layout.sample_width]
+        scale = np.float32(1 / 2 ** (layout.sample_width * 8 - 1))
+    elif layout.format_tag == _WAVE_FORMAT_IEEE_FLOAT and layout.sample_width == _FLOAT_DTYPE.itemsize:
+        sample_dtype = _FLOAT_DTYPE
+        scale = None
+    else:
+        raise ValueError("Only 16 and 32 bit PCM-wav files and 32 bit float wav files can be memory-mapped!")
+
+    if compact and sample_dtype != _PCM_DTYPES[2]:
+        raise ValueError("Only 16 bit PCM-wav files can be loaded as compact audio!")
+
+    audio_data = np.empty((layout.n_frames, layout.n_channels), dtype=np.int16 if compact else np.float32)
+    if layout.n_frames == 0:
+        return Audio(audio_data, layout.sampling_frequency)
+
+    samples = np.memmap(wav_path,
+                        dtype=sample_dtype,
+                        mode="r",
+                        offset=layout.data_offset,
+                        shape=(layout.n_frames, layout.n_channels))
+
+    for start in range(0, layout.n_frames, block_frames):
+        block = slice(start, start + block_frames)
+        # same operations as in load_wav_as_audio (cast, then scale), to end up with exactly the same samples
+        audio_data[block] = samples[block]
+        if scale is not None and not compact:
+            audio_data[block] *= scale
+
+    del samples
+    if scale is None:
+        # float samples may be out of range
+        return Audio(audio_data, layout.sampling_frequency)
+
+    return trusted_audio(audio_data, layout.sampling_frequency)
+
+
+class EWavSampleFormat(Enum):
+    PCM16 = "pcm16"
+    FLOAT32 = "float32"
+
+
+def _write_wav_header(f: BinaryIO,
+                      sample_format: EWavSampleFormat,
+                      n_channels: int,
+                      sampling_frequency: int,
+                      n_frames: int) -> None:
+    """Writes the RIFF, fmt (and for float samples the fact) chunk headers, as well as the header of the data chunk.
+    The samples are expected to be written right after.
+    """
+    if sample_format == EWavSampleFormat.PCM16:
+        sample_width = 2
+        format_tag = _WAVE_FORMAT_PCM
+    else:
+        sample_width = 4
+        format_tag = _WAVE_FORMAT_IEEE_FLOAT
+
+    block_align = n_channels * sample_width
+    data_size = n_frames * block_align
+
+    fmt = struct.pack("<HHIIHH", format_tag, n_channels, sampling_frequency, sampling_frequency * block_align,
+                      block_align, sample_width * 8)
+    extra_chunks = b""
+    if format_tag != _WAVE_FORMAT_PCM:
+        # non-PCM formats carry the size of the extension (none) in the fmt chunk and need a fact chunk
+        fmt += struct.pack("<H", 0)
+        extra_chunks = b"fact" + struct.pack("<II", 4, n_frames)
+
+    riff_size = 4 + (8 + len(fmt)) + len(extra_chunks) + (8 + data_size)
+
+    f.write(b"RIFF" + struct.pack("<I", riff_size) + b"WAVE")
+    f.write(b"fmt " + struct.pack("<I", len(fmt)) + fmt)
+    f.write(extra_chunks)
+    f.write(b"data" + struct.pack("<I", data_size))
+
+
+def save_audio_as_wav(audio: Audio,
+                      target_file_path: PathLike,
+                      sample_format: EWavSampleFormat = EWavSampleFormat.PCM16,
+                      block_frames: int = 2 ** 16) -> None:
+    """Saves the given audio as a wav file in the specified target location. The audio is converted and written in
+    blocks, so the memory needed does not depend on the length of the audio. Compact audio saved as 16 bit PCM is
+    written as is, which gives the same file as saving the audio before it was compacted (see float32_to_pcm16).
 
     :param audio: The to be saved audio.
     :param target_file_path: The target file, where the audio will be saved.
+    :param sample_format: Whether the samples are saved as 16 bit PCM or as (unconverted) 32 bit float.
+    :param block_frames: How many frames are converted and written at once.
     :return: None
     """
-    audio_bytes = (audio.array * (2 ** 15 - 1)).astype("<h")
+    if block_frames <= 0:
+        raise ValueError("block_frames must be a positive integer!")
+
+    n_frames, n_channels = audio.array.shape
+    pcm_block = np.empty((min(block_frames, n_frames), n_channels), dtype="<i2")
+
+    with open(target_file_path, "wb") as f:
+        _write_wav_header(f, sample_format, n_channels, audio.sampling_frequency, n_frames)
+
+        for start in range(0, n_frames, block_frames):
+            block = audio.array[start:start + block_frames]
+            n = block.shape[0]
+
+            if sample_format == EWavSampleFormat.FLOAT32:
+                if audio.is_compact:
+                    block = pcm16_to_float32(block)
+                f.write(np.ascontiguousarray(block, dtype="<f4"))
+
+            elif audio.is_compact:
+                f.write(np.ascontiguousarray(block, dtype="<i2"))
 
-    with wave.open(str(target_file_path), "w") as f:
-        f.setnchannels(2)
-        f.setsampwidth(2)
-        f.setframerate(audio.sampling_frequency)
-        f.writeframes(audio_bytes.tobytes())
+            else:
+                float32_to_pcm16(block, out=pcm_block[:n])
+                f.write(pcm_block[:n])
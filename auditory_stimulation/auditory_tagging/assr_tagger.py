@@ -1,13 +1,32 @@
 from numbers import Number, Complex, Real
-from typing import Tuple
+import importlib
+from typing import Tuple, Hashable, Dict, Any, Callable, Optional
 
 import numpy as np
 import numpy.typing as npt
 from scipy.signal import hilbert
 
-from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger, _duplicate_signal, \
-    _scale_down_signal
+from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger, AEnvelopeTagger, _broadcast_signal, \
+    _scale_down_signal, _scale_down_signals, _samples_first
+from auditory_stimulation.auditory_tagging.spectral import analytic_signal, get_spectral_configuration
 from auditory_stimulation.auditory_tagging.tag_generators import TagGenerator, sine_signal
+from auditory_stimulation.validation import is_in_range
+
+
+def _function_path(function: Callable) -> str:
+    """Returns the path (module:name) of a module level function, by which it is resolved again."""
+    path = f"{function.__module__}:{function.__qualname__}"
+    if _resolve_function(path) is not function:
+        raise ValueError(f"The function {function} cannot be resolved by its name, only module level functions can!")
+    return path
+
+
+def _resolve_function(path: str) -> Callable:
+    module_name, _, name = path.partition(":")
+    try:
+        return getattr(importlib.import_module(module_name), name)
+    except (ImportError, AttributeError):
+        raise ValueError(f"The function {path} cannot be resolved!")
 
 
 def _shape_signal(signal: npt.NDArray[np.float32], signal_interval: Tuple[float, float]) -> npt.NDArray[np.float32]:
@@ -16,7 +35,7 @@ def _shape_signal(signal: npt.NDArray[np.float32], signal_interval: Tuple[float,
         return signal
 
     # the following is just an assert statement as checking it could potentially take a very long time
-    assert all(-1 <= signal) and all(signal <= 1)
+    assert is_in_range(signal)
 
     shaped_signal = abs(signal_interval[1] - signal_interval[0]) / 2 * (signal + 1) + signal_interval[0]
     assert shaped_signal.shape[0] == signal.shape[0]
@@ -30,13 +49,13 @@ def amplitude_modulation(signal: npt.NDArray[np.float32],
     """Applies amplitude modulation to signal and modulation code and returns the resulting signal. The modulation code
     has to be of the same length as the signal.
 
-    :param signal: The base signal. Needs to be of the shape Nx2
-    :param modulation_code: The modulation code. Needs to be of the shape N
+    :param signal: The base signal. Needs to be of the shape NxC
+    :param modulation_code: The modulation code. Needs to be of the shape N. The same code modulates all channels.
     :return: the resulting, modulated signal
     """
 
-    if len(signal.shape) != 2 or signal.shape[1] != 2:
-        raise ValueError("Signal must have dimensions Nx2!")
+    if len(signal.shape) != 2:
+        raise ValueError("Signal must have dimensions NxC!")
 
     if len(modulation_code.shape) != 1:
         raise ValueError("Modulation code must have dimensions Nx1!")
@@ -44,9 +63,7 @@ def amplitude_modulation(signal: npt.NDArray[np.float32],
     if signal.shape[0] != modulation_code.shape[0]:
         raise ValueError("Signal and modulation_code must match in their first dimension!")
 
-    duplicate_code = _duplicate_signal(modulation_code)
-
-    output = signal * duplicate_code
+    output = signal * _broadcast_signal(modulation_code)
     assert output.shape == signal.shape
 
     output_scaled = _scale_down_signal(output)
@@ -61,16 +78,16 @@ def frequency_modulation(signal: npt.NDArray[np.float32],
     the signal. (Cannot be done other way around, or with an arbitrary carrier signal, as FM requires an underlying
     periodic signal)
 
-    :param signal: The encoded signal.
+    :param signal: The encoded signal. Needs to be of the shape NxC.
     :param f_sampling: The sampling frequency of the signal.
     :param f_carrier: Frequency of the carrier signal.
     :param modulation_factor: Optional parameter, determining how strongly the signal is modulated in the carrier.
     :return: The FM modulated signal.
     """
-    if len(signal.shape) != 2 or signal.shape[1] != 2:
-        raise ValueError("Signal must have dimensions Nx2!")
+    if len(signal.shape) != 2:
+        raise ValueError("Signal must have dimensions NxC!")
 
-    samples = _duplicate_signal(f_carrier / f_sampling * np.arange(signal.shape[0]))
+    samples = _broadcast_signal(f_carrier / f_sampling * np.arange(signal.shape[0]))
 
     combined_signal = np.sin(2 * np.pi * (samples + signal * modulation_factor), dtype=np.float32)
     assert combined_signal.shape == signal.shape
@@ -78,8 +95,8 @@ def frequency_modulation(signal: npt.NDArray[np.float32],
     return combined_signal
 
 
-class AMTagger(AAudioTagger):
-    """Creates an AM modulated ASSR stimulus.
+class AMTagger(AEnvelopeTagger):
+    """Creates an AM modulated ASSR stimulus. The tag is applied as the envelope of the modified intervals.
     """
     __frequency: int
     __tag_generator: TagGenerator
@@ -113,17 +130,21 @@ class AMTagger(AAudioTagger):
         self.__tag_generator = tag_generator
         self.__signal_interval = signal_interval
 
-    def _modify_chunk(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
+    def _envelope(self, length: int, fs: int) -> npt.NDArray[np.float32]:
         # generate tag of the appropriate frequency
-        signal_length = audio_array_chunk.shape[0]
-        added_signal_raw = self.__tag_generator(signal_length, self.__frequency, fs)
+        added_signal_raw = self.__tag_generator(length, self.__frequency, fs)
 
         # change the interval of the tag to the set range
-        added_signal = _shape_signal(added_signal_raw, self.__signal_interval)
+        return _shape_signal(added_signal_raw, self.__signal_interval)
 
-        modulated_chunk = amplitude_modulation(audio_array_chunk, added_signal)
+    def _spec_params(self) -> Dict[str, Hashable]:
+        return {"frequency": self.__frequency,
+                "tag_generator": _function_path(self.__tag_generator),
+                "signal_interval": tuple(self.__signal_interval)}
 
-        return modulated_chunk
+    @classmethod
+    def _from_spec_params(cls, params: Dict[str, Any]) -> "AMTagger":
+        return cls(**{**params, "tag_generator": _resolve_function(params["tag_generator"])})
 
     def __repr__(self) -> str:
         return self._get_repr("AMTagger", frequency=str(self.__frequency), tag_generator=self.__tag_generator.__name__,
@@ -133,23 +154,38 @@ class AMTagger(AAudioTagger):
 class FMTagger(AAudioTagger):
     """Uses the audio signal as the carrier and modulates it by specified frequency. The frequency of the audio signal
      is computed via the hilbert transform (instantaneous frequency). In essence, this only shifts the entire audio
-     spectrum up by the specified frequency (imagine a simple sine wave to see why)."""
+     spectrum up by the specified frequency (imagine a simple sine wave to see why).
+
+     Adding the modulating sine to the instantaneous frequency adds its cumulative sum to the instantaneous phase. The
+     tagger hence rotates the analytic signal by this cumulative phase, instead of reconstructing it from amplitudes and
+     phases (as done in legacy mode). The analytic signal is computed by the spectral backend (see spectral.py)."""
     __frequency: int
     __modulation_factor: float
+    __legacy_mode: bool
+    __single_precision: bool
 
     def __init__(self,
                  frequency: int,
-                 modulation_factor: float) -> None:
+                 modulation_factor: float,
+                 legacy_mode: bool = False,
+                 single_precision: bool = False) -> None:
         """Constructs the FMTagger object
 
         :param frequency: The modulating frequency.
         :param modulation_factor: The factor by which the added modulating signal is scaled.
+        :param legacy_mode: whether to run the legacy implementation, which extracts and reconstructs the amplitudes and
+         phases sample by sample. Both implementations produce the same output (up to floating point precision); the
+         purpose of this is to keep old results exactly reproducible.
+        :param single_precision: whether the analytic signal is computed in single precision (complex64), which is
+         faster and needs half the memory. Not used in legacy mode.
         """
 
         if frequency <= 0:
             raise ValueError("The frequency has to be a positive number")
         self.__frequency = frequency
         self.__modulation_factor = modulation_factor
+        self.__legacy_mode = legacy_mode
+        self.__single_precision = single_precision
 
     @staticmethod
     def __extract_amplitudes_phases(numbers: npt.NDArray[Complex]) -> Tuple[npt.NDArray[Real], npt.NDArray[Real]]:
@@ -179,7 +215,7 @@ class FMTagger(AAudioTagger):
     def __phases_to_instantaneous_frequencies(self, phases: npt.NDArray[Real], fs: int) -> npt.NDArray[Real]:
         inst_freq = np.diff(phases, axis=0) / (2 * np.pi) * fs
         assert inst_freq.shape[0] == phases.shape[0] - 1, f"Was {inst_freq.shape} vs {phases.shape} - 1"
-        assert inst_freq.shape[1] == phases.shape[1] == 2
+        assert inst_freq.shape[1] == phases.shape[1]
 
         return inst_freq
 
@@ -187,32 +223,30 @@ class FMTagger(AAudioTagger):
                                               instantaneous_frequencies: npt.NDArray[Real],
                                               first_phase: npt.NDArray[Real],
                                               fs: int) -> npt.NDArray[Real]:
-        first_phase_reshaped = np.reshape(first_phase, (1, 2))
+        first_phase_reshaped = np.reshape(first_phase, (1, -1))
         assert first_phase_reshaped.shape[0] == 1
-        assert first_phase_reshaped.shape[1] == 2
+        assert first_phase_reshaped.shape[1] == instantaneous_frequencies.shape[1]
 
         corrected_inst_freq = instantaneous_frequencies * (2 * np.pi) / fs
         phases = np.append(first_phase_reshaped, corrected_inst_freq, axis=0).cumsum(axis=0)
 
         assert phases.shape[0] == instantaneous_frequencies.shape[0] + 1
-        assert phases.shape[1] == instantaneous_frequencies.shape[1] == 2
+        assert phases.shape[1] == instantaneous_frequencies.shape[1]
 
         return phases
 
-    def _modify_chunk(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
-        assert audio_array_chunk.shape[1] == 2
-
+    def __modify_chunk_legacy(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
         analytic = hilbert(audio_array_chunk, axis=0)
         amplitude, phase = self.__extract_amplitudes_phases(analytic)
 
         inst_freq = self.__phases_to_instantaneous_frequencies(phase, fs)
 
-        # generate a sine wave of the appropriate frequency and of the appropriate shape
-        modulating_sine = sine_signal(inst_freq.shape[0], self.__frequency, fs)
-        modulating_sine_doubled = _duplicate_signal(modulating_sine)
+        # generate a sine wave of the appropriate frequency and of the appropriate shape. It is computed as originally,
+        # not taken from the oscillator bank (see sine_signal), whose round-off differs in a few samples
+        modulating_sine = np.sin(self.__frequency / fs * 2 * np.pi * np.arange(inst_freq.shape[0]))
 
-        # modulate the signal frequency with the generated sine wave
-        shifted_inst_freq = inst_freq + self.__modulation_factor * modulating_sine_doubled
+        # modulate the signal frequency (of every channel) with the generated sine wave
+        shifted_inst_freq = inst_freq + self.__modulation_factor * _broadcast_signal(modulating_sine)
 
         phase_shifted = self.__instantaneous_frequencies_to_phases(shifted_inst_freq, phase[0, :], fs)
 
@@ -221,6 +255,87 @@ class FMTagger(AAudioTagger):
 
         return _scale_down_signal(np.real(reconstructed_shifted))
 
+    def __modulation_phases(self, length: int, fs: int) -> npt.NDArray[np.float64]:
+        """The phases added by the modulation: the cumulative sum of the (scaled) modulating sine, starting at 0. Always
+        computed in double precision, as the error of the cumulative sum grows with the length of the chunk."""
+        phases = np.zeros(length, dtype=np.float64)
+        if length > 1:
+            modulating_sine = sine_signal(length - 1, self.__frequency, fs, np.float64)
+            np.cumsum(modulating_sine, out=phases[1:])
+            phases *= 2 * np.pi * self.__modulation_factor / fs
+
+        return phases
+
+    def __complex_dtype(self) -> type:
+        return np.complex64 if self.__single_precision else np.complex128
+
+    def __rotation(self, length: int, n_dims: int, fs: int) -> npt.NDArray[Complex]:
+        """The rotation of the analytic signal by the phases of the modulation, broadcast along the remaining axes."""
+        phases = self.__modulation_phases(length, fs)
+        rotation = np.empty(phases.shape[0], dtype=self.__complex_dtype())
+        np.cos(phases, out=rotation.real, casting="same_kind")
+        np.sin(phases, out=rotation.imag, casting="same_kind")
+
+        return np.reshape(rotation, rotation.shape + (1,) * (n_dims - 1))
+
+    def __rotate(self, audio_array: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.floating]:
+        """Applies the modulation to the audio array, whose samples are along axis 0. Any further axes (channels, or
+        chunks of a batch) are modulated in the same way. The result is not scaled down."""
+        analytic = analytic_signal(audio_array, self.__complex_dtype())
+
+        analytic *= self.__rotation(audio_array.shape[0], audio_array.ndim, fs)
+        assert analytic.shape == audio_array.shape
+
+        return analytic.real
+
+    def _modify_chunk(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
+        if self.__legacy_mode:
+            return self.__modify_chunk_legacy(audio_array_chunk, fs)
+
+        return _scale_down_signal(self.__rotate(audio_array_chunk, fs))
+
+    def _modify_chunk_into(self,
+                           audio_array_chunk: npt.NDArray[np.float32],
+                           fs: int,
+                           out: npt.NDArray[np.float32]) -> None:
+        if self.__legacy_mode:
+            super()._modify_chunk_into(audio_array_chunk, fs, out)
+            return
+
+        # the rotated signal is computed from a transform of the chunk, so out may be the chunk itself
+        _scale_down_signal(self.__rotate(audio_array_chunk, fs), out=out)
+
+    def _modify_chunks(self, audio_array_chunks: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
+        if self.__legacy_mode:
+            return super()._modify_chunks(audio_array_chunks, fs)
+
+        # one (batched) transform for all chunks
+        return _scale_down_signals(_samples_first(self.__rotate(_samples_first(audio_array_chunks), fs)))
+
+    def _transform_key(self, length: int, fs: int) -> Optional[Hashable]:
+        if self.__legacy_mode:
+            return None
+        return "analytic_signal", np.dtype(self.__complex_dtype()).str
+
+    def _transform(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[Complex]:
+        return analytic_signal(audio_array_chunk, self.__complex_dtype())
+
+    def _modify_transformed(self,
+                            audio_array_chunk: npt.NDArray[np.float32],
+                            transform: npt.NDArray[Complex],
+                            fs: int) -> npt.NDArray[np.float32]:
+        rotated = transform * self.__rotation(audio_array_chunk.shape[0], audio_array_chunk.ndim, fs)
+        return _scale_down_signal(rotated.real)
+
+    def _spec_params(self) -> Dict[str, Hashable]:
+        return {"frequency": self.__frequency,
+                "modulation_factor": self.__modulation_factor,
+                "legacy_mode": self.__legacy_mode,
+                "single_precision": self.__single_precision}
+
+    def _cache_key(self) -> Hashable:
+        return self.spec, get_spectral_configuration().pad_to_fast_length
+
     def __repr__(self) -> str:
         return self._get_repr("FMTagger", frequency=str(self.__frequency),
                               modulation_factor=str(self.__modulation_factor))
@@ -256,6 +371,12 @@ class FlippedFMTagger(AAudioTagger):
         modulated_chunk = frequency_modulation(audio_array_chunk, fs, self.__frequency) * self.__scaling_factor
         return modulated_chunk
 
+    def _spec_params(self) -> Dict[str, Hashable]:
+        return {"frequency": self.__frequency, "scaling_factor": self.__scaling_factor}
+
+    def _cache_key(self) -> Hashable:
+        return self.spec
+
     def __repr__(self) -> str:
         return self._get_repr("FlippedFMTagger", frequency=str(self.__frequency),
                               scaling_factor=str(self.__scaling_factor))
@@ -1,58 +1,133 @@
+import importlib
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from numbers import Number
-from typing import List, Tuple, Collection
+from typing import List, Tuple, Collection, Sequence, Dict, Optional, Hashable, Any, Type
 
 import numpy as np
 import numpy.typing as npt
 
-from auditory_stimulation.audio import Audio
+from auditory_stimulation.audio import Audio, as_float32_array, pcm16_to_float32, array_digest, trusted_audio
+from auditory_stimulation.auditory_tagging.tagging_cache import get_tagging_cache, CacheKey
 
 
 def to_sample(time: float, sampling_frequency: int) -> int:
-    """Function, which converts the given time to a sample
+    """Function, which converts the given time to the nearest sample. Rounding (instead of truncating) ensures that
+    time stamps computed from samples (sample / sampling_frequency) are converted back to exactly the same sample.
 
     :param time: The to be converted time.
     :param sampling_frequency: The sampling frequency based on which the sample is computed.
     :return: The converted sample.
     """
-    return int(time * sampling_frequency)
+    return int(round(time * sampling_frequency))
 
 
-def _duplicate_signal(signal: npt.NDArray[Number]) -> npt.NDArray[Number]:
-    """Given a one dimensional signal (N/Nx1) returns the signal duplicated to two dimensions (Nx2).
+def _broadcast_signal(signal: npt.NDArray[Number]) -> npt.NDArray[Number]:
+    """Given a one dimensional signal (N) returns a view of the signal of the shape Nx1. In arithmetic operations with
+    an NxC audio array, the view broadcasts the signal to all channels, without copying it.
 
-    :param signal: The to be duplicated signal.
-    :return: The duplicated signal.
+    :param signal: The to be broadcast signal.
+    :return: The Nx1 view of the signal.
     """
-    if len(signal.shape) > 1 or (len(signal.shape) == 2 and signal.shape[1] == 1):
+    if len(signal.shape) != 1:
         raise ValueError("The passed signal needs to be one dimensional!")
 
-    output = np.array([np.copy(signal), np.copy(signal)]).T
-    assert output.shape[1] == 2
-    assert output.shape[0] == signal.shape[0]
+    return signal[:, np.newaxis]
 
-    return output
 
-
-def _scale_down_signal(signal: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+def _scale_down_signal(signal: npt.NDArray[np.float32],
+                       out: Optional[npt.NDArray[np.float32]] = None) -> npt.NDArray[np.float32]:
     """Given a signal in an arbitrary range, if any element is > 1 or < -1, scales the signal so that the highest
     element is equal 1/-1.
 
     :param signal: An arbitrary signal.
-    :return: The scaled down signal
+    :param out: Optional array of the same shape, into which the (scaled down) signal is written. May be the signal
+     itself.
+    :return: The scaled down signal, or out if given.
     """
-    max_value = np.max(np.abs(signal))
+    # the extremes of the signal give its highest absolute value, without creating a temporary absolute copy
+    max_value = max(np.max(signal), -np.min(signal))
     if max_value <= 1:
-        return signal
+        if out is None:
+            return signal
+
+        if out is not signal:
+            np.copyto(out, signal, casting="same_kind")
+        return out
+
+    if out is None:
+        return signal / max_value
+
+    return np.divide(signal, max_value, out=out, casting="same_kind")
+
+
+def _scale_down_signals(signals: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+    """The batched version of _scale_down_signal: scales down every signal of the batch (KxNxC) on its own.
+
+    :param signals: A batch of arbitrary signals, stacked along the first axis.
+    :return: The scaled down signals.
+    """
+    max_values = np.max(np.abs(signals), axis=tuple(range(1, signals.ndim)), keepdims=True)
+    if np.all(max_values <= 1):
+        return signals
+
+    # signals, which are already in range, are divided by 1 and hence stay the same
+    return signals / np.maximum(max_values, 1)
+
+
+def _samples_first(chunks: npt.NDArray) -> npt.NDArray:
+    """Given a batch of chunks (KxNxC), returns a view of the shape NxKxC, so functions operating along axis 0 operate
+    on the samples of all chunks at once. Applying it again restores the original shape."""
+    return np.swapaxes(chunks, 0, 1)
+
+
+def _to_sample_ranges(stimuli_intervals: Collection[Tuple[float, float]], fs: int) -> List[Tuple[int, int]]:
+    return [(to_sample(interval[0], fs), to_sample(interval[1], fs)) for interval in stimuli_intervals]
+
+
+def _are_overlapping(sample_ranges: Collection[Tuple[int, int]]) -> bool:
+    sorted_ranges = sorted(sample_ranges)
+    return any(current[0] < previous[1] for previous, current in zip(sorted_ranges, sorted_ranges[1:]))
+
+
+@dataclass(frozen=True)
+class TaggerSpec:
+    """The canonical specification of a tagger: the path (module:qualified name) of its class and the arguments it is
+    constructed with (in the order of the constructor). Specs are hashable and hold plain values only, so they can be
+    compared, used as keys and sent to other processes cheaply. See AAudioTagger.spec and AAudioTagger.from_spec.
+    """
+    class_path: str
+    params: Tuple[Tuple[str, Hashable], ...]
+
+    def __post_init__(self) -> None:
+        try:
+            hash(self.params)
+        except TypeError:
+            raise TypeError("All parameters of a tagger spec must be hashable!")
+
+    @property
+    def kwargs(self) -> Dict[str, Any]:
+        return dict(self.params)
+
+
+_SCRATCH_ARENA_BYTES = 2 ** 22  # e.g. a mono chunk of about 20 seconds at 44100 Hz
+
+_TAGGER_CLASSES: Dict[str, Type["AAudioTagger"]] = {}  # class path -> class, for AAudioTagger.from_spec
+
 
-    return_signal = signal / max_value
-    assert np.max(np.abs(return_signal))
-    return return_signal
+def _class_path(cls: type) -> str:
+    """Returns the path (module:qualified name) of a class, which tells classes of the same name apart."""
+    return f"{cls.__module__}:{cls.__qualname__}"
 
 
 class AAudioTagger(ABC):
     _audio: Audio
     _stimuli_intervals: List[Tuple[float, float]]  # in seconds
+    _scratch_arena: Optional[npt.NDArray[np.uint8]] = None  # reused by _scratch, at most _SCRATCH_ARENA_BYTES large
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        _TAGGER_CLASSES[_class_path(cls)] = cls
 
     @abstractmethod
     def _modify_chunk(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
@@ -64,14 +139,190 @@ class AAudioTagger(ABC):
         """
         ...
 
-    def create(self, audio: Audio, stimuli_intervals: Collection[Tuple[float, float]]) -> Audio:
-        """Constructs the modified audio.
+    def _modify_chunks(self, audio_array_chunks: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
+        """Modifies a batch of equally long chunks of audio (KxNxC). Must have the same result as applying _modify_chunk
+        to every chunk. By default, this is exactly what happens; taggers override it to process the entire batch with
+        one vectorized call.
 
-        :param audio: Object containing the audio signal as a numpy array and the sampling frequency of the audio
-        :param stimuli_intervals: The intervals given in seconds, which will be modified with the stimulus. The
-         intervals must be contained within the audio.
+        :param audio_array_chunks: The to be modified chunks, stacked along the first axis.
+        :param fs: The sampling frequency of the audio.
+        :return: The resulting, modified chunks.
+        """
+        return np.stack([self._modify_chunk(chunk, fs) for chunk in audio_array_chunks])
+
+    def _modify_chunk_into(self,
+                           audio_array_chunk: npt.NDArray[np.float32],
+                           fs: int,
+                           out: npt.NDArray[np.float32]) -> None:
+        """Modifies the given chunk of audio like _modify_chunk, but writes the result into out (used by create in
+        in-place mode). By default, the result of _modify_chunk is copied into out; taggers override it to compute the
+        result in out directly.
+
+        :param audio_array_chunk: The to be modified chunk of audio.
+        :param fs: The sampling frequency of the audio.
+        :param out: A float32 array of the same shape as the chunk, into which the result is written. May be the chunk
+         itself.
+        :return: None
+        """
+        out[...] = self._modify_chunk(audio_array_chunk, fs)
+
+    def _transform_key(self, length: int, fs: int) -> Optional[Hashable]:
+        """Returns a key of the transform (e.g. the spectrum) of a chunk, from which the tagger computes the modified
+        chunk (see _transform and _modify_transformed). Taggers with equal keys compute the same transform of a chunk,
+        so it can be shared among them (see sweep.py). By default, a tagger has no such transform.
+
+        :param length: The length of the chunk in samples.
+        :param fs: The sampling frequency of the audio.
+        :return: The hashable key of the transform, or None if the tagger modifies chunks without a shared transform.
+        """
+        return None
+
+    def _transform(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray:
+        """Computes the transform of the chunk, identified by _transform_key.
+
+        :param audio_array_chunk: The to be modified chunk of audio.
+        :param fs: The sampling frequency of the audio.
+        :return: The transform of the chunk.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not provide a transform!")
+
+    def _modify_transformed(self,
+                            audio_array_chunk: npt.NDArray[np.float32],
+                            transform: npt.NDArray,
+                            fs: int) -> npt.NDArray[np.float32]:
+        """Modifies the given chunk of audio like _modify_chunk, but from its already computed transform. As the
+        transform is shared, it must not be modified.
+
+        :param audio_array_chunk: The to be modified chunk of audio.
+        :param transform: The transform of the chunk, as computed by _transform.
+        :param fs: The sampling frequency of the audio.
+        :return: The resulting, modified chunk.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not provide a transform!")
+
+    def _spec_params(self) -> Dict[str, Hashable]:
+        """Returns the arguments, with which an equal tagger is constructed (see spec). Taggers, which cannot be
+        specified this way, do not override it.
+
+        :return: The arguments by name, in the order of the constructor.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not provide a spec!")
+
+    @property
+    def spec(self) -> TaggerSpec:
+        """The spec of the tagger, from which an equal tagger is constructed by from_spec."""
+        return TaggerSpec(_class_path(type(self)), tuple(self._spec_params().items()))
+
+    @classmethod
+    def _from_spec_params(cls, params: Dict[str, Any]) -> "AAudioTagger":
+        """Constructs the tagger from the arguments returned by _spec_params. Taggers, whose spec holds an argument in a
+        different form than the constructor expects it, override this."""
+        return cls(**params)
+
+    @staticmethod
+    def from_spec(spec: TaggerSpec) -> "AAudioTagger":
+        """Constructs the tagger specified by the given spec.
+
+        :param spec: The spec of the tagger, see spec.
+        :return: The constructed tagger.
         """
+        if spec.class_path not in _TAGGER_CLASSES:
+            # e.g. in another process, the module of the class may not be imported yet. Importing it registers the class
+            module_name, _, _ = spec.class_path.partition(":")
+            try:
+                importlib.import_module(module_name)
+            except ImportError:
+                pass
+
+        if spec.class_path not in _TAGGER_CLASSES:
+            raise ValueError(f"The tagger class {spec.class_path} is unknown!")
+
+        return _TAGGER_CLASSES[spec.class_path]._from_spec_params(spec.kwargs)
+
+    def __reduce_ex__(self, protocol: int) -> Tuple[Any, ...]:
+        # a tagger is pickled as its spec, instead of its (possibly large or unpicklable) state. Taggers without a spec
+        # are pickled with their state, as any other object
+        try:
+            spec = self.spec
+        except NotImplementedError:
+            return super().__reduce_ex__(protocol)
+
+        return AAudioTagger.from_spec, (spec,)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the scratch buffer only saves allocations, it is not part of the state of the tagger
+        state = self.__dict__.copy()
+        state.pop("_scratch_arena", None)
+        return state
+
+    def _cache_key(self) -> Optional[Hashable]:
+        """Returns a key, which identifies the modification of this tagger: two taggers with the same key must modify
+        every chunk in the same way. Only the chunks of taggers with a key are kept in the tagging cache (see
+        tagging_cache.py) and can be pre-tagged (see pretagged_bank.py). As the repr of the key identifies the
+        pre-tagged clips across processes, the key must consist of builtin values only. By default, a tagger has no key.
+
+        :return: The hashable key of the tagger, or None if its modified chunks must not be cached.
+        """
+        return None
+
+    def __modify_chunk_cached(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.floating]:
+        """_modify_chunk, which looks up (and keeps) the modified chunk in the tagging cache."""
+        cache = get_tagging_cache()
+        tagger_key = self._cache_key() if cache is not None else None
+        if tagger_key is None:
+            return self._modify_chunk(audio_array_chunk, fs)
+
+        key = (tagger_key, array_digest(audio_array_chunk), fs)
+        modified_chunk = cache.get(key)
+        if modified_chunk is None:
+            modified_chunk = cache.put(key, self._modify_chunk(audio_array_chunk, fs))
+
+        return modified_chunk
+
+    def __modify_chunks_cached(self, audio_array_chunks: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.floating]:
+        """_modify_chunks, which looks up (and keeps) every modified chunk in the tagging cache. Only the chunks, which
+        are not kept, are modified (as one batch); equal chunks are modified only once."""
+        cache = get_tagging_cache()
+        tagger_key = self._cache_key() if cache is not None else None
+        if tagger_key is None:
+            return self._modify_chunks(audio_array_chunks, fs)
+
+        keys = [(tagger_key, array_digest(chunk), fs) for chunk in audio_array_chunks]
+        modified_chunks = [cache.get(key) for key in keys]
+
+        missing: Dict[CacheKey, int] = {}  # key -> index of the first chunk with this key
+        for index, (key, modified_chunk) in enumerate(zip(keys, modified_chunks)):
+            if modified_chunk is None:
+                missing.setdefault(key, index)
+
+        if len(missing) > 0:
+            computed_chunks = self._modify_chunks(audio_array_chunks[list(missing.values())], fs)
+            computed = {key: cache.put(key, chunk) for key, chunk in zip(missing, computed_chunks)}
+            modified_chunks = [computed[key] if chunk is None else chunk for key, chunk in zip(keys, modified_chunks)]
+
+        return np.stack(modified_chunks)
+
+    def _scratch(self, shape: Tuple[int, ...], dtype: type = np.float32) -> npt.NDArray:
+        """Returns an uninitialized array of the given shape, which is a view of a buffer owned by the tagger. The buffer
+        grows to the largest requested size and is reused by every call, so the returned array is only valid until the
+        next call. Arrays larger than _SCRATCH_ARENA_BYTES (e.g. for a whole batch of chunks) are allocated for the
+        call only, so a tagger never keeps more than _SCRATCH_ARENA_BYTES alive after tagging.
+
+        :param shape: The shape of the requested array.
+        :param dtype: The type of the requested array.
+        :return: The scratch array.
+        """
+        n_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if n_bytes > _SCRATCH_ARENA_BYTES:
+            return np.empty(shape, dtype=dtype)
+
+        if self._scratch_arena is None or self._scratch_arena.shape[0] < n_bytes:
+            self._scratch_arena = np.empty(n_bytes, dtype=np.uint8)
 
+        return self._scratch_arena[:n_bytes].view(dtype).reshape(shape)
+
+    @staticmethod
+    def _validate_input(audio: Audio, stimuli_intervals: Collection[Tuple[float, float]]) -> None:
         if audio is None:
             raise ValueError("audio cannot be none!")
 
@@ -90,20 +341,131 @@ class AAudioTagger(ABC):
             if to_sample(stimulus[1], audio.sampling_frequency) > audio.array.shape[0]:
                 raise ValueError(f"The stimuli intervals must be contained within the audio. ")
 
-        audio_copy = np.copy(audio.array)
+    @staticmethod
+    def _copy_audio_array(audio: Audio) -> npt.NDArray[np.float32]:
+        # compact audio is converted to a new float32 array, which can be modified directly
+        audio_array = as_float32_array(audio.array)
+        return np.copy(audio_array) if audio_array is audio.array else audio_array
+
+    @staticmethod
+    def _copy_audio_array_into(audio: Audio, out: npt.NDArray[np.float32]) -> None:
+        if not isinstance(out, np.ndarray) or out.dtype != np.float32:
+            raise TypeError("out must be a numpy array of type np.float32!")
+
+        if out.shape != audio.array.shape:
+            raise ValueError("out must have the same shape as the audio!")
+
+        # an Audio must not change after its creation, e.g. its digest would not match its samples anymore
+        if np.shares_memory(out, audio.array):
+            raise ValueError("out must not share memory with the audio!")
+
+        if audio.array.dtype == np.int16:
+            pcm16_to_float32(audio.array, out)
+        else:
+            np.copyto(out, audio.array)
+
+    def create(self,
+               audio: Audio,
+               stimuli_intervals: Collection[Tuple[float, float]],
+               out: Optional[npt.NDArray[np.float32]] = None) -> Audio:
+        """Constructs the modified audio.
+
+        :param audio: Object containing the audio signal as a numpy array and the sampling frequency of the audio
+        :param stimuli_intervals: The intervals given in seconds, which will be modified with the stimulus. The
+         intervals must be contained within the audio.
+        :param out: Optional float32 array of the same shape as the audio (in-place mode). The audio is copied into out
+         and every interval is modified in out directly (see _modify_chunk_into), instead of allocating a new array for
+         the audio and every modified interval. out must not share memory with the array of the audio, as the audio
+         must not be modified. The returned audio holds out.
+        """
+        self._validate_input(audio, stimuli_intervals)
+        if out is not None:
+            return self._create_into(audio, stimuli_intervals, out)
+
+        audio_copy = self._copy_audio_array(audio)
 
         for interval in stimuli_intervals:
-            sample_range = (int(interval[0] * audio.sampling_frequency),
-                            int(interval[1] * audio.sampling_frequency))
+            sample_range = (to_sample(interval[0], audio.sampling_frequency),
+                            to_sample(interval[1], audio.sampling_frequency))
 
             audio_array_chunk = audio_copy[sample_range[0]:sample_range[1]]
 
-            audio_copy[sample_range[0]:sample_range[1]] = self._modify_chunk(audio_array_chunk,
-                                                                             audio.sampling_frequency)
+            audio_copy[sample_range[0]:sample_range[1]] = self.__modify_chunk_cached(audio_array_chunk,
+                                                                                    audio.sampling_frequency)
 
         assert audio_copy.shape == audio.array.shape
         return Audio(audio_copy, audio.sampling_frequency)
 
+    def _create_into(self,
+                     audio: Audio,
+                     stimuli_intervals: Collection[Tuple[float, float]],
+                     out: npt.NDArray[np.float32]) -> Audio:
+        """The in-place mode of create, for already validated input (see _validate_input)."""
+        self._copy_audio_array_into(audio, out)
+
+        fs = audio.sampling_frequency
+        cache = get_tagging_cache()
+        tagger_key = self._cache_key() if cache is not None else None
+
+        for start, end in _to_sample_ranges(stimuli_intervals, fs):
+            audio_array_chunk = out[start:end]
+            if tagger_key is None:
+                self._modify_chunk_into(audio_array_chunk, fs, audio_array_chunk)
+                continue
+
+            key = (tagger_key, array_digest(audio_array_chunk), fs)
+            modified_chunk = cache.get(key)
+            if modified_chunk is None:
+                self._modify_chunk_into(audio_array_chunk, fs, audio_array_chunk)
+                cache.put(key, audio_array_chunk)
+            else:
+                audio_array_chunk[...] = modified_chunk
+
+        return Audio(out, fs)
+
+    def create_many(self,
+                    audios: Sequence[Audio],
+                    intervals_per_audio: Sequence[Collection[Tuple[float, float]]]) -> List[Audio]:
+        """Constructs the modified audios, with the same result as calling create for every audio. Equally long chunks
+        (of all audios) are stacked and modified as one batch (see _modify_chunks).
+
+        :param audios: The to be modified audios.
+        :param intervals_per_audio: For every audio, the intervals given in seconds, which will be modified with the
+         stimulus. The intervals must be contained within the respective audio.
+        :return: The modified audios, in the same order as the given audios.
+        """
+        if len(audios) != len(intervals_per_audio):
+            raise ValueError("For every audio, the intervals need to be specified!")
+
+        audio_copies = []
+        batches: Dict[Tuple[int, int, int], List[Tuple[int, int, int]]] = {}  # (fs, length, channels) -> chunks
+        for index, (audio, stimuli_intervals) in enumerate(zip(audios, intervals_per_audio)):
+            self._validate_input(audio, stimuli_intervals)
+            audio_copy = self._copy_audio_array(audio)
+            audio_copies.append(audio_copy)
+
+            fs = audio.sampling_frequency
+            sample_ranges = _to_sample_ranges(stimuli_intervals, fs)
+
+            if _are_overlapping(sample_ranges):
+                # overlapping intervals modify already modified samples, hence they need to be modified in order
+                for start, end in sample_ranges:
+                    audio_copy[start:end] = self.__modify_chunk_cached(audio_copy[start:end], fs)
+                continue
+
+            for start, end in sample_ranges:
+                batches.setdefault((fs, end - start, audio_copy.shape[1]), []).append((index, start, end))
+
+        for (fs, _, _), chunk_positions in batches.items():
+            chunks = np.stack([audio_copies[index][start:end] for index, start, end in chunk_positions])
+            modified_chunks = self.__modify_chunks_cached(chunks, fs)
+            assert modified_chunks.shape == chunks.shape
+
+            for (index, start, end), modified_chunk in zip(chunk_positions, modified_chunks):
+                audio_copies[index][start:end] = modified_chunk
+
+        return [Audio(audio_copy, audio.sampling_frequency) for audio_copy, audio in zip(audio_copies, audios)]
+
     @staticmethod
     def _get_repr(class_name: str, **kwargs) -> str:
         args = ""
@@ -113,3 +475,79 @@ class AAudioTagger(ABC):
             args += f"{key}={kwargs[key]}"
 
         return f"{class_name}({args})"
+
+
+class AEnvelopeTagger(AAudioTagger):
+    """A tagger, which only applies a gain (the envelope) to every sample of the modified intervals. Instead of modifying
+    every interval on its own, one envelope for the entire audio is built (1 outside the intervals) and applied with a
+    single multiplication.
+    """
+
+    @abstractmethod
+    def _envelope(self, length: int, fs: int) -> npt.NDArray[Number]:
+        """Returns the gain applied to a chunk of the given length.
+
+        :param length: The length of the chunk in samples.
+        :param fs: The sampling frequency of the audio.
+        :return: The one dimensional envelope of the given length.
+        """
+        ...
+
+    def _modify_chunk(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
+        envelope = self._envelope(audio_array_chunk.shape[0], fs)
+        return _scale_down_signal(audio_array_chunk * _broadcast_signal(envelope))
+
+    def _modify_chunks(self, audio_array_chunks: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
+        envelope = self._envelope(audio_array_chunks.shape[1], fs)
+        return _scale_down_signals(audio_array_chunks * envelope[np.newaxis, :, np.newaxis])
+
+    def _modify_chunk_into(self,
+                           audio_array_chunk: npt.NDArray[np.float32],
+                           fs: int,
+                           out: npt.NDArray[np.float32]) -> None:
+        envelope = self._envelope(audio_array_chunk.shape[0], fs)
+        np.multiply(audio_array_chunk, _broadcast_signal(envelope), out=out, casting="same_kind")
+        _scale_down_signal(out, out=out)
+
+    def create(self,
+               audio: Audio,
+               stimuli_intervals: Collection[Tuple[float, float]],
+               out: Optional[npt.NDArray[np.float32]] = None) -> Audio:
+        if out is not None:
+            # in-place mode modifies every interval in out directly, so no envelope for the entire audio is needed
+            return super().create(audio, stimuli_intervals, out)
+
+        self._validate_input(audio, stimuli_intervals)
+        fs = audio.sampling_frequency
+        sample_ranges = _to_sample_ranges(stimuli_intervals, fs)
+
+        # equally long intervals share their envelope
+        envelopes: Dict[int, npt.NDArray[Number]] = {}
+        for start, end in sample_ranges:
+            if end - start not in envelopes:
+                envelopes[end - start] = self._envelope(end - start, fs)
+
+        # only an envelope within [-1, 1] guarantees that no interval needs to be scaled down. Overlapping intervals
+        # would need to be scaled down (if at all) one after another
+        is_bounded = all(envelope.size == 0 or np.max(np.abs(envelope)) <= 1 for envelope in envelopes.values())
+        if not is_bounded or _are_overlapping(sample_ranges):
+            return super().create(audio, stimuli_intervals)
+
+        audio_copy = self._copy_audio_array(audio)
+
+        envelope_full = np.ones(audio_copy.shape[0], dtype=np.result_type(np.float32, *envelopes.values()))
+        for start, end in sample_ranges:
+            envelope_full[start:end] = envelopes[end - start]
+
+        audio_copy *= _broadcast_signal(envelope_full)
+        # the audio was checked, and a gain within [-1, 1] keeps every sample in range
+        return trusted_audio(audio_copy, fs)
+
+    def create_many(self,
+                    audios: Sequence[Audio],
+                    intervals_per_audio: Sequence[Collection[Tuple[float, float]]]) -> List[Audio]:
+        # applying the envelope is a single pass over each audio already, hence no batching is needed
+        if len(audios) != len(intervals_per_audio):
+            raise ValueError("For every audio, the intervals need to be specified!")
+
+        return [self.create(audio, stimuli_intervals) for audio, stimuli_intervals in zip(audios, intervals_per_audio)]
@@ -0,0 +1,325 @@
+"""Banks of noise tagging codes (see NoiseTaggingTagger) with known correlation properties: maximal length sequences
+(m-sequences) and the Gold and (small) Kasami families derived from them. Codes of a bank can be drawn one after another,
+so several taggers get codes, which correlate little with each other.
+
+All codes of a bank have the length 2^degree - 1 and consist of 1 and -1. Their correlation is the circular correlation,
+as the code repeats over the tagged interval.
+"""
+from enum import Enum
+from math import gcd
+from typing import Dict, Optional, Sequence, Tuple, List
+
+import numpy as np
+import numpy.typing as npt
+
+Code = npt.NDArray[np.int8]
+
+# taps of a (Fibonacci) LFSR generating an m-sequence, for every supported degree. The first tap is always the degree
+_DEFAULT_TAPS: Dict[int, Tuple[int, ...]] = {
+    2: (2, 1), 3: (3, 2), 4: (4, 3), 5: (5, 3), 6: (6, 5), 7: (7, 6), 8: (8, 6, 5, 4), 9: (9, 5), 10: (10, 7),
+    11: (11, 9), 12: (12, 6, 4, 1), 13: (13, 4, 3, 1), 14: (14, 5, 3, 1), 15: (15, 14), 16: (16, 15, 13, 4)
+}
+
+# the cross-correlation of all pairs is only computed (in batches) up to this many bytes at once
+_CORRELATION_BATCH_BYTES = 2 ** 26
+# the maximum number of elements (number of codes x code length) of a bank
+_MAX_BANK_SIZE = 2 ** 24
+
+
+class ECodeFamily(Enum):
+    M_SEQUENCE = "m-sequence"
+    GOLD = "gold"
+    KASAMI = "kasami"
+
+
+def lfsr_sequence(degree: int, taps: Sequence[int], length: int) -> npt.NDArray[np.uint8]:
+    """Returns the output of a linear feedback shift register, starting from the state of all ones. Bit k is the XOR of
+    the bits k - t, for every tap t.
+
+    Instead of stepping the register bit by bit, blocks of bits are computed at once: bit k depends on bits at least
+    min(taps) before it, so that many bits only depend on already computed bits. Squaring the feedback polynomial (over
+    GF(2)) doubles all taps, hence the block doubles, once twice the degree bits are computed.
+
+    :param degree: The number of bits of the register.
+    :param taps: The taps of the register, each between 1 and the degree; the degree itself must be a tap.
+    :param length: The number of generated bits.
+    :return: The generated bits (0 or 1).
+    """
+    if degree < 2:
+        raise ValueError("The degree must be at least 2!")
+
+    if max(taps) != degree or min(taps) < 1:
+        raise ValueError("The taps must lie between 1 and the degree, and include the degree!")
+
+    bits = np.zeros(max(length, degree), dtype=np.uint8)
+    bits[:degree] = 1
+
+    filled = degree
+    scale = 1
+    while filled < length:
+        # bits k - t * scale determine bit k as well, if at least degree * scale bits are known
+        while filled >= 2 * degree * scale:
+            scale *= 2
+
+        lags = [tap * scale for tap in taps]
+        block = min(min(lags), length - filled)
+
+        new_bits = bits[filled - lags[0]:filled - lags[0] + block].copy()
+        for lag in lags[1:]:
+            new_bits ^= bits[filled - lag:filled - lag + block]
+
+        bits[filled:filled + block] = new_bits
+        filled += block
+
+    return bits[:length]
+
+
+def _to_code(bits: npt.NDArray[np.uint8]) -> Code:
+    # 0 -> 1, 1 -> -1
+    return (1 - 2 * bits.astype(np.int8)).astype(np.int8)
+
+
+def _decimate(code: Code, q: int) -> Code:
+    """Takes every q-th element of the (circular) code."""
+    return code[q * np.arange(code.shape[-1]) % code.shape[-1]]
+
+
+def _circular_shifts(code: Code, n_shifts: int) -> Code:
+    """Returns the code shifted to the left by 0 to n_shifts - 1 elements, one shift per row."""
+    return code[(np.arange(n_shifts)[:, np.newaxis] + np.arange(code.shape[-1])) % code.shape[-1]]
+
+
+def _circular_correlation(spectra_a: npt.NDArray[np.complex128],
+                          spectra_b: npt.NDArray[np.complex128],
+                          length: int) -> npt.NDArray[np.float64]:
+    """The circular correlation of codes, given their spectra (rfft), along the last axis."""
+    return np.fft.irfft(np.conj(spectra_a) * spectra_b, n=length, axis=-1)
+
+
+class CodeBank:
+    """A family of codes of the same length, with the correlation properties of every code. Codes are handed out by
+    draw, one after another, in an order in which every drawn code correlates little with the previously drawn ones.
+    Banks are shared (see get_code_bank), hence the codes and properties are read-only.
+    """
+    __family: ECodeFamily
+    __degree: int
+    __taps: Tuple[int, ...]
+    __codes: Code
+    __spectra: npt.NDArray[np.complex128]
+    __peak_sidelobes: npt.NDArray[np.int64]
+    __cross_correlation_peaks: Optional[npt.NDArray[np.int64]]
+    __order: Optional[List[int]]
+    __n_drawn: int
+
+    def __init__(self, family: ECodeFamily, degree: int, taps: Optional[Sequence[int]] = None) -> None:
+        """Constructs the CodeBank object. Prefer get_code_bank, which constructs every bank only once.
+
+        :param family: The family of the codes.
+        :param degree: The degree of the m-sequence, from which the codes are derived. The codes have the length
+         2^degree - 1. Gold codes require a degree not divisible by 4, Kasami codes an even degree.
+        :param taps: The taps of the LFSR generating the m-sequence (see lfsr_sequence). By default, known taps of the
+         degree are used.
+        """
+        if taps is None:
+            if degree not in _DEFAULT_TAPS:
+                raise ValueError(f"No taps are known for degree {degree}, the degree must be between "
+                                 f"{min(_DEFAULT_TAPS)} and {max(_DEFAULT_TAPS)}!")
+            taps = _DEFAULT_TAPS[degree]
+
+        if family == ECodeFamily.GOLD and (degree % 4 == 0 or degree < 3):
+            raise ValueError("Gold codes require a degree of at least 3, which is not divisible by 4!")
+
+        if family == ECodeFamily.KASAMI and degree % 2 != 0:
+            raise ValueError("Kasami codes require an even degree!")
+
+        self.__family = family
+        self.__degree = degree
+        self.__taps = tuple(sorted(taps, reverse=True))
+
+        length = 2 ** degree - 1
+        m_sequence = _to_code(lfsr_sequence(degree, self.__taps, length))
+
+        # an m-sequence has a circular autocorrelation of -1 at every shift
+        spectrum = np.fft.rfft(m_sequence.astype(np.float64))
+        if not np.allclose(_circular_correlation(spectrum, spectrum, length)[1:], -1):
+            raise ValueError(f"The taps {self.__taps} do not generate a maximal length sequence!")
+
+        if family == ECodeFamily.M_SEQUENCE:
+            codes = self.__m_sequences(m_sequence)
+        elif family == ECodeFamily.GOLD:
+            codes = self.__gold_codes(m_sequence)
+        elif family == ECodeFamily.KASAMI:
+            codes = self.__kasami_codes(m_sequence)
+        else:
+            raise NotImplementedError(f"The code family {family} is not supported!")
+
+        self.__codes = codes
+        self.__codes.flags.writeable = False
+
+        self.__spectra = np.fft.rfft(codes.astype(np.float64), axis=-1)
+        auto_correlations = _circular_correlation(self.__spectra, self.__spectra, length)
+        self.__peak_sidelobes = np.rint(np.max(np.abs(auto_correlations[:, 1:]), axis=-1)).astype(np.int64)
+        self.__cross_correlation_peaks = None
+
+        # the codes of the Gold and Kasami families all correlate equally little, but m-sequences do not. Their order
+        # needs the cross-correlation of all pairs, so it is only computed, when the first code is drawn
+        self.__order = list(range(codes.shape[0])) if family != ECodeFamily.M_SEQUENCE else None
+        self.__n_drawn = 0
+
+    def __check_size(self, n_codes: int, length: int) -> None:
+        # checked before the codes are generated, as too many codes would not fit into memory
+        if n_codes * length > _MAX_BANK_SIZE:
+            raise ValueError(f"The {n_codes} {self.__family.value} codes of degree {self.__degree} do not fit into a "
+                             f"bank!")
+
+    def __m_sequences(self, m_sequence: Code) -> Code:
+        """All m-sequences of the degree: the m-sequence decimated by every q coprime to its length. Decimating by q
+        and 2q gives the same sequence, only shifted, hence one q per cyclotomic coset is taken."""
+        length = m_sequence.shape[0]
+        seen = set()
+        decimations = []
+        for q in range(1, length):
+            if q in seen or gcd(q, length) != 1:
+                continue
+            decimations.append(q)
+            seen.update(q * 2 ** i % length for i in range(self.__degree))
+
+        self.__check_size(len(decimations), length)
+        return np.stack([_decimate(m_sequence, q) for q in decimations])
+
+    def __gold_codes(self, m_sequence: Code) -> Code:
+        """The m-sequence, its preferred pair and their products at every shift."""
+        length = m_sequence.shape[0]
+        self.__check_size(length + 2, length)
+
+        # decimating by 2^k + 1 gives a preferred pair, for gcd(degree, k) = 1 (odd degree) or 2 (degree = 2 mod 4)
+        preferred = _decimate(m_sequence, 3 if self.__degree % 2 != 0 else 5)
+
+        return np.concatenate([m_sequence[np.newaxis], preferred[np.newaxis],
+                               m_sequence * _circular_shifts(preferred, length)])
+
+    def __kasami_codes(self, m_sequence: Code) -> Code:
+        """The m-sequence and its products with the decimated (shorter) sequence at every shift."""
+        half_length = 2 ** (self.__degree // 2) - 1
+        decimated = _decimate(m_sequence, half_length + 2)
+
+        return np.concatenate([m_sequence[np.newaxis], m_sequence * _circular_shifts(decimated, half_length)])
+
+    def __greedy_order(self) -> List[int]:
+        """Orders the codes, so every code has the lowest cross-correlation peak with all codes before it."""
+        peaks = self.cross_correlation_peaks
+        order = [0]
+        worst = peaks[0].copy()
+        worst[0] = np.iinfo(np.int64).max
+        while len(order) < peaks.shape[0]:
+            index = int(np.argmin(worst))
+            order.append(index)
+            worst = np.maximum(worst, peaks[index])
+            worst[order] = np.iinfo(np.int64).max
+
+        return order
+
+    @property
+    def cross_correlation_peaks(self) -> npt.NDArray[np.int64]:
+        """The highest absolute circular cross-correlation of every pair of codes (KxK). The diagonal holds the peak
+        sidelobes of the codes. Computed when first needed, as it takes K^2 correlations."""
+        if self.__cross_correlation_peaks is None:
+            n_codes, length = self.__codes.shape
+            batch = max(1, _CORRELATION_BATCH_BYTES // (n_codes * length * 8))
+
+            peaks = np.empty((n_codes, n_codes), dtype=np.int64)
+            for start in range(0, n_codes, batch):
+                correlations = _circular_correlation(self.__spectra[start:start + batch, np.newaxis],
+                                                     self.__spectra[np.newaxis], length)
+                peaks[start:start + batch] = np.rint(np.max(np.abs(correlations), axis=-1))
+
+            np.fill_diagonal(peaks, self.__peak_sidelobes)
+            peaks.flags.writeable = False
+            self.__cross_correlation_peaks = peaks
+
+        return self.__cross_correlation_peaks
+
+    @property
+    def max_cross_correlation(self) -> int:
+        """The highest cross-correlation peak of any two different codes."""
+        if self.__codes.shape[0] < 2:
+            return 0
+
+        peaks = self.cross_correlation_peaks
+        return int(np.max(peaks[~np.eye(peaks.shape[0], dtype=bool)]))
+
+    @property
+    def peak_sidelobes(self) -> npt.NDArray[np.int64]:
+        """The highest absolute circular autocorrelation at any non-zero shift, for every code."""
+        return self.__peak_sidelobes
+
+    @property
+    def codes(self) -> Code:
+        """All codes of the bank, one per row (KxN)."""
+        return self.__codes
+
+    @property
+    def family(self) -> ECodeFamily:
+        return self.__family
+
+    @property
+    def degree(self) -> int:
+        return self.__degree
+
+    @property
+    def taps(self) -> Tuple[int, ...]:
+        return self.__taps
+
+    @property
+    def code_length(self) -> int:
+        return self.__codes.shape[1]
+
+    @property
+    def n_drawn(self) -> int:
+        return self.__n_drawn
+
+    def draw(self) -> Code:
+        """Returns the next code of the bank, which was not drawn yet. Apart from the first draw from a bank of
+        m-sequences (which orders the codes), this only takes constant time.
+
+        :return: The drawn code (read-only).
+        """
+        if self.__order is None:
+            self.__order = self.__greedy_order()
+
+        if self.__n_drawn >= len(self.__order):
+            raise ValueError(f"All {len(self.__order)} codes of the bank have been drawn already!")
+
+        code = self.__codes[self.__order[self.__n_drawn]]
+        self.__n_drawn += 1
+        return code
+
+    def reset(self) -> None:
+        """Makes all codes available to draw again, in the same order."""
+        self.__n_drawn = 0
+
+    def __len__(self) -> int:
+        return self.__codes.shape[0]
+
+    def __repr__(self) -> str:
+        return f"CodeBank(family={self.__family.value}, degree={self.__degree}, taps={self.__taps}, " \
+               f"n_codes={len(self)}, n_drawn={self.__n_drawn})"
+
+
+_code_banks: Dict[Tuple[ECodeFamily, int, Optional[Tuple[int, ...]]], CodeBank] = {}
+
+
+def get_code_bank(family: ECodeFamily, degree: int, taps: Optional[Sequence[int]] = None) -> CodeBank:
+    """Returns the code bank of the given family, degree and taps. Every bank is constructed once and then shared, so
+    all taggers drawing from it get different codes.
+
+    :param family: The family of the codes.
+    :param degree: The degree of the m-sequence, from which the codes are derived (see CodeBank).
+    :param taps: The taps of the LFSR generating the m-sequence. By default, known taps of the degree are used.
+    :return: The shared code bank.
+    """
+    key = (family, degree, tuple(sorted(taps, reverse=True)) if taps is not None else None)
+    if key not in _code_banks:
+        _code_banks[key] = CodeBank(family, degree, taps)
+
+    return _code_banks[key]
@@ -0,0 +1,177 @@
+"""Searches random noise tagging codes (see NoiseTaggingTagger) with a low peak sidelobe of their circular
+autocorrelation, and optionally a low circular cross-correlation with already chosen codes. Candidates are drawn and
+scored in large batches (with one FFT for the entire batch), and the search is spread over several processes.
+"""
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple, List
+
+import numpy as np
+import numpy.typing as npt
+import scipy.fft
+
+# the candidates of one task are drawn from their own random number generator, so the result does not depend on the
+# number of processes
+_CANDIDATES_PER_TASK = 2 ** 18
+
+
+@dataclass(frozen=True)
+class CodeScore:
+    """A found code and its scores. Lower scores are better.
+
+    :param code: The code, one value (1 or -1) per bit.
+    :param score: The score, by which codes are ranked: the highest of the peak sidelobe and peak cross-correlation.
+    :param peak_sidelobe: The highest absolute circular autocorrelation at any non-zero shift.
+    :param peak_cross_correlation: The highest absolute circular cross-correlation with any of the reference codes, or
+     0 if none were given.
+    """
+    code: Tuple[int, ...]
+    score: int
+    peak_sidelobe: int
+    peak_cross_correlation: int
+
+
+def _correlation_length(length: int) -> int:
+    """The length of the transforms, from which circular correlations of codes of the given length are computed. If the
+    length itself is slow to transform (e.g. prime, as the length of m-sequences), the codes are zero-padded to a fast
+    length of at least twice the length instead, and the (linear) correlation is folded (see _circular_correlations)."""
+    if scipy.fft.next_fast_len(length, real=True) == length:
+        return length
+    return scipy.fft.next_fast_len(2 * length - 1, real=True)
+
+
+def _circular_correlations(spectra_a: npt.NDArray[np.complex64],
+                           spectra_b: npt.NDArray[np.complex64],
+                           length: int,
+                           n_fft: int) -> npt.NDArray[np.float32]:
+    """The circular correlation of codes of the given length, given their spectra (rfft of length n_fft), along the last
+    axis."""
+    correlations = scipy.fft.irfft(np.conj(spectra_a) * spectra_b, n=n_fft, axis=-1)
+    if n_fft == length:
+        return correlations
+
+    # the circular correlation at shift s is the sum of the linear correlation at s and s - length
+    circular_correlations = correlations[..., :length].copy()
+    circular_correlations[..., 1:] += correlations[..., n_fft - length + 1:]
+    return circular_correlations
+
+
+def score_codes(codes: npt.NDArray[np.integer],
+                reference_codes: Optional[npt.NDArray[np.integer]] = None) -> Tuple[npt.NDArray[np.int64],
+                                                                                    npt.NDArray[np.int64]]:
+    """Computes the peak sidelobe of every code, and its peak cross-correlation with the reference codes. The
+    correlations of all codes are computed at once, from the spectra (rfft) of the codes. Single precision suffices, as
+    the correlations are integers, which are rounded.
+
+    :param codes: The scored codes, one per row (KxL).
+    :param reference_codes: Optional codes of the same length (RxL), e.g. codes, which are in use already.
+    :return: (peak sidelobe of every code, peak cross-correlation of every code or zeros if no references are given)
+    """
+    length = codes.shape[1]
+    n_fft = _correlation_length(length)
+    spectra = scipy.fft.rfft(codes.astype(np.float32), n=n_fft, axis=-1)
+
+    auto_correlations = _circular_correlations(spectra, spectra, length, n_fft)
+    peak_sidelobes = np.rint(np.max(np.abs(auto_correlations[:, 1:]), axis=-1)).astype(np.int64)
+
+    peak_cross_correlations = np.zeros(codes.shape[0], dtype=np.int64)
+    if reference_codes is not None:
+        # one reference at a time, so only one correlation per candidate is held in memory
+        for reference_spectrum in scipy.fft.rfft(reference_codes.astype(np.float32), n=n_fft, axis=-1):
+            cross_correlations = _circular_correlations(spectra, reference_spectrum[np.newaxis], length, n_fft)
+            np.maximum(peak_cross_correlations, np.rint(np.max(np.abs(cross_correlations), axis=-1)),
+                       out=peak_cross_correlations, casting="unsafe")
+
+    return peak_sidelobes, peak_cross_correlations
+
+
+_HeapEntry = Tuple[int, int, int, int, bytes]  # negated (score, peak sidelobe, peak cross-correlation, index), code
+
+
+def _search_task(length_bit: int,
+                 n_candidates: int,
+                 first_index: int,
+                 k: int,
+                 batch_size: int,
+                 reference_codes: Optional[npt.NDArray[np.int8]],
+                 seed_sequence: np.random.SeedSequence) -> List[_HeapEntry]:
+    """Draws and scores n_candidates codes, and returns the k best. Runs in a worker process."""
+    rng = np.random.default_rng(seed_sequence)
+
+    # the heap holds the k best candidates, with the worst one on top. Equally scored candidates are ranked by their
+    # index, so the result is the same, regardless of how the candidates are split into batches
+    heap: List[_HeapEntry] = []
+    for batch_start in range(0, n_candidates, batch_size):
+        n_batch = min(batch_size, n_candidates - batch_start)
+        codes = rng.integers(0, 2, size=(n_batch, length_bit), dtype=np.int8) * 2 - 1
+
+        peak_sidelobes, peak_cross_correlations = score_codes(codes, reference_codes)
+        scores = np.maximum(peak_sidelobes, peak_cross_correlations)
+
+        # only the k best candidates of the batch can make it into the heap (ties are broken by the index as well)
+        ranks = (scores * (length_bit + 1) + peak_sidelobes) * (length_bit + 1) + peak_cross_correlations
+        ranks = ranks * n_batch + np.arange(n_batch)
+        best = np.argpartition(ranks, k - 1)[:k] if n_batch > k else np.arange(n_batch)
+
+        for i in best:
+            entry = (-int(scores[i]), -int(peak_sidelobes[i]), -int(peak_cross_correlations[i]),
+                     -(first_index + batch_start + int(i)), codes[i].tobytes())
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heappushpop(heap, entry)
+
+    return heap
+
+
+def search_codes(length_bit: int,
+                 n_candidates: int,
+                 k: int = 10,
+                 reference_codes: Sequence[Sequence[int]] = (),
+                 seed: Optional[int] = None,
+                 n_workers: Optional[int] = None,
+                 batch_size: int = 4096) -> List[CodeScore]:
+    """Draws random codes and returns the k best of them (see CodeScore). A found code is used by passing it to the
+    NoiseTaggingTagger, e.g. NoiseTaggingTagger(fs, bits_per_second, length_bit, code=found[0].code).
+
+    :param length_bit: The length of the codes in bits.
+    :param n_candidates: The number of drawn codes.
+    :param k: The number of returned codes.
+    :param reference_codes: Codes of the same length, with which the found codes should correlate little.
+    :param seed: The seed of the random number generator. With the same seed, the same codes are found, regardless of
+     the number of workers.
+    :param n_workers: The number of processes, which search in parallel. By default, one per CPU; with 1, the search
+     runs in this process.
+    :param batch_size: The number of candidates scored at once.
+    :return: The k best codes (or all, if less were drawn), best first.
+    """
+    if length_bit < 2:
+        raise ValueError("The codes need to have at least two bits!")
+
+    if n_candidates <= 0 or k <= 0 or batch_size <= 0:
+        raise ValueError("n_candidates, k and batch_size have to be positive numbers!")
+
+    references = None
+    if len(reference_codes) > 0:
+        references = np.array(reference_codes, dtype=np.int8)
+        if references.ndim != 2 or references.shape[1] != length_bit or not np.all(np.abs(references) == 1):
+            raise ValueError("Every reference code has to consist of length_bit values, each either 1 or -1!")
+
+    first_indices = list(range(0, n_candidates, _CANDIDATES_PER_TASK))
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(first_indices))
+    tasks = [(length_bit, min(_CANDIDATES_PER_TASK, n_candidates - first_index), first_index, k, batch_size,
+              references, seed_sequence) for first_index, seed_sequence in zip(first_indices, seed_sequences)]
+
+    if n_workers == 1 or len(tasks) == 1:
+        heaps = [_search_task(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            heaps = list(executor.map(_search_task, *zip(*tasks)))
+
+    best = heapq.nlargest(k, (entry for heap in heaps for entry in heap))
+    return [CodeScore(code=tuple(int(bit) for bit in np.frombuffer(code, dtype=np.int8)),
+                      score=-score,
+                      peak_sidelobe=-peak_sidelobe,
+                      peak_cross_correlation=-peak_cross_correlation)
+            for score, peak_sidelobe, peak_cross_correlation, _, code in best]
@@ -0,0 +1,94 @@
+from typing import Sequence, Tuple, List
+
+import numpy as np
+import numpy.typing as npt
+
+from auditory_stimulation.audio import Audio, copy_as_float32
+from auditory_stimulation.auditory_tagging.auditory_tagger import _scale_down_signal
+from auditory_stimulation.auditory_tagging.tag_generators import sine_signals
+
+
+class FrequencyTaggingMixer:
+    """Mixes several concurrent audio streams (e.g. speakers), each amplitude modulated by a sine of its own frequency.
+    Every stream is modulated as by an AMTagger with the sine_signal (over its entire length), and the modulated
+    streams are summed up. The modulation of all streams is generated as one matrix (KxN, one row per stream) and applied
+    with a single reduction, instead of tagging every stream on its own.
+    """
+    __frequencies: Tuple[int, ...]
+    __signal_interval: Tuple[float, float]
+
+    def __init__(self, frequencies: Sequence[int], signal_interval: Tuple[float, float] = (-1, 1)) -> None:
+        """Constructs the FrequencyTaggingMixer object
+
+        :param frequencies: The frequency of the AM tag of every stream.
+        :param signal_interval: Default = (-1, 1). The interval of the modulating sine, the same for all streams (see
+         AMTagger).
+        """
+        if len(frequencies) == 0:
+            raise ValueError("At least one frequency has to be given")
+
+        if any(frequency <= 0 for frequency in frequencies):
+            raise ValueError("All frequencies have to be positive numbers")
+
+        if signal_interval[0] >= signal_interval[1]:
+            raise ValueError("The first value of the signal interval needs to be the lower boundary, while the second "
+                             "value is the upper boundary, and the interval cannot have length 0!")
+
+        self.__frequencies = tuple(frequencies)
+        self.__signal_interval = signal_interval
+
+    def _modulation_matrix(self, length: int, fs: int) -> npt.NDArray[np.float32]:
+        """Returns the modulating sine of every stream, shaped to the signal interval.
+
+        :param length: The length in samples of the modulation.
+        :param fs: The sampling frequency of the streams.
+        :return: The modulation, one row per stream (KxN).
+        """
+        modulation = sine_signals(length, self.__frequencies, fs)
+
+        # the same shaping as done by the AMTagger, but in place
+        lower, upper = self.__signal_interval
+        if lower != -1 or upper != 1:
+            modulation += 1
+            modulation *= (upper - lower) / 2
+            modulation += lower
+
+        return modulation
+
+    def mix(self, audios: Sequence[Audio]) -> Audio:
+        """Modulates every stream with its frequency and mixes them. Shorter streams are padded with silence to the
+        length of the longest one. If the mixture leaves [-1, 1], it is scaled down.
+
+        :param audios: The streams, one per frequency. All streams need the same sampling frequency and number of
+         channels.
+        :return: The mixture.
+        """
+        if len(audios) != len(self.__frequencies):
+            raise ValueError("For every frequency, exactly one audio has to be given!")
+
+        fs = audios[0].sampling_frequency
+        n_channels = audios[0].n_channels
+        for audio in audios:
+            if audio.sampling_frequency != fs:
+                raise ValueError("All audios need to have the same sampling frequency!")
+            if audio.n_channels != n_channels:
+                raise ValueError("All audios need to have the same number of channels!")
+
+        length = max(audio.array.shape[0] for audio in audios)
+
+        # the streams are gathered (and converted to float32) into a single KxNxC buffer
+        streams = np.zeros((len(audios), length, n_channels), dtype=np.float32)
+        for stream, audio in zip(streams, audios):
+            copy_as_float32(audio.array, stream[:audio.array.shape[0]])
+
+        mixture = np.einsum("kn,knc->nc", self._modulation_matrix(length, fs), streams)
+        _scale_down_signal(mixture, out=mixture)
+
+        return Audio(mixture, fs)
+
+    @property
+    def frequencies(self) -> List[int]:
+        return list(self.__frequencies)
+
+    def __repr__(self) -> str:
+        return f"FrequencyTaggingMixer(frequencies={list(self.__frequencies)}, signal_interval={self.__signal_interval})"
@@ -1,33 +1,37 @@
-from typing import Optional
+from typing import Optional, Sequence, Dict, Hashable
 
 import numpy as np
 import numpy.typing as npt
 
-from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger
+from auditory_stimulation.auditory_tagging.auditory_tagger import AEnvelopeTagger
+from auditory_stimulation.auditory_tagging.code_bank import CodeBank
 
 Code = npt.NDArray[np.int16]
 
 
-class NoiseTaggingTagger(AAudioTagger):
+class NoiseTaggingTagger(AEnvelopeTagger):
     """Creates a noise tagging stimulus. This stimulus is generated by first creating a random code and then modulating
-    the signal with this code."""
-    __rng: np.random.Generator
+    the signal with this code (the code is the envelope of the modified intervals)."""
+    __rng: Optional[np.random.Generator]
     __specified_fs: int
     __bit_width: int
     __length_bit: int
-    __code: Optional[Code]  # can only contain 1 and -1
+    __code: Optional[Code]  # can only contain 1 and -1; one dimensional, as it is the same for every channel
 
     def __init__(self,
                  fs: int,
                  bits_per_second: int,
                  length_bit: int,
-                 rng: np.random.Generator) -> None:
+                 rng: Optional[np.random.Generator] = None,
+                 code: Optional[Sequence[int]] = None) -> None:
         """Constructs the NoiseTaggingTagger object
 
 
         :param bits_per_second: The resolution of the noise tagging stimulus.
         :param length_bit: The length of the tag in bits.
-        :param rng: A numpy random numer generator.
+        :param rng: A numpy random numer generator, from which the code is drawn when it is first needed. Not used if
+         the code is given.
+        :param code: The code, one value (1 or -1) per bit. Either the rng or the code must be given.
         """
         if fs <= 0:
             raise ValueError("Sampling frequency must be a non-negative integer.")
@@ -42,6 +46,14 @@ class NoiseTaggingTagger(AAudioTagger):
         if length_bit <= 0:
             raise ValueError("length_bit has to be a positive number")
 
+        if rng is None and code is None:
+            raise ValueError("Either a random number generator or a code has to be given")
+
+        if code is not None:
+            code = np.array(code, dtype=np.int16)
+            if code.shape != (length_bit,) or not np.all(np.abs(code) == 1):
+                raise ValueError("The code has to consist of length_bit values, each either 1 or -1")
+
         self.__rng = rng
 
         # save only the bit_width and not the bits_per_seconds, as the latter is not used anywhere later in the code
@@ -49,25 +61,36 @@ class NoiseTaggingTagger(AAudioTagger):
         self.__length_bit = length_bit
         self.__specified_fs = fs
 
-        self.__code = None
+        self.__code = np.repeat(code, self.__bit_width) if code is not None else None
+
+    @classmethod
+    def from_code_bank(cls, code_bank: CodeBank, fs: int, bits_per_second: int) -> "NoiseTaggingTagger":
+        """Constructs a NoiseTaggingTagger with the next code drawn from the given bank (see CodeBank.draw). Taggers
+        drawing from the same bank get different codes, with the correlation properties of the bank.
+
+        :param code_bank: The bank, from which the code is drawn.
+        :param fs: The sampling frequency of the audio.
+        :param bits_per_second: The resolution of the noise tagging stimulus.
+        :return: The constructed tagger, whose length_bit is the length of the codes of the bank.
+        """
+        return cls(fs, bits_per_second, code_bank.code_length, code=code_bank.draw())
 
     def __generate_code(self) -> None:
         """If the code is not already set, generates a new code and sets it.
         technically, as we are only using one code, we can generate an arbitrary random sequence
 
-        TODO: change this to a a more deliberate solution if multiple codes are used
+        If multiple codes are used, draw them from a code bank instead (see from_code_bank).
         """
 
         if self.__code is not None:
             return
 
-        random_floats = self.__rng.random(self.__length_bit)  # Nx1 as I want the same code for both audio channels
+        random_floats = self.__rng.random(self.__length_bit)  # N as I want the same code for all audio channels
         random_zero_one = np.array(random_floats > 0.5, dtype=np.int16)
         code = random_zero_one * 2 - 1
 
-        code_normalized = np.repeat(code, self.__bit_width)
-        self.__code = np.array([code_normalized, code_normalized]).T  # duplicate code to both audio channels
-        assert self.__code.shape[1] == 2
+        self.__code = np.repeat(code, self.__bit_width)
+        assert len(self.__code.shape) == 1
 
     def __get_code(self, length: int) -> Code:
         """Need to run __generate_code() first. This function returns an appropriately cut code to the given length.
@@ -78,38 +101,38 @@ class NoiseTaggingTagger(AAudioTagger):
         if self.__code is None:
             raise ValueError("You must run __generate_code() first before you can run this method")
 
-        repeat = length // self.__code.shape[0]
-        long_code = np.tile(self.__code.T, repeat).T
-        assert long_code.shape[0] == self.__code.shape[0] * repeat
-
-        if long_code.shape[0] == length:
-            assert long_code.shape[1] == 2
-            return long_code
-
-        assert length - long_code.shape[0] > 0
-        out = np.append(long_code, self.__code[:length - long_code.shape[0], :], axis=0)
+        # resize repeats the code as often as needed and cuts it to the given length
+        out = np.resize(self.__code, length)
 
         assert out.shape[0] == length, f"out.shape[0]: {out.shape[0]}; length: {length}"
-        assert out.shape[1] == 2
         return out
 
     @property
     def code(self) -> Optional[Code]:
+        """The code, duplicated to two (stereo) channels (Nx2)."""
         if self.__code is None:
             return None
 
-        return np.copy(self.__code)
+        return np.array([self.__code, self.__code]).T
 
-    def _modify_chunk(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
+    def _envelope(self, length: int, fs: int) -> Code:
         if fs != self.__specified_fs:
             raise ValueError("The specified sampling frequency did not match the sampling frequency of the audio chunk")
 
         self.__generate_code()
-        return audio_array_chunk * self.__get_code(audio_array_chunk.shape[0])
+        return self.__get_code(length)
+
+    def _spec_params(self) -> Dict[str, Hashable]:
+        # the spec holds the code itself, so a random code is drawn now, if it was not drawn yet
+        self.__generate_code()
+        return {"fs": self.__specified_fs,
+                "bits_per_second": self.__specified_fs // self.__bit_width,
+                "length_bit": self.__length_bit,
+                "code": tuple(int(bit) for bit in self.__code[::self.__bit_width])}
 
     def __repr__(self) -> str:
         code_print = "["
-        for c in self.code[:, 0][::self.__bit_width]:
+        for c in self.__code[::self.__bit_width]:
             if len(code_print) != 1:
                 code_print += ", "
             code_print += str(c)
@@ -1,3 +1,5 @@
+from typing import Dict, Hashable
+
 import numpy as np
 import numpy.typing as npt
 
@@ -10,5 +12,18 @@ class RawTagger(AAudioTagger):
     def _modify_chunk(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
         return audio_array_chunk
 
+    def _modify_chunks(self, audio_array_chunks: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
+        return audio_array_chunks
+
+    def _modify_chunk_into(self,
+                           audio_array_chunk: npt.NDArray[np.float32],
+                           fs: int,
+                           out: npt.NDArray[np.float32]) -> None:
+        if out is not audio_array_chunk:
+            np.copyto(out, audio_array_chunk)
+
+    def _spec_params(self) -> Dict[str, Hashable]:
+        return {}
+
     def __repr__(self) -> str:
         return self._get_repr("RawTagger")
@@ -1,22 +1,25 @@
+from math import gcd
 from numbers import Complex
-from typing import Callable
+from typing import Callable, Hashable, Dict, Optional
 
 import numpy as np
 import numpy.typing as npt
 
-from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger, _duplicate_signal, _scale_down_signal
+from auditory_stimulation.auditory_tagging import spectral
+from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger, _broadcast_signal, _scale_down_signal, \
+    _scale_down_signals, _samples_first
 
 
 def _get_shift_multiplier(shift_by: int, length: int, fs: int) -> npt.NDArray[Complex]:
     n = np.arange(length)
 
     multiplier = np.e ** ((1j * 2 * np.pi * shift_by * n) / fs)
-    multiplier_duplicated = _duplicate_signal(multiplier)
+    multiplier_broadcast = _broadcast_signal(multiplier)
 
-    assert multiplier_duplicated.shape[0] == length
-    assert multiplier_duplicated.shape[1] == 2
+    assert multiplier_broadcast.shape[0] == length
+    assert multiplier_broadcast.shape[1] == 1
 
-    return multiplier_duplicated
+    return multiplier_broadcast
 
 
 def _shift_signal_legacy(signal: npt.NDArray[np.number], fs: int, shift_by: int) -> npt.NDArray[np.number]:
@@ -33,32 +36,69 @@ def _shift_signal_legacy(signal: npt.NDArray[np.number], fs: int, shift_by: int)
     The resulting effect is quite similar to an AM tagger.
     """
     shift_multiplier = _get_shift_multiplier(shift_by, signal.shape[0], fs)
+    # broadcast along all remaining axes (e.g. of a batch of chunks)
+    shift_multiplier = np.reshape(shift_multiplier, shift_multiplier.shape + (1,) * (signal.ndim - 2))
     audio_array_shifted = np.array(np.real(signal * shift_multiplier), dtype=np.float32)
     return audio_array_shifted
 
 
 def _shift_signal(signal: npt.NDArray[np.number], fs: int, shift_by: int) -> npt.NDArray[np.number]:
-    f_resolution = fs / signal.shape[0]
-    n_shift_by = int(shift_by / f_resolution)
-    spectrum_mid = signal.shape[0] // 2
+    """Shifts the spectrum of every channel (along axis 0) up by shift_by Hz. Only the positive frequencies are shifted
+    (single-sideband), frequencies shifted beyond the Nyquist frequency are dropped.
+
+    The signal is zero-padded to a length, for which shift_by is a whole number of frequency bins (fs / length), so
+    the spectrum is shifted by exactly shift_by Hz, also for short signals. The one-sided spectrum (rfft) is shifted in
+    place and transformed back. The padded length is a multiple of fs / gcd(fs, shift_by) samples, so shifts dividing
+    fs evenly are cheap, while a shift coprime to fs (e.g. 41 Hz at 44100 Hz) pads every chunk to a multiple of a full
+    second. Short chunks then take the time and memory of a one second transform each. A shift of 0 Hz returns a copy
+    of the signal.
+
+    :param signal: The to be shifted signal. Needs to be of the shape NxC.
+    :param fs: The sampling frequency of the signal.
+    :param shift_by: The non-negative amount of Hz, by which the spectrum is shifted.
+    :return: The shifted signal.
+    """
+    if shift_by == 0:
+        return np.array(signal, copy=True)
 
-    signal_spectrum = np.fft.fftshift(np.fft.fft(signal, axis=0))
-    signal_spectrum_positive = signal_spectrum[spectrum_mid:, :]
+    length = signal.shape[0]
+    n_fft = _shift_fft_length(length, fs, shift_by)
 
-    signal_spectrum_positive_shifted = np.zeros_like(signal_spectrum_positive)
-    signal_spectrum_positive_shifted[n_shift_by:, :] = signal_spectrum_positive[:-n_shift_by, :]
-    assert np.all(signal_spectrum_positive_shifted[:n_shift_by, :] == 0)
+    signal_shifted = _shift_spectrum(spectral.rfft(signal, n_fft), n_fft, fs, shift_by)[:length]
 
-    signal_spectrum_shifted = np.zeros_like(signal_spectrum)
-    signal_spectrum_shifted[spectrum_mid:, :] = signal_spectrum_positive_shifted
+    assert signal_shifted.shape == signal.shape
+    return signal_shifted
 
-    # rescale the signal, as I am cutting away the entire negative frequency part
-    signal_spectrum_shifted_scaled = signal_spectrum_shifted * 2
 
-    signal_shifted = np.real(np.fft.ifft(np.fft.fftshift(signal_spectrum_shifted_scaled), axis=0))
+def _shift_fft_length(length: int, fs: int, shift_by: int) -> int:
+    """The length of the transform used by _shift_signal, for which shift_by is a whole number of frequency bins."""
+    return spectral.fast_length_multiple(length, fs // gcd(fs, shift_by))
 
-    assert signal_shifted.shape == signal.shape
-    return signal_shifted
+
+def _shift_spectrum(spectrum: npt.NDArray[Complex], n_fft: int, fs: int, shift_by: int) -> npt.NDArray[np.floating]:
+    """Shifts the one-sided spectrum (of length n_fft, see _shift_fft_length) up by shift_by Hz, and transforms it
+    back. The spectrum is shifted in place.
+
+    :return: The shifted signal, of length n_fft.
+    """
+    n_shift_by = shift_by * n_fft // fs
+    n_bins = spectrum.shape[0]
+
+    if n_shift_by == 0:
+        # nothing is shifted, hence the Nyquist bin is kept as well
+        return spectral.irfft(spectrum, n_fft, overwrite=True)
+
+    if n_shift_by >= n_bins:
+        spectrum[:] = 0
+    elif n_shift_by > 0:
+        spectrum[n_shift_by:] = spectrum[:n_bins - n_shift_by]
+        spectrum[:n_shift_by] = 0
+
+    # a real signal has no positive counterpart to the Nyquist bin, so it is not part of the shifted (positive) spectrum
+    if n_fft % 2 == 0:
+        spectrum[-1] = 0
+
+    return spectral.irfft(spectrum, n_fft, overwrite=True)
 
 
 class ShiftSumTagger(AAudioTagger):
@@ -68,6 +108,7 @@ class ShiftSumTagger(AAudioTagger):
     """
 
     __shift_by: int
+    __legacy_mode: bool
     __shift_signal: Callable[[npt.NDArray[np.number], int, int], npt.NDArray[np.number]]
 
     def __init__(self, shift_by: int, legacy_mode: bool = False) -> None:
@@ -82,6 +123,7 @@ class ShiftSumTagger(AAudioTagger):
             raise ValueError("Shift by has to be a non-negative integer")
 
         self.__shift_by = shift_by
+        self.__legacy_mode = legacy_mode
         self.__shift_signal = _shift_signal if not legacy_mode else _shift_signal_legacy
 
     def _modify_chunk(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
@@ -91,6 +133,43 @@ class ShiftSumTagger(AAudioTagger):
 
         return audio_array_combined_scaled
 
+    def _transform_key(self, length: int, fs: int) -> Optional[Hashable]:
+        # a shift of 0 Hz copies the chunk exactly, instead of transforming it back and forth
+        if self.__legacy_mode or self.__shift_by == 0:
+            return None
+        return "rfft", _shift_fft_length(length, fs, self.__shift_by)
+
+    def _transform(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[Complex]:
+        return spectral.rfft(audio_array_chunk, _shift_fft_length(audio_array_chunk.shape[0], fs, self.__shift_by))
+
+    def _modify_transformed(self,
+                            audio_array_chunk: npt.NDArray[np.float32],
+                            transform: npt.NDArray[Complex],
+                            fs: int) -> npt.NDArray[np.float32]:
+        n_fft = _shift_fft_length(audio_array_chunk.shape[0], fs, self.__shift_by)
+        audio_array_shifted = _shift_spectrum(np.copy(transform), n_fft, fs, self.__shift_by)
+        return _scale_down_signal(audio_array_shifted[:audio_array_chunk.shape[0]] + audio_array_chunk)
+
+    def _modify_chunks(self, audio_array_chunks: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
+        audio_arrays_shifted = _samples_first(self.__shift_signal(_samples_first(audio_array_chunks), fs,
+                                                                  self.__shift_by))
+        return _scale_down_signals(audio_arrays_shifted + audio_array_chunks)
+
+    def _modify_chunk_into(self,
+                           audio_array_chunk: npt.NDArray[np.float32],
+                           fs: int,
+                           out: npt.NDArray[np.float32]) -> None:
+        audio_array_shifted = self.__shift_signal(audio_array_chunk, fs, self.__shift_by)
+        np.add(audio_array_shifted, audio_array_chunk, out=out, casting="same_kind")
+        _scale_down_signal(out, out=out)
+
+    def _spec_params(self) -> Dict[str, Hashable]:
+        return {"shift_by": self.__shift_by, "legacy_mode": self.__legacy_mode}
+
+    def _cache_key(self) -> Hashable:
+        # padding changes the result of the shift (see _shift_signal)
+        return self.spec, spectral.get_spectral_configuration().pad_to_fast_length
+
     def __repr__(self) -> str:
         return self._get_repr("ShiftSumTagger", shift_by=str(self.__shift_by))
 
@@ -110,6 +189,7 @@ class SpectrumShiftTagger(AAudioTagger):
             raise ValueError("Shift by has to be a non-negative integer")
 
         self.__shift_by = shift_by
+        self.__legacy_mode = legacy_mode
         self.__shift_signal = _shift_signal if not legacy_mode else _shift_signal_legacy
 
     def _modify_chunk(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
@@ -118,6 +198,41 @@ class SpectrumShiftTagger(AAudioTagger):
 
         return audio_array_shifted_scaled
 
+    def _transform_key(self, length: int, fs: int) -> Optional[Hashable]:
+        # a shift of 0 Hz copies the chunk exactly, instead of transforming it back and forth
+        if self.__legacy_mode or self.__shift_by == 0:
+            return None
+        return "rfft", _shift_fft_length(length, fs, self.__shift_by)
+
+    def _transform(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[Complex]:
+        return spectral.rfft(audio_array_chunk, _shift_fft_length(audio_array_chunk.shape[0], fs, self.__shift_by))
+
+    def _modify_transformed(self,
+                            audio_array_chunk: npt.NDArray[np.float32],
+                            transform: npt.NDArray[Complex],
+                            fs: int) -> npt.NDArray[np.float32]:
+        n_fft = _shift_fft_length(audio_array_chunk.shape[0], fs, self.__shift_by)
+        audio_array_shifted = _shift_spectrum(np.copy(transform), n_fft, fs, self.__shift_by)
+        return _scale_down_signal(audio_array_shifted[:audio_array_chunk.shape[0]])
+
+    def _modify_chunks(self, audio_array_chunks: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
+        audio_arrays_shifted = _samples_first(self.__shift_signal(_samples_first(audio_array_chunks), fs,
+                                                                  self.__shift_by))
+        return _scale_down_signals(audio_arrays_shifted)
+
+    def _modify_chunk_into(self,
+                           audio_array_chunk: npt.NDArray[np.float32],
+                           fs: int,
+                           out: npt.NDArray[np.float32]) -> None:
+        _scale_down_signal(self.__shift_signal(audio_array_chunk, fs, self.__shift_by), out=out)
+
+    def _spec_params(self) -> Dict[str, Hashable]:
+        return {"shift_by": self.__shift_by, "legacy_mode": self.__legacy_mode}
+
+    def _cache_key(self) -> Hashable:
+        # padding changes the result of the shift (see _shift_signal)
+        return self.spec, spectral.get_spectral_configuration().pad_to_fast_length
+
     def __repr__(self) -> str:
         return self._get_repr("SpectrumShiftTagger", shift_by=str(self.__shift_by))
 
@@ -127,7 +242,7 @@ class BinauralTagger(AAudioTagger):
     creates an Audio object, which contains the original audio in channel 0 and the shifted audio in channel 1.
 
     This tagger only utilizes audio channel 0 (the resulting audio is audio channel 0 of the original in output
-    channel 0 and modified audio channel 0 of the modified one in output channel 1).
+    channel 0 and modified audio channel 0 of the modified one in output channel 1). Requires at least two channels.
     """
 
     def __init__(self, shift_by: int, legacy_mode: bool = False) -> None:
@@ -141,15 +256,50 @@ class BinauralTagger(AAudioTagger):
             raise ValueError("Shift by has to be a non-negative integer")
 
         self.__shift_by = shift_by
+        self.__legacy_mode = legacy_mode
         self.__shift_signal = _shift_signal if not legacy_mode else _shift_signal_legacy
 
+    def __combine(self,
+                  audio_array: npt.NDArray[np.float32],
+                  fs: int,
+                  out: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+        """Combines the original and shifted audio into out, which may be the audio array itself. The samples are along
+        axis 0 and the channels along the last axis."""
+        if audio_array.shape[-1] < 2:
+            raise ValueError("The BinauralTagger requires audio with at least two channels!")
+
+        # channel 1 keeps the original audio, so only the other channels need to be shifted
+        shifted_channels = [channel for channel in range(audio_array.shape[-1]) if channel != 1]
+
+        # gather the shifted channels in the scratch buffer of the tagger, instead of a new (fancy indexed) copy
+        audio_array_gathered = self._scratch(audio_array.shape[:-1] + (len(shifted_channels),), audio_array.dtype)
+        np.take(audio_array, shifted_channels, axis=-1, out=audio_array_gathered)
+
+        out[..., 1] = audio_array[..., 1]
+        out[..., shifted_channels] = self.__shift_signal(audio_array_gathered, fs, self.__shift_by)
+
+        return out
+
     def _modify_chunk(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
-        audio_array_shifted = self.__shift_signal(audio_array_chunk, fs, self.__shift_by)
+        return _scale_down_signal(self.__combine(audio_array_chunk, fs, np.empty(audio_array_chunk.shape, np.float32)))
+
+    def _modify_chunks(self, audio_array_chunks: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
+        audio_array_combined = np.empty(audio_array_chunks.shape, dtype=np.float32)
+        self.__combine(_samples_first(audio_array_chunks), fs, _samples_first(audio_array_combined))
+        return _scale_down_signals(audio_array_combined)
+
+    def _modify_chunk_into(self,
+                           audio_array_chunk: npt.NDArray[np.float32],
+                           fs: int,
+                           out: npt.NDArray[np.float32]) -> None:
+        _scale_down_signal(self.__combine(audio_array_chunk, fs, out), out=out)
 
-        audio_combined = audio_array_shifted
-        audio_combined[:, 1] = audio_array_chunk[:, 1]
+    def _spec_params(self) -> Dict[str, Hashable]:
+        return {"shift_by": self.__shift_by, "legacy_mode": self.__legacy_mode}
 
-        return _scale_down_signal(audio_combined)
+    def _cache_key(self) -> Hashable:
+        # padding changes the result of the shift (see _shift_signal)
+        return self.spec, spectral.get_spectral_configuration().pad_to_fast_length
 
     def __repr__(self) -> str:
         return self._get_repr("BinauralTagger", shift_by=str(self.__shift_by))
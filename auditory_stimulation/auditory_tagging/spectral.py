@@ -0,0 +1,124 @@
+"""The spectral backend used by all taggers operating on the spectrum of the audio. The chunks passed to the taggers can
+have arbitrary (even prime) lengths, for which FFTs are slow, hence the transforms can be padded to a fast length. As
+padding changes the result close to the boundaries of a chunk, it is opt-in (see SpectralConfiguration), so by default
+the taggers reproduce the unpadded output. How the transforms are run is configured in one place, see
+set_spectral_configuration.
+"""
+from contextlib import contextmanager
+from dataclasses import dataclass
+from numbers import Complex
+from typing import Iterator, Optional
+
+import numpy as np
+import numpy.typing as npt
+import scipy.fft
+
+
+@dataclass(frozen=True)
+class SpectralConfiguration:
+    workers: int = 1  # the number of threads used by a single transform; -1 uses all available cores
+    # whether transforms are zero-padded to a length with small prime factors only. Faster for slow lengths, but changes
+    # the result close to the boundaries of a chunk
+    pad_to_fast_length: bool = False
+
+    def __post_init__(self) -> None:
+        if self.workers == 0 or self.workers < -1:
+            raise ValueError("The number of workers must be a positive integer or -1!")
+
+
+_configuration = SpectralConfiguration()
+
+
+def get_spectral_configuration() -> SpectralConfiguration:
+    return _configuration
+
+
+def set_spectral_configuration(configuration: SpectralConfiguration) -> None:
+    """Sets the configuration of the spectral backend for the entire process.
+
+    :param configuration: The new configuration.
+    :return: None
+    """
+    global _configuration
+
+    if not isinstance(configuration, SpectralConfiguration):
+        raise TypeError("The configuration must be a SpectralConfiguration!")
+
+    _configuration = configuration
+
+
+@contextmanager
+def spectral_configuration(configuration: SpectralConfiguration) -> Iterator[None]:
+    """Temporarily changes the configuration of the spectral backend. The previous configuration is restored when the
+    context is exited.
+
+    :param configuration: The configuration used inside the context.
+    """
+    previous = get_spectral_configuration()
+    set_spectral_configuration(configuration)
+    try:
+        yield
+    finally:
+        set_spectral_configuration(previous)
+
+
+def fast_length(length: int) -> int:
+    """Returns the length to which a real transform of the given length is padded, according to the configuration."""
+    if not _configuration.pad_to_fast_length or length == 0:
+        return length
+    return scipy.fft.next_fast_len(length, real=True)
+
+
+def fast_length_multiple(length: int, period: int) -> int:
+    """Returns the length to which a transform of the given length is padded, if the padded length must be a multiple of
+    period. If the configuration allows it (and period has small prime factors only), the result is a fast length.
+
+    :param length: The length of the signal.
+    :param period: A positive integer, which needs to divide the padded length.
+    :return: The padded length.
+    """
+    n_periods = -(-length // period)
+    if _configuration.pad_to_fast_length and n_periods > 0 and scipy.fft.next_fast_len(period) == period:
+        # a product of numbers with small prime factors only, has small prime factors only as well
+        n_periods = scipy.fft.next_fast_len(n_periods)
+
+    return n_periods * period
+
+
+def ifft(spectrum: npt.NDArray[Complex], n: Optional[int] = None, overwrite: bool = False) -> npt.NDArray[Complex]:
+    """The inverse FFT along axis 0. If overwrite is set, the spectrum may be used as the output buffer."""
+    return scipy.fft.ifft(spectrum, n=n, axis=0, overwrite_x=overwrite, workers=_configuration.workers)
+
+
+def rfft(signal: npt.NDArray[np.floating], n: Optional[int] = None) -> npt.NDArray[Complex]:
+    """The FFT of a real signal along axis 0, containing only the non-negative frequencies (n // 2 + 1 bins)."""
+    return scipy.fft.rfft(signal, n=n, axis=0, workers=_configuration.workers)
+
+
+def irfft(spectrum: npt.NDArray[Complex], n: int, overwrite: bool = False) -> npt.NDArray[np.floating]:
+    """The inverse of rfft along axis 0. n is the length of the resulting real signal."""
+    return scipy.fft.irfft(spectrum, n=n, axis=0, overwrite_x=overwrite, workers=_configuration.workers)
+
+
+def analytic_signal(signal: npt.NDArray[np.floating], complex_dtype: type = np.complex128) -> npt.NDArray[Complex]:
+    """Computes the analytic signal of every channel (along axis 0), like scipy.signal.hilbert. Only the non-negative
+    frequencies are computed (rfft). If the configuration pads transforms to a fast length, the circular continuation of
+    the signal (as assumed by hilbert) is replaced with silence, which changes the result close to the boundaries of the
+    signal; otherwise the result equals that of hilbert.
+
+    :param signal: The signal of the shape N or NxC.
+    :param complex_dtype: Either np.complex64 or np.complex128.
+    :return: The analytic signal, of the same shape as the signal.
+    """
+    real_dtype = np.float32 if complex_dtype == np.complex64 else np.float64
+    n = signal.shape[0]
+    n_fft = fast_length(n)
+
+    half_spectrum = rfft(signal.astype(real_dtype, copy=False), n_fft)
+
+    # keep the DC (and Nyquist) component, double the positive frequencies and leave the negative ones at 0
+    spectrum = np.zeros((n_fft,) + signal.shape[1:], dtype=complex_dtype)
+    spectrum[:half_spectrum.shape[0]] = half_spectrum
+    spectrum[1:(n_fft + 1) // 2] *= 2
+
+    return ifft(spectrum, overwrite=True)[:n]
@@ -0,0 +1,164 @@
+"""Renders the same audio with many taggers at once, e.g. to compare a tagger across a grid of its parameters. Taggers,
+which compute their modification from the same transform of a chunk (see AAudioTagger._transform_key), e.g. FMTaggers
+of different frequencies sharing the analytic signal, or ShiftSumTaggers sharing the spectrum, compute it only once per
+chunk for the entire sweep.
+"""
+import itertools
+from typing import Sequence, Collection, Tuple, Mapping, Any, Dict, List, Type, Hashable, Iterator, overload, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from auditory_stimulation.audio import Audio, as_float32_array
+from auditory_stimulation.auditory_tagging import spectral
+from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger, _to_sample_ranges, _are_overlapping
+
+
+class TaggerSweep(Sequence[Audio]):
+    """The audio tagged by each of the taggers, in the same order. The tagged audios are rendered lazily, only when they
+    are accessed; the shared transforms of the chunks are kept, so they are computed at most once. All audios are
+    rendered with the spectral configuration, which is active when the sweep is created.
+    """
+    __audio: Audio
+    __audio_array: npt.NDArray[np.float32]
+    __stimuli_intervals: List[Tuple[float, float]]
+    __sample_ranges: List[Tuple[int, int]]
+    __taggers: List[AAudioTagger]
+    __parameters: List[Dict[str, Any]]
+    __spectral_configuration: spectral.SpectralConfiguration
+
+    __transforms: Dict[Tuple[int, Hashable], npt.NDArray]  # (index of the chunk, key of the transform) -> transform
+
+    def __init__(self,
+                 audio: Audio,
+                 stimuli_intervals: Collection[Tuple[float, float]],
+                 taggers: Sequence[AAudioTagger],
+                 parameters: Sequence[Dict[str, Any]] = ()) -> None:
+        """Constructs the TaggerSweep object
+
+        :param audio: The audio, which is tagged by every tagger.
+        :param stimuli_intervals: The intervals given in seconds, which are modified by every tagger (see
+         AAudioTagger.create).
+        :param taggers: The taggers of the sweep.
+        :param parameters: Optional, for every tagger the parameters, with which it was constructed (see sweep).
+        """
+        AAudioTagger._validate_input(audio, stimuli_intervals)
+
+        if len(parameters) != 0 and len(parameters) != len(taggers):
+            raise ValueError("If parameters are given, they need to be given for every tagger!")
+
+        self.__audio = audio
+        self.__audio_array = as_float32_array(audio.array)
+        self.__stimuli_intervals = list(stimuli_intervals)
+        self.__sample_ranges = _to_sample_ranges(stimuli_intervals, audio.sampling_frequency)
+        self.__taggers = list(taggers)
+        self.__parameters = [dict(tagger_parameters) for tagger_parameters in parameters]
+        self.__spectral_configuration = spectral.get_spectral_configuration()
+
+        self.__transforms = {}
+
+    def __modify_chunk(self, tagger: AAudioTagger, index: int) -> npt.NDArray[np.floating]:
+        start, end = self.__sample_ranges[index]
+        audio_array_chunk = self.__audio_array[start:end]
+        fs = self.__audio.sampling_frequency
+
+        transform_key = tagger._transform_key(end - start, fs)
+        if transform_key is None:
+            return tagger._modify_chunk(audio_array_chunk, fs)
+
+        transform = self.__transforms.get((index, transform_key))
+        if transform is None:
+            transform = tagger._transform(audio_array_chunk, fs)
+            self.__transforms[(index, transform_key)] = transform
+
+        return tagger._modify_transformed(audio_array_chunk, transform, fs)
+
+    def __render_into(self, tagger: AAudioTagger, out: npt.NDArray[np.float32]) -> None:
+        with spectral.spectral_configuration(self.__spectral_configuration):
+            # overlapping intervals modify already modified samples, so their chunks have no shared transform. The
+            # input was validated, when the sweep was created
+            if _are_overlapping(self.__sample_ranges):
+                tagger._create_into(self.__audio, self.__stimuli_intervals, out)
+                return
+
+            np.copyto(out, self.__audio_array)
+            for index, (start, end) in enumerate(self.__sample_ranges):
+                out[start:end] = self.__modify_chunk(tagger, index)
+
+    def __render(self, tagger: AAudioTagger) -> Audio:
+        out = np.empty(self.__audio_array.shape, dtype=np.float32)
+        self.__render_into(tagger, out)
+        return Audio(out, self.__audio.sampling_frequency)
+
+    @overload
+    def __getitem__(self, index: int) -> Audio:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Audio]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Audio, List[Audio]]:
+        if isinstance(index, slice):
+            return [self.__render(tagger) for tagger in self.__taggers[index]]
+
+        return self.__render(self.__taggers[index])
+
+    def __len__(self) -> int:
+        return len(self.__taggers)
+
+    def __iter__(self) -> Iterator[Audio]:
+        for tagger in self.__taggers:
+            yield self.__render(tagger)
+
+    def to_array(self) -> npt.NDArray[np.float32]:
+        """Renders the audios of all taggers.
+
+        :return: The arrays of all tagged audios, stacked along the first axis (TxNxC).
+        """
+        out = np.empty((len(self.__taggers),) + self.__audio_array.shape, dtype=np.float32)
+        for tagger, tagger_out in zip(self.__taggers, out):
+            self.__render_into(tagger, tagger_out)
+
+        return out
+
+    def clear(self) -> None:
+        """Removes the kept transforms from memory."""
+        self.__transforms.clear()
+
+    @property
+    def taggers(self) -> List[AAudioTagger]:
+        return list(self.__taggers)
+
+    @property
+    def parameters(self) -> List[Dict[str, Any]]:
+        return [dict(tagger_parameters) for tagger_parameters in self.__parameters]
+
+    def __repr__(self) -> str:
+        return f"TaggerSweep(taggers=[{', '.join(repr(tagger) for tagger in self.__taggers)}])"
+
+
+def sweep(audio: Audio,
+          stimuli_intervals: Collection[Tuple[float, float]],
+          tagger_class: Type[AAudioTagger],
+          grid: Mapping[str, Sequence[Any]],
+          **fixed_parameters: Any) -> TaggerSweep:
+    """Tags the audio with a tagger for every point of the parameter grid, e.g.
+    sweep(audio, intervals, FMTagger, {"frequency": [38, 40, 42], "modulation_factor": [50, 100]}).
+
+    :param audio: The audio, which is tagged.
+    :param stimuli_intervals: The intervals given in seconds, which are modified by every tagger.
+    :param tagger_class: The class of the taggers.
+    :param grid: For each swept parameter of the tagger, the values it takes. Every combination of the values is one
+     point of the grid; the last parameter changes fastest.
+    :param fixed_parameters: Parameters of the tagger, which are the same for all points.
+    :return: The (lazily rendered) tagged audios, one per point of the grid.
+    """
+    if len(grid) == 0:
+        raise ValueError("The grid needs at least one parameter!")
+
+    names = list(grid)
+    parameters = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    taggers = [tagger_class(**fixed_parameters, **point) for point in parameters]
+
+    return TaggerSweep(audio, stimuli_intervals, taggers, parameters)
@@ -1,4 +1,6 @@
-from typing import Callable
+from collections import OrderedDict
+from math import gcd
+from typing import Callable, Dict, Tuple, Sequence
 
 import numpy as np
 import numpy.typing as npt
@@ -22,25 +24,149 @@ def __common_stimulus_generation_tests(length: int,
         raise ValueError("Sampling frequency must be a positive integer!")
 
 
+PeriodGenerator = Callable[[Frequency, SamplingFrequency], npt.NDArray[np.float64]]
+TableKey = Tuple[str, Frequency, SamplingFrequency, str]
+
+_MAX_TABLE_SAMPLES = 2 ** 20  # about 24 seconds at 44100 Hz
+_OSCILLATOR_BANK_MEMORY_LIMIT = 2 ** 26
+
+
+class _OscillatorBank:
+    """Caches the tag signals. For every (generator, frequency, sampling frequency, type) a master table is kept,
+    which consists of whole periods of the signal. A tag signal of any length is then a (read-only) slice of the master
+    table, starting at its first sample. Tables are extended by whole periods, when a longer signal is requested, but
+    only up to about _MAX_TABLE_SAMPLES; longer signals are tiled from the table for the caller only. Once the memory
+    limit is exceeded, the least recently used tables are evicted."""
+    __memory_limit: int
+
+    __tables: "OrderedDict[TableKey, Tuple[npt.NDArray[np.floating], int]]"  # key -> (table, its maximal length)
+    __used_memory: int
+
+    def __init__(self, memory_limit: int = _OSCILLATOR_BANK_MEMORY_LIMIT) -> None:
+        self.__memory_limit = memory_limit
+        self.__tables = OrderedDict()
+        self.__used_memory = 0
+
+    def get(self,
+            period_generator: PeriodGenerator,
+            length: int,
+            frequency: int,
+            sampling_frequency: int,
+            dtype: type = np.float32) -> npt.NDArray[np.floating]:
+        """Returns the first length samples of the signal, one period of which is generated by period_generator.
+
+        :param period_generator: Generates exactly one period of the signal.
+        :param length: The length in samples of the signal.
+        :param frequency: The frequency of the signal.
+        :param sampling_frequency: The sampling frequency of the signal.
+        :param dtype: The type of the signal.
+        :return: A read-only view of the master table, or a read-only tiling of it, if the signal is longer.
+        """
+        key = (period_generator.__name__, frequency, sampling_frequency, np.dtype(dtype).str)
+        # the entry is put back as the most recently used one
+        entry = self.__tables.pop(key, None)
+        if entry is not None:
+            self.__used_memory -= entry[0].nbytes
+
+        if entry is None or entry[0].shape[0] < min(length, entry[1]):
+            period = period_generator(frequency, sampling_frequency).astype(dtype)
+            max_table_length = max(1, _MAX_TABLE_SAMPLES // period.shape[0]) * period.shape[0]
+            # grow (at least) geometrically, so slowly increasing lengths do not rebuild the table every time
+            table_length = max(length, 2 * entry[0].shape[0]) if entry is not None else length
+            table = np.tile(period, -(-min(table_length, max_table_length) // period.shape[0]))
+            table.flags.writeable = False
+            entry = (table, max_table_length)
+
+        table = entry[0]
+        if table.nbytes <= self.__memory_limit:
+            self.__tables[key] = entry
+            self.__used_memory += table.nbytes
+            self.__evict()
+
+        if length <= table.shape[0]:
+            return table[:length]
+
+        # the table consists of whole periods, so repeating it continues the signal
+        signal = np.resize(table, length)
+        signal.flags.writeable = False
+        return signal
+
+    def __evict(self) -> None:
+        while self.__used_memory > self.__memory_limit:
+            _, (evicted, _) = self.__tables.popitem(last=False)
+            self.__used_memory -= evicted.nbytes
+
+    @property
+    def used_memory(self) -> int:
+        return self.__used_memory
+
+    def clear(self) -> None:
+        self.__tables.clear()
+        self.__used_memory = 0
+
+
+_oscillator_bank = _OscillatorBank()
+
+
+def _sine_period(frequency: int, sampling_frequency: int) -> npt.NDArray[np.float64]:
+    # the sine repeats after the smallest number of samples, which contains a whole number of its periods
+    period = sampling_frequency // gcd(frequency, sampling_frequency)
+    # reducing the phase with integer arithmetic keeps the arguments of sin small (and exact)
+    phase_steps = np.arange(period, dtype=np.int64) * frequency % sampling_frequency
+    return np.sin(2 * np.pi / sampling_frequency * phase_steps)
+
+
+def _clicking_period(frequency: int, sampling_frequency: int) -> npt.NDArray[np.float64]:
+    half_period = sampling_frequency // (frequency * 2)
+    return np.repeat(np.array([1.0, -1.0]), half_period)
+
+
 def sine_signal(length: int,
                 frequency: int,
-                sampling_frequency: int) -> npt.NDArray[np.float32]:
+                sampling_frequency: int,
+                dtype: type = np.float32) -> npt.NDArray[np.float32]:
     """Used to generate the modulating sine signal of the given length.
 
     :param length: The length in samples of the modulating ASSR signal.
     :param frequency: The frequency of the sine wave.
     :param sampling_frequency: The sampling frequency of the signal.
-    :return: The modulating ASSR sine wave.
+    :param dtype: The type of the signal. np.float64 is used where the signal is accumulated (e.g. by the FMTagger).
+    :return: The modulating ASSR sine wave (read-only).
     """
     __common_stimulus_generation_tests(length, frequency, sampling_frequency)
 
-    signal = np.sin(frequency / sampling_frequency * 2 * np.pi * np.arange(length))
+    signal = _oscillator_bank.get(_sine_period, length, frequency, sampling_frequency, dtype)
     assert signal.shape[0] == length
     assert len(signal.shape) == 1
 
     return signal
 
 
+def sine_signals(length: int,
+                 frequencies: Sequence[int],
+                 sampling_frequency: int,
+                 dtype: type = np.float32) -> npt.NDArray[np.float32]:
+    """Generates a sine signal of the given length for each of the given frequencies at once. Row k is equal to
+    sine_signal(length, frequencies[k], sampling_frequency, dtype).
+
+    :param length: The length in samples of the signals.
+    :param frequencies: The frequencies of the sine waves.
+    :param sampling_frequency: The sampling frequency of the signals.
+    :param dtype: The type of the signals.
+    :return: The sine waves, one per row (KxN).
+    """
+    for frequency in frequencies:
+        __common_stimulus_generation_tests(length, frequency, sampling_frequency)
+
+    # the same integer phase reduction as in _sine_period, for all frequencies and samples at once
+    phase_steps = np.multiply.outer(np.asarray(frequencies, dtype=np.int64), np.arange(length, dtype=np.int64))
+    phase_steps %= sampling_frequency
+    signals = np.sin(2 * np.pi / sampling_frequency * phase_steps).astype(dtype, copy=False)
+    assert signals.shape == (len(frequencies), length)
+
+    return signals
+
+
 def clicking_signal(length: int,
                     frequency: int,
                     sampling_frequency: int) -> npt.NDArray[np.float32]:
@@ -49,7 +175,7 @@ def clicking_signal(length: int,
     :param length: The length in samples of the modulating ASSR signal.
     :param frequency: The frequency of the to be generated signal.
     :param sampling_frequency: The sampling frequency of the signal.
-    :return: The modulating ASSR clicking signal.
+    :return: The modulating ASSR clicking signal (read-only).
     """
     __common_stimulus_generation_tests(length, frequency, sampling_frequency)
 
@@ -59,18 +185,5 @@ def clicking_signal(length: int,
     if sampling_frequency // (frequency * 2) != sampling_frequency / (frequency * 2):
         raise ValueError("The frequency has to be fully divisible by the audio sampling frequency!")
 
-    # set all values to 1 as default
-    signal = np.ones(length)
-
-    # set all necessary to -1
-    first = sampling_frequency // (frequency * 2)
-    step = sampling_frequency // frequency
-    for i in range(first, length, step):
-        # calculate modified interval end. If the interval end is out of range, set it to the range
-        interval_end = i + step // 2
-        if i + step // 2 > length:
-            interval_end = length
-
-        signal[i:interval_end] = -np.ones(interval_end - i)
-
-    return signal
+    # the signal starts with half a period of 1, followed by half a period of -1
+    return _oscillator_bank.get(_clicking_period, length, frequency, sampling_frequency)
@@ -0,0 +1,127 @@
+from typing import Sequence, Tuple, List, Dict, Hashable, Any, Optional, Collection
+
+import numpy as np
+import numpy.typing as npt
+
+from auditory_stimulation.audio import Audio
+from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger, AEnvelopeTagger, _broadcast_signal
+
+
+def _is_in_unit_range(array: npt.NDArray[np.floating]) -> bool:
+    return array.size == 0 or max(np.max(array), -np.min(array)) <= 1
+
+
+class TaggerChain(AAudioTagger):
+    """Applies several taggers one after another to the same intervals, e.g. an AMTagger on top of a
+    NoiseTaggingTagger. Every chunk is modified by all taggers one after another, so for intervals, which do not
+    overlap, the result is the same as calling create of every tagger on the result of the previous one. Instead of
+    creating a new audio for every tagger, the chunk passes through all taggers in a single buffer, and consecutive
+    envelope taggers (see AEnvelopeTagger) are folded into a single multiplication.
+    """
+    __taggers: Tuple[AAudioTagger, ...]
+    __stages: List[Tuple[AAudioTagger, ...]]  # consecutive envelope taggers form one stage, any other tagger its own
+
+    def __init__(self, taggers: Sequence[AAudioTagger]) -> None:
+        """Constructs the TaggerChain object
+
+        :param taggers: The taggers in the order, in which they are applied.
+        """
+        if len(taggers) == 0:
+            raise ValueError("A tagger chain needs at least one tagger!")
+
+        for tagger in taggers:
+            if not isinstance(tagger, AAudioTagger):
+                raise TypeError("All elements of a tagger chain must be taggers!")
+
+        self.__taggers = tuple(taggers)
+
+        self.__stages = []
+        for tagger in self.__taggers:
+            is_envelope = isinstance(tagger, AEnvelopeTagger)
+            if is_envelope and len(self.__stages) > 0 and isinstance(self.__stages[-1][0], AEnvelopeTagger):
+                self.__stages[-1] += (tagger,)
+            else:
+                self.__stages.append((tagger,))
+
+    @staticmethod
+    def __fold_envelopes(stage: Tuple[AEnvelopeTagger, ...], length: int, fs: int) -> Optional[npt.NDArray[np.float32]]:
+        """Returns the product of the envelopes of the stage, or None if any envelope leaves [-1, 1]. Only then, none of
+        the taggers has to scale down its result, and multiplying with the product is the same as applying the taggers
+        one after another."""
+        product = np.ones(length, dtype=np.float32)
+        for tagger in stage:
+            envelope = tagger._envelope(length, fs)
+            if not _is_in_unit_range(envelope):
+                return None
+            np.multiply(product, envelope, out=product, casting="same_kind")
+
+        return product
+
+    def _modify_chunk(self, audio_array_chunk: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
+        modified_chunk = np.array(audio_array_chunk, dtype=np.float32)
+        self._modify_chunk_into(modified_chunk, fs, modified_chunk)
+        return modified_chunk
+
+    def _modify_chunk_into(self,
+                           audio_array_chunk: npt.NDArray[np.float32],
+                           fs: int,
+                           out: npt.NDArray[np.float32]) -> None:
+        if out is not audio_array_chunk:
+            np.copyto(out, audio_array_chunk)
+
+        for stage in self.__stages:
+            if isinstance(stage[0], AEnvelopeTagger) and _is_in_unit_range(out):
+                envelope = self.__fold_envelopes(stage, out.shape[0], fs)
+                if envelope is not None:
+                    out *= _broadcast_signal(envelope)
+                    continue
+
+            for tagger in stage:
+                tagger._modify_chunk_into(out, fs, out)
+
+    def _modify_chunks(self, audio_array_chunks: npt.NDArray[np.float32], fs: int) -> npt.NDArray[np.float32]:
+        modified_chunks = np.array(audio_array_chunks, dtype=np.float32)
+
+        for stage in self.__stages:
+            if isinstance(stage[0], AEnvelopeTagger) and _is_in_unit_range(modified_chunks):
+                envelope = self.__fold_envelopes(stage, modified_chunks.shape[1], fs)
+                if envelope is not None:
+                    modified_chunks *= envelope[np.newaxis, :, np.newaxis]
+                    continue
+
+            for tagger in stage:
+                modified_chunks = tagger._modify_chunks(modified_chunks, fs)
+
+        return modified_chunks
+
+    def create(self,
+               audio: Audio,
+               stimuli_intervals: Collection[Tuple[float, float]],
+               out: Optional[npt.NDArray[np.float32]] = None) -> Audio:
+        # the chain always modifies the intervals in place, so every chunk passes through all taggers in one buffer
+        self._validate_input(audio, stimuli_intervals)
+        if out is None:
+            out = np.empty(audio.array.shape, dtype=np.float32)
+
+        return self._create_into(audio, stimuli_intervals, out)
+
+    @property
+    def taggers(self) -> Tuple[AAudioTagger, ...]:
+        return self.__taggers
+
+    def _spec_params(self) -> Dict[str, Hashable]:
+        return {"taggers": tuple(tagger.spec for tagger in self.__taggers)}
+
+    @classmethod
+    def _from_spec_params(cls, params: Dict[str, Any]) -> "TaggerChain":
+        return cls([AAudioTagger.from_spec(spec) for spec in params["taggers"]])
+
+    def _cache_key(self) -> Optional[Hashable]:
+        # the chain is only cached, if every tagger of it may be cached
+        keys = tuple(tagger._cache_key() for tagger in self.__taggers)
+        if any(key is None for key in keys):
+            return None
+        return "TaggerChain", keys
+
+    def __repr__(self) -> str:
+        return self._get_repr("TaggerChain", taggers=f"[{', '.join(repr(tagger) for tagger in self.__taggers)}]")
@@ -0,0 +1,147 @@
+"""A cache of modified chunks, shared by all taggers. The same number clip is tagged by the same tagger over and over
+again during the generation of the stimuli, so the result of a tagger is kept for every (tagger, chunk, sampling
+frequency) and reused, instead of being computed again. The cache is disabled by default, see set_tagging_cache.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, Hashable, Tuple, Iterator
+
+import numpy as np
+import numpy.typing as npt
+
+CacheKey = Tuple[Hashable, bytes, int]  # (key of the tagger, digest of the chunk, sampling frequency)
+
+
+class TaggingCache:
+    """Keeps the most recently modified chunks in memory. The kept chunks are shared, hence they are read-only. Once the
+    memory limit is exceeded, the least recently used chunks are evicted."""
+    __memory_limit: int
+
+    __chunks: "OrderedDict[CacheKey, npt.NDArray[np.float32]]"
+    __used_memory: int
+    __hits: int
+    __misses: int
+
+    def __init__(self, memory_limit: int) -> None:
+        """Constructs the TaggingCache object
+
+        :param memory_limit: The maximum amount of bytes used by the kept chunks. Chunks larger than the limit are not
+         kept at all.
+        """
+        if memory_limit < 0:
+            raise ValueError("The memory limit must be a non-negative integer!")
+
+        self.__memory_limit = memory_limit
+
+        self.__chunks = OrderedDict()
+        self.__used_memory = 0
+        self.__hits = 0
+        self.__misses = 0
+
+    def get(self, key: CacheKey) -> Optional[npt.NDArray[np.float32]]:
+        """Returns the kept chunk for the given key and counts the lookup as hit or miss.
+
+        :param key: The key of the modified chunk.
+        :return: The (read-only) modified chunk, or None if it is not kept.
+        """
+        chunk = self.__chunks.get(key)
+        if chunk is None:
+            self.__misses += 1
+            return None
+
+        self.__hits += 1
+        self.__chunks.move_to_end(key)
+        return chunk
+
+    def put(self, key: CacheKey, modified_chunk: npt.NDArray[np.floating]) -> npt.NDArray[np.float32]:
+        """Keeps a float32 copy of the given modified chunk.
+
+        :param key: The key of the modified chunk.
+        :param modified_chunk: The modified chunk, as returned by the tagger.
+        :return: The kept (read-only) copy.
+        """
+        chunk = np.array(modified_chunk, dtype=np.float32)
+        chunk.flags.writeable = False
+
+        if chunk.nbytes > self.__memory_limit:
+            return chunk
+
+        previous = self.__chunks.pop(key, None)
+        if previous is not None:
+            self.__used_memory -= previous.nbytes
+
+        self.__chunks[key] = chunk
+        self.__used_memory += chunk.nbytes
+        self.__evict()
+
+        return chunk
+
+    def __evict(self) -> None:
+        while self.__used_memory > self.__memory_limit:
+            _, evicted = self.__chunks.popitem(last=False)
+            self.__used_memory -= evicted.nbytes
+
+    def clear(self) -> None:
+        """Removes all chunks from memory and resets the counters."""
+        self.__chunks.clear()
+        self.__used_memory = 0
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def memory_limit(self) -> int:
+        return self.__memory_limit
+
+    @property
+    def used_memory(self) -> int:
+        return self.__used_memory
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def __len__(self) -> int:
+        return len(self.__chunks)
+
+    def __repr__(self) -> str:
+        return f"TaggingCache(memory_limit={self.__memory_limit}, used_memory={self.__used_memory}, " \
+               f"hits={self.__hits}, misses={self.__misses})"
+
+
+_tagging_cache: Optional[TaggingCache] = None
+
+
+def get_tagging_cache() -> Optional[TaggingCache]:
+    return _tagging_cache
+
+
+def set_tagging_cache(cache: Optional[TaggingCache]) -> None:
+    """Sets the cache used by all taggers for the entire process.
+
+    :param cache: The new cache, or None to disable caching.
+    :return: None
+    """
+    global _tagging_cache
+
+    if cache is not None and not isinstance(cache, TaggingCache):
+        raise TypeError("The cache must be a TaggingCache or None!")
+
+    _tagging_cache = cache
+
+
+@contextmanager
+def tagging_cache(cache: Optional[TaggingCache]) -> Iterator[None]:
+    """Temporarily changes the cache used by all taggers. The previous cache is restored when the context is exited.
+
+    :param cache: The cache used inside the context, or None to disable caching.
+    """
+    previous = get_tagging_cache()
+    set_tagging_cache(cache)
+    try:
+        yield
+    finally:
+        set_tagging_cache(previous)
@@ -6,6 +6,7 @@ from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger
 from auditory_stimulation.auditory_tagging.noise_tagging_tagger import NoiseTaggingTagger
 from auditory_stimulation.auditory_tagging.raw_tagger import RawTagger
 from auditory_stimulation.auditory_tagging.shift_tagger import SpectrumShiftTagger, ShiftSumTagger, BinauralTagger
+from auditory_stimulation.auditory_tagging.tagger_chain import TaggerChain
 from auditory_stimulation.model.experiment_state import EExperimentState
 from auditory_stimulation.model.model_update_identifier import EModelUpdateIdentifier
 
@@ -90,7 +91,8 @@ _TAGGER_LIST = [
     SpectrumShiftTagger,
     ShiftSumTagger,
     BinauralTagger,
-    NoiseTaggingTagger
+    NoiseTaggingTagger,
+    TaggerChain  # new taggers are appended, so the triggers of the existing taggers stay the same
 ]
 
 
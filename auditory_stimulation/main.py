@@ -7,18 +7,19 @@ from random import Random
 import psychopy.parallel
 import psychopy.visual
 
-from auditory_stimulation.auditory_tagging.assr_tagger import AMTagger, FMTagger
 from auditory_stimulation.auditory_tagging.raw_tagger import RawTagger
-from auditory_stimulation.auditory_tagging.shift_tagger import BinauralTagger
-from auditory_stimulation.auditory_tagging.tag_generators import sine_signal
+from auditory_stimulation.auditory_tagging.tagging_cache import TaggingCache, set_tagging_cache
 from auditory_stimulation.configuration import get_configuration_psychopy, get_configuration_yaml
 from auditory_stimulation.eeg.bittium_neur_one import BittiumTriggerSender
 from auditory_stimulation.eeg.file_trigger_sender import FileTriggerSender
 from auditory_stimulation.experiment import Experiment
 from auditory_stimulation.model.experiment_state import load_experiment_texts
+from auditory_stimulation.model.experiment_taggers import create_experiment_taggers
 from auditory_stimulation.model.logging import Logger
 from auditory_stimulation.model.model import Model
 from auditory_stimulation.model.stimulus import generate_example_stimuli, generate_stimuli
+from auditory_stimulation.model.pretagged_bank import open_pretagged_bank
+from auditory_stimulation.model.voice_bank import open_voice_bank
 from auditory_stimulation.view.psychopy_view import PsychopyView
 from auditory_stimulation.view.sound_players import psychopy_player
 from auditory_stimulation.view.view import ViewInterrupted
@@ -33,14 +34,7 @@ def main() -> None:
     defaults = get_configuration_yaml(pathlib.Path("configuration.yaml"))
     config = get_configuration_psychopy(defaults)
 
-    taggers = [AMTagger(42, sine_signal),
-               FMTagger(40, 100),
-               BinauralTagger(40),
-               RawTagger(),
-               AMTagger(42, sine_signal),
-               FMTagger(40, 100),
-               BinauralTagger(40),
-               RawTagger()]
+    taggers = create_experiment_taggers()
 
     day_id = f"{datetime.today().strftime('%Y-%m-%d-%H-%M-%S')}_subject-{config.subject_id}"
     logging_folder = config.logging_directory_path / day_id
@@ -49,6 +43,16 @@ def main() -> None:
     create_directory_if_not_exists(logging_folder)
     create_directory_if_not_exists(config.trigger_directory_path)
 
+    # the banks are shared by both generation calls, so every clip is only loaded once. Packed voice folders are read
+    # from their archive
+    voice_banks = [open_voice_bank(folder, compact=True) for folder in config.voices_folders]
+    # numbers pre-tagged by the pre-tagged bank builder are only concatenated, instead of being tagged again
+    pretagged_banks = [open_pretagged_bank(folder) for folder in config.voices_folders]
+
+    # the same number clips are tagged by the same taggers over and over again, so the tagged clips are cached while
+    # the stimuli are generated
+    set_tagging_cache(TaggingCache(memory_limit=512 * 1024 ** 2))
+
     # stimuli = load_stimuli(pathlib.Path("stimuli.yaml"))
     stimuli = generate_stimuli(n_repetitions=config.repetitions,
                                taggers=taggers,
@@ -57,8 +61,10 @@ def main() -> None:
                                intros_indices=config.intro_indices,
                                number_stimuli_interval=config.stimuli_numbers_interval,
                                intro_transcription_path=config.intros_transcription_path,
-                               voices_folders=config.voices_folders,
-                               rng=Random(config.subject_id))
+                               voice_banks=voice_banks,
+                               rng=Random(config.subject_id),
+                               compact_audio=True,
+                               pretagged_banks=[bank for bank in pretagged_banks if bank is not None])
 
     stimuli_prefixes = [
         "Each round starts with a primer number. Focus on this number, while you listen to the audio.",
@@ -75,8 +81,11 @@ def main() -> None:
                                                intros_indices=config.intro_indices,
                                                number_stimuli_interval=config.stimuli_numbers_interval,
                                                intro_transcription_path=config.intros_transcription_path,
-                                               voices_folders=config.voices_folders,
-                                               rng=Random(config.subject_id))
+                                               voice_banks=voice_banks,
+                                               rng=Random(config.subject_id),
+                                               compact_audio=True)
+
+    set_tagging_cache(None)
 
     model = Model(stimuli, example_stimuli)
 
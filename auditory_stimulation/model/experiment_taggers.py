@@ -0,0 +1,24 @@
+from typing import List
+
+from auditory_stimulation.auditory_tagging.assr_tagger import AMTagger, FMTagger
+from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger
+from auditory_stimulation.auditory_tagging.raw_tagger import RawTagger
+from auditory_stimulation.auditory_tagging.shift_tagger import BinauralTagger
+from auditory_stimulation.auditory_tagging.tag_generators import sine_signal
+
+
+def create_experiment_taggers() -> List[AAudioTagger]:
+    """Creates the taggers used in the experiment. Every tagger is used for one stimulus per block, so a tagger listed
+    twice is used for two stimuli per block. Shared by the experiment and the pre-tagged bank builder (see
+    pretagged_bank.py), so the clips are pre-tagged with exactly the taggers of the experiment.
+
+    :return: The taggers, in a fixed order.
+    """
+    return [AMTagger(42, sine_signal),
+            FMTagger(40, 100),
+            BinauralTagger(40),
+            RawTagger(),
+            AMTagger(42, sine_signal),
+            FMTagger(40, 100),
+            BinauralTagger(40),
+            RawTagger()]
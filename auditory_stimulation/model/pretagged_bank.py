@@ -0,0 +1,183 @@
+import json
+import pathlib
+import sys
+from os import PathLike
+from typing import Optional, Dict, Any, Sequence, List
+
+import numpy as np
+
+from auditory_stimulation.audio import Audio
+from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger
+from auditory_stimulation.model.experiment_taggers import create_experiment_taggers
+from auditory_stimulation.model.voice_bank import open_voice_bank
+
+_PRETAGGED_BLOB = "pretagged-bank.f32"
+_PRETAGGED_INDEX = "pretagged-bank.json"
+_PRETAGGED_VERSION = 1
+_PRETAGGED_DTYPE = np.dtype("<f4")
+
+
+def _tagger_key(tagger: AAudioTagger) -> Optional[str]:
+    """The key identifying the pre-tagged clips of the tagger, or None if the tagger cannot be pre-tagged."""
+    cache_key = tagger._cache_key()
+    return repr(cache_key) if cache_key is not None else None
+
+
+class PretaggedBank:
+    """Provides the number clips of one voice, as already tagged by the taggers of the experiment. The clips are
+    rendered ahead of time by build_pretagged_bank and stored as float32 samples, in an archive next to the clips of the
+    voice. The archive is memory-mapped, and every pre-tagged clip is a (read-only) slice of it.
+
+    A pre-tagged clip is only handed out, if the untagged clip it was rendered from is still the same (e.g. it was not
+    re-recorded or resampled since), otherwise the clip needs to be tagged as usual.
+    """
+    __folder: pathlib.Path
+    __index: Dict[str, Dict[str, Any]]
+    __samples: np.ndarray
+
+    __verified: Dict[str, str]  # name of the clip -> digest of the untagged clip, which was checked already
+
+    def __init__(self, folder: PathLike) -> None:
+        """Constructs the PretaggedBank object
+
+        :param folder: The folder of the voice, containing the archive created by build_pretagged_bank.
+        """
+        self.__folder = pathlib.Path(folder)
+
+        with open(self.__folder / _PRETAGGED_INDEX, "r") as file:
+            index = json.load(file)
+
+        if index.get("version") != _PRETAGGED_VERSION:
+            raise ValueError(f"The pre-tagged bank in {self.__folder} has an unsupported version! Please build it "
+                             f"again.")
+
+        self.__index = index["taggers"]
+
+        blob_path = self.__folder / _PRETAGGED_BLOB
+        if blob_path.stat().st_size == 0:
+            self.__samples = np.empty(0, dtype=_PRETAGGED_DTYPE)
+        else:
+            self.__samples = np.memmap(blob_path, dtype=_PRETAGGED_DTYPE, mode="r").view(np.ndarray)
+
+        self.__verified = {}
+
+    def __is_source(self, name: str, source: Audio, source_digest: str) -> bool:
+        # the digest of an untagged clip is only computed the first time the clip is looked up
+        if self.__verified.get(name) is None:
+            self.__verified[name] = source.digest.hex()
+        return self.__verified[name] == source_digest
+
+    def get(self, name: str, source: Audio, tagger: AAudioTagger) -> Optional[Audio]:
+        """Returns the given clip, tagged by the given tagger.
+
+        :param name: The name of the clip, e.g. "123".
+        :param source: The untagged clip, as used to generate the stimulus.
+        :param tagger: The tagger, with which the clip is tagged.
+        :return: The tagged clip (float32, read-only), or None if it was not pre-tagged from the given untagged clip.
+        """
+        key = _tagger_key(tagger)
+        if key is None or key not in self.__index or name not in self.__index[key]["clips"]:
+            return None
+
+        entry = self.__index[key]["clips"][name]
+        if entry["sampling_frequency"] != source.sampling_frequency or \
+                not self.__is_source(name, source, entry["source_digest"]):
+            return None
+
+        start = entry["offset"] // _PRETAGGED_DTYPE.itemsize
+        end = start + entry["n_frames"] * entry["n_channels"]
+
+        samples = self.__samples[start:end].reshape((entry["n_frames"], entry["n_channels"]))
+        return Audio(samples.astype(np.float32, copy=False), entry["sampling_frequency"])
+
+    @property
+    def folder(self) -> pathlib.Path:
+        return self.__folder
+
+    @property
+    def tagger_keys(self) -> List[str]:
+        """The keys of all pre-tagged taggers."""
+        return sorted(self.__index)
+
+    def __repr__(self) -> str:
+        return f"PretaggedBank(folder={self.__folder})"
+
+
+def build_pretagged_bank(folder: PathLike, taggers: Sequence[AAudioTagger]) -> List[AAudioTagger]:
+    """Tags all number clips (i.e. all clips, which are not intros) of a voice folder with each of the given taggers,
+    and stores the results in an archive in the folder itself. The archive consists of a blob containing the float32
+    samples of all tagged clips, and an index mapping each tagger and clip to its offset and length within the blob.
+
+    Only taggers with a key (see AAudioTagger._cache_key) can be pre-tagged; all others are skipped. Taggers with the
+    same key are rendered once.
+
+    :param folder: The folder of the voice, either containing a wav file for each clip or a packed voice bank.
+    :param taggers: The taggers, with which the clips are tagged.
+    :return: The taggers, for which the clips were rendered.
+    """
+    folder = pathlib.Path(folder)
+    voice_bank = open_voice_bank(folder)
+    names = [name for name in voice_bank.names if not name.startswith("intro")]
+
+    taggers_by_key: Dict[str, AAudioTagger] = {}
+    for tagger in taggers:
+        key = _tagger_key(tagger)
+        if key is not None:
+            taggers_by_key.setdefault(key, tagger)
+
+    # an index of a previous build would not match the new blob
+    (folder / _PRETAGGED_INDEX).unlink(missing_ok=True)
+
+    index: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    with open(folder / _PRETAGGED_BLOB, "wb") as blob:
+        for key, tagger in taggers_by_key.items():
+            clips: Dict[str, Dict[str, Any]] = {}
+            for name in names:
+                source = voice_bank.get(name)
+                tagged = tagger.create(source, [(0, source.secs)])
+                samples = tagged.array.astype(_PRETAGGED_DTYPE, copy=False)
+                blob.write(samples.tobytes())
+
+                clips[name] = {"offset": offset,
+                               "n_frames": samples.shape[0],
+                               "n_channels": samples.shape[1],
+                               "sampling_frequency": tagged.sampling_frequency,
+                               "source_digest": source.digest.hex()}
+                offset += samples.nbytes
+
+            index[key] = {"tagger": repr(tagger), "clips": clips}
+
+    # the index is written last, so an interrupted build does not leave a seemingly valid archive behind
+    with open(folder / _PRETAGGED_INDEX, "w") as file:
+        json.dump({"version": _PRETAGGED_VERSION, "taggers": index}, file, indent=1)
+
+    return list(taggers_by_key.values())
+
+
+def open_pretagged_bank(folder: PathLike) -> Optional[PretaggedBank]:
+    """Opens the pre-tagged bank of the given voice folder.
+
+    :param folder: The folder of the voice.
+    :return: The pre-tagged bank, or None if none was built for the folder.
+    """
+    if (pathlib.Path(folder) / _PRETAGGED_INDEX).exists():
+        return PretaggedBank(folder)
+    return None
+
+
+def main() -> None:
+    """Pre-tags the number clips of each voice folder given on the command line with the taggers of the experiment,
+    e.g.: python -m auditory_stimulation.model.pretagged_bank stimuli_sounds/eric stimuli_sounds/natasha
+    """
+    if len(sys.argv) < 2:
+        print("Usage: python -m auditory_stimulation.model.pretagged_bank <voice folder> [<voice folder> ...]")
+        sys.exit(1)
+
+    for folder in sys.argv[1:]:
+        rendered_taggers = build_pretagged_bank(pathlib.Path(folder), create_experiment_taggers())
+        print(f"Pre-tagged {folder} with {', '.join(repr(tagger) for tagger in rendered_taggers)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,8 +9,13 @@ from typing import List, Dict, Any, Tuple, Collection, Sequence, Optional
 import numpy as np
 import yaml
 
-from auditory_stimulation.audio import Audio, load_wav_as_audio
+from auditory_stimulation.audio import Audio, load_wav_as_audio, copy_as_float32, trusted_audio
 from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger
+from auditory_stimulation.model.pretagged_bank import PretaggedBank
+from auditory_stimulation.model.voice_bank import VoiceBank
+
+# generate_stimuli tags the stimuli, once their untagged audio reaches this many bytes
+_TAGGING_BATCH_BYTES = 2 ** 28
 
 
 @dataclass(frozen=True)
@@ -132,34 +137,33 @@ def load_stimuli(path_to_yaml: PathLike) -> List[Stimulus]:
 
 def __combine_parts(intro: Audio,
                     number_audios: Collection[Audio],
-                    break_length: float = 0.5) -> Audio:
-    audio_break = np.zeros((int(break_length * intro.sampling_frequency), 2), dtype=np.float32)
-
-    stimulus_array = intro.array
-    first = True
-    for num in number_audios:
-        if not first:
-            stimulus_array = np.append(stimulus_array, audio_break, axis=0)
-
-        stimulus_array = np.append(stimulus_array, num.array, axis=0)
-        first = False
+                    break_length: float = 0.5) -> Tuple[Audio, Collection[Tuple[float, float]]]:
+    """Concatenates the intro and the options, separated (and followed) by breaks of silence. The length of the result
+    is computed upfront, so every part is written exactly once into a single buffer.
 
-    # add silence at the end of the audio to pad it
-    stimulus_array = np.append(stimulus_array, audio_break, axis=0)
+    :return: The combined audio and the time stamps of the options within it.
+    """
+    fs = intro.sampling_frequency
+    n_break = int(break_length * fs)
+    n_intro = intro.array.shape[0]
+    n_options = [audio.array.shape[0] for audio in number_audios]
 
-    return Audio(stimulus_array, intro.sampling_frequency)
+    # every option is followed by a break; if there are no options, the intro is followed by one
+    n_total = n_intro + sum(n_options) + n_break * max(len(n_options), 1)
 
+    stimulus_array = np.zeros((n_total, intro.array.shape[1]), dtype=np.float32)
+    copy_as_float32(intro.array, stimulus_array[:n_intro])
 
-def __extract_time_stamps(intro: Audio,
-                          number_audios: Collection[Audio],
-                          break_length: float = 0.5) -> Collection[Tuple[float, float]]:
-    previous = intro.secs
-    time_stamps = []
-    for audio in number_audios:
-        time_stamps.append((previous, audio.secs + previous))
-        previous = time_stamps[-1][1] + break_length
+    sample_intervals = []
+    position = n_intro
+    for audio, n_option in zip(number_audios, n_options):
+        copy_as_float32(audio.array, stimulus_array[position:position + n_option])
+        sample_intervals.append((position, position + n_option))
+        position += n_option + n_break
 
-    return time_stamps
+    time_stamps = [(start / fs, end / fs) for start, end in sample_intervals]
+    # the buffer only holds silence and the samples of the (already checked) parts
+    return trusted_audio(stimulus_array, fs), time_stamps
 
 
 def __look_up_intro_text(n_intro: int, input_text_dict: Dict[str, str]) -> str:
@@ -183,13 +187,123 @@ def __generate_prompt(input_text: str, prompted_numbers: Collection[str]) -> str
     return prompt
 
 
+@dataclass(frozen=True)
+class _UntaggedStimulus:
+    """All parts of a stimulus, before its audio is tagged. Attention check stimuli have no target index. If the audio
+    was combined from pre-tagged options, it is tagged already."""
+    audio: Audio
+    tagger: AAudioTagger
+    prompt: str
+    primer: str
+    options: Sequence[str]
+    time_stamps: Sequence[Tuple[float, float]]
+    target_index: Optional[int]
+    is_tagged: bool = False
+
+
+def __prepare_stimulus(intro_audio: Audio,
+                       intro_text: str,
+                       option_audios: Sequence[Audio],
+                       option_texts: Sequence[str],
+                       target: int,
+                       pause_secs: float,
+                       tagger: AAudioTagger,
+                       is_tagged: bool = False) -> _UntaggedStimulus:
+    if len(option_texts) != len(option_audios):
+        raise ValueError("The same number of number_audios and number_texts must be provided")
+
+    if pause_secs < 0:
+        raise ValueError("Pause secs must be non-negative")
+
+    if target >= len(option_audios):
+        raise ValueError("Target must be contained within number_audios/number_texts")
+
+    if target < 0:
+        raise ValueError("Target must be a non-negative integer")
+
+    audio, time_stamps = __combine_parts(intro_audio, option_audios, pause_secs)
+    prompt = __generate_prompt(intro_text, option_texts)
+    primer = option_texts[target]  # given the target, creates a primer sentence
+
+    return _UntaggedStimulus(audio, tagger, prompt, primer, option_texts, time_stamps, target, is_tagged)
+
+
+def __prepare_attention_check_stimulus(intro_audio: Audio,
+                                       intro_text: str,
+                                       option_audios: Sequence[Audio],
+                                       option_texts: Sequence[str],
+                                       pause_secs: float,
+                                       primer: str,
+                                       tagger: AAudioTagger,
+                                       is_tagged: bool = False) -> _UntaggedStimulus:
+    if len(option_texts) != len(option_audios):
+        raise ValueError("The same number of number_audios and number_texts must be provided")
+
+    if pause_secs < 0:
+        raise ValueError("Pause secs must be non-negative")
+
+    audio, time_stamps = __combine_parts(intro_audio, option_audios, pause_secs)
+    prompt = __generate_prompt(intro_text, option_texts)
+
+    return _UntaggedStimulus(audio, tagger, prompt, primer, option_texts, time_stamps, None, is_tagged)
+
+
+def __finish_stimulus(untagged_stimulus: _UntaggedStimulus, tagged_audio: Audio, compact_audio: bool) -> AStimulus:
+    if compact_audio:
+        tagged_audio = tagged_audio.compact()
+
+    if untagged_stimulus.target_index is None:
+        return AttentionCheckStimulus(audio=tagged_audio,
+                                      used_tagger=untagged_stimulus.tagger,
+                                      prompt=untagged_stimulus.prompt,
+                                      primer=untagged_stimulus.primer,
+                                      options=untagged_stimulus.options,
+                                      time_stamps=untagged_stimulus.time_stamps)
+
+    return Stimulus(audio=tagged_audio,
+                    used_tagger=untagged_stimulus.tagger,
+                    prompt=untagged_stimulus.prompt,
+                    primer=untagged_stimulus.primer,
+                    options=untagged_stimulus.options,
+                    time_stamps=untagged_stimulus.time_stamps,
+                    target_index=untagged_stimulus.target_index)
+
+
+def __tag_stimuli(untagged_stimuli: Sequence[_UntaggedStimulus], compact_audio: bool) -> List[AStimulus]:
+    """Tags the audio of all given stimuli, which are not tagged already, with one create_many call per tagger. If the
+    audio is stored compactly, the tagged audios of a tagger are compacted before the next tagger runs.
+
+    :return: The finished stimuli, in the same order as the given ones.
+    """
+    tagged_audios: List[Optional[Audio]] = [None] * len(untagged_stimuli)
+
+    indices_per_tagger: Dict[int, List[int]] = {}
+    for index, untagged_stimulus in enumerate(untagged_stimuli):
+        if untagged_stimulus.is_tagged:
+            tagged_audios[index] = untagged_stimulus.audio
+        else:
+            indices_per_tagger.setdefault(id(untagged_stimulus.tagger), []).append(index)
+
+    for indices in indices_per_tagger.values():
+        tagger = untagged_stimuli[indices[0]].tagger
+        audios = tagger.create_many([untagged_stimuli[index].audio for index in indices],
+                                    [untagged_stimuli[index].time_stamps for index in indices])
+
+        for index, audio in zip(indices, audios):
+            tagged_audios[index] = audio.compact() if compact_audio else audio
+
+    return [__finish_stimulus(untagged_stimulus, tagged_audio, compact_audio)
+            for untagged_stimulus, tagged_audio in zip(untagged_stimuli, tagged_audios)]
+
+
 def generate_stimulus(intro_audio: Audio,
                       intro_text: str,
                       option_audios: Sequence[Audio],
                       option_texts: Sequence[str],
                       target: int,
                       pause_secs: float,
-                      tagger: AAudioTagger) -> Stimulus:
+                      tagger: AAudioTagger,
+                      compact_audio: bool = False) -> Stimulus:
     """Constructs a stimulus instance by combining the given parameters.
 
     :param intro_audio: An audio, containing a short introduction to the generated stimulus.
@@ -199,35 +313,15 @@ def generate_stimulus(intro_audio: Audio,
     :param target: An index, determining which of the options is the target of the stimulus.
     :param pause_secs: How long, in seconds, the break between two options is.
     :param tagger: The tagger used to generate the stimulus.
+    :param compact_audio: Whether the audio of the stimulus is stored compactly (16 bit PCM).
     :return:
     """
+    untagged_stimulus = __prepare_stimulus(intro_audio, intro_text, option_audios, option_texts, target, pause_secs,
+                                           tagger)
+    tagged_audio = tagger.create(untagged_stimulus.audio, untagged_stimulus.time_stamps)
 
-    if len(option_texts) != len(option_audios):
-        raise ValueError("The same number of number_audios and number_texts must be provided")
-
-    if pause_secs < 0:
-        raise ValueError("Pause secs must be non-negative")
-
-    if target >= len(option_audios):
-        raise ValueError("Target must be contained within number_audios/number_texts")
-
-    if target < 0:
-        raise ValueError("Target must be a non-negative integer")
-
-    audio = __combine_parts(intro_audio, option_audios, pause_secs)
-    time_stamps = __extract_time_stamps(intro_audio, option_audios, pause_secs)
-    prompt = __generate_prompt(intro_text, option_texts)
-    primer = option_texts[target]  # given the target, creates a primer sentence
-
-    tagged_audio = tagger.create(audio, time_stamps)
-
-    stimulus = Stimulus(audio=tagged_audio,
-                        used_tagger=tagger,
-                        prompt=prompt,
-                        primer=primer,
-                        options=option_texts,
-                        time_stamps=time_stamps,
-                        target_index=target)
+    stimulus = __finish_stimulus(untagged_stimulus, tagged_audio, compact_audio)
+    assert isinstance(stimulus, Stimulus)
     return stimulus
 
 
@@ -237,7 +331,8 @@ def generate_attention_check_stimulus(intro_audio: Audio,
                                       option_texts: Sequence[str],
                                       pause_secs: float,
                                       primer: str,
-                                      tagger: AAudioTagger) -> AttentionCheckStimulus:
+                                      tagger: AAudioTagger,
+                                      compact_audio: bool = False) -> AttentionCheckStimulus:
     """Constructs an AttentionCheckStimulus instance by combining the given parameters.
 
     :param intro_audio: An audio, containing a short introduction to the generated stimulus.
@@ -247,27 +342,15 @@ def generate_attention_check_stimulus(intro_audio: Audio,
     :param pause_secs: How long, in seconds, the break between two options is.
     :param primer: The shown primer.
     :param tagger: The tagger used to generate the stimulus.
+    :param compact_audio: Whether the audio of the stimulus is stored compactly (16 bit PCM).
     :return:
     """
+    untagged_stimulus = __prepare_attention_check_stimulus(intro_audio, intro_text, option_audios, option_texts,
+                                                           pause_secs, primer, tagger)
+    tagged_audio = tagger.create(untagged_stimulus.audio, untagged_stimulus.time_stamps)
 
-    if len(option_texts) != len(option_audios):
-        raise ValueError("The same number of number_audios and number_texts must be provided")
-
-    if pause_secs < 0:
-        raise ValueError("Pause secs must be non-negative")
-
-    audio = __combine_parts(intro_audio, option_audios, pause_secs)
-    time_stamps = __extract_time_stamps(intro_audio, option_audios, pause_secs)
-    prompt = __generate_prompt(intro_text, option_texts)
-
-    tagged_audio = tagger.create(audio, time_stamps)
-
-    stimulus = AttentionCheckStimulus(audio=tagged_audio,
-                                      used_tagger=tagger,
-                                      prompt=prompt,
-                                      primer=primer,
-                                      options=option_texts,
-                                      time_stamps=time_stamps)
+    stimulus = __finish_stimulus(untagged_stimulus, tagged_audio, compact_audio)
+    assert isinstance(stimulus, AttentionCheckStimulus)
     return stimulus
 
 
@@ -276,12 +359,19 @@ def __make_generate_stimulus_parameters(target_number: int,
                                         intro_indices: Sequence[int],
                                         number_stimuli_interval: Tuple[int, int],
                                         input_text_dict: Dict[str, str],
-                                        voices_folders: List[pathlib.Path],
+                                        voice_banks: Sequence[VoiceBank],
                                         is_attention_check_stimulus: bool,
-                                        rng: Random) \
-        -> Tuple[Audio, str, Sequence[Audio], Sequence[str], Optional[int]]:
+                                        rng: Random,
+                                        tagger: Optional[AAudioTagger] = None,
+                                        pretagged_banks: Optional[Dict[pathlib.Path, PretaggedBank]] = None) \
+        -> Tuple[Audio, str, Sequence[Audio], Sequence[str], Optional[int], bool]:
+    """Draws the parts of a stimulus. If the tagger is given and pre-tagged clips are available for all drawn numbers
+    (see pretagged_bank.py), the pre-tagged clips are returned instead of the untagged ones.
+
+    :return: (intro, intro text, number audios, number texts, target, whether the number audios are tagged already)
+    """
     # randomly draw, which voice is used
-    voice_folder = rng.choice(voices_folders)
+    voice_bank = rng.choice(voice_banks)
 
     # randomly draw which of the intros will be used
     all_intros = list(input_text_dict.keys())
@@ -306,10 +396,10 @@ def __make_generate_stimulus_parameters(target_number: int,
         rng.shuffle(number_stimuli)
         target = number_stimuli.index(str(target_number))
 
-    # load the necessary audios to construct the stimulus
+    # get the necessary audios to construct the stimulus; each clip is only decoded the first time it is used
     try:
-        loaded_intro = load_wav_as_audio(voice_folder / f"{intro}.wav")
-        loaded_numbers = [load_wav_as_audio(voice_folder / f"{num}.wav") for num in number_stimuli]
+        loaded_intro = voice_bank.get(intro)
+        loaded_numbers = [voice_bank.get(num) for num in number_stimuli]
         assert all(loaded_intro.sampling_frequency == audio.sampling_frequency for audio in loaded_numbers)
 
     except FileNotFoundError as e:
@@ -317,7 +407,14 @@ def __make_generate_stimulus_parameters(target_number: int,
                                          f" Please check the installation section of the README!")
 
     assert len(loaded_numbers) == len(number_stimuli)
-    return loaded_intro, input_text_dict[intro], loaded_numbers, number_stimuli, target
+
+    pretagged_bank = pretagged_banks.get(voice_bank.folder) if pretagged_banks is not None else None
+    if tagger is not None and pretagged_bank is not None:
+        tagged_numbers = [pretagged_bank.get(num, audio, tagger) for num, audio in zip(number_stimuli, loaded_numbers)]
+        if all(audio is not None for audio in tagged_numbers):
+            return loaded_intro, input_text_dict[intro], tagged_numbers, number_stimuli, target, True
+
+    return loaded_intro, input_text_dict[intro], loaded_numbers, number_stimuli, target, False
 
 
 def generate_stimuli(n_repetitions: int,
@@ -327,8 +424,10 @@ def generate_stimuli(n_repetitions: int,
                      intros_indices: Sequence[int],
                      number_stimuli_interval: Tuple[int, int],
                      intro_transcription_path: PathLike,
-                     voices_folders: List[pathlib.Path],
-                     rng: Random) -> List[AStimulus]:
+                     voice_banks: Sequence[VoiceBank],
+                     rng: Random,
+                     compact_audio: bool = False,
+                     pretagged_banks: Sequence[PretaggedBank] = ()) -> List[AStimulus]:
     """Generates $len(taggers) * n_repetitions$ stimuli. The stimuli are generated in the following way:
      1. Repeat n_repetition times:
         2. A target number is generated.
@@ -338,6 +437,10 @@ def generate_stimuli(n_repetitions: int,
             6. Generate which numbers are added (count: n_stimuli - 1)
             7. Shuffle everything
             8. Construct a stimulus with the given parameters
+     The audios of the stimuli are tagged in batches of whole blocks, once the untagged audio of the batch reaches
+     _TAGGING_BATCH_BYTES, with one create_many call (see AAudioTagger.create_many) per tagger and batch. So only the
+     untagged (float32) audio of one batch is held at once, not that of the entire session. Stimuli, whose numbers were
+     pre-tagged (see pretagged_bank.py), are only concatenated from the pre-tagged clips.
 
     :param n_repetitions: How often each block will be repeated
     :param taggers: The used taggers.
@@ -346,19 +449,28 @@ def generate_stimuli(n_repetitions: int,
     :param intros_indices: The indices of the intros which will be used in the generated stimuli.
     :param number_stimuli_interval: Defines from what number interval the stimuli will be drawn.
     :param intro_transcription_path: The path to the intro transcription file.
-    :param voices_folders: Paths to all folders of voices available.
+    :param voice_banks: The voice banks of all available voices. Reusing the same banks across calls avoids loading
+     the clips again. To combine voices recorded at different sampling frequencies, let the banks resample the clips.
     :param rng: The random number generator, used to generate all items in this function.
+    :param compact_audio: Whether the audio of the stimuli is stored compactly (16 bit PCM). Halves the memory needed
+     to keep the stimuli around, the audio is converted when it is played.
+    :param pretagged_banks: The pre-tagged banks of (some of) the voices. A pre-tagged bank is used for the voice bank
+     of the same folder.
     :return: A list of the generated stimuli.
     """
 
     if n_stimuli <= 0:
         raise ValueError("n_stimuli must be a positive integer!")
 
+    pretagged_banks_by_folder = {pretagged_bank.folder: pretagged_bank for pretagged_bank in pretagged_banks}
+
     with open(intro_transcription_path, 'r') as file:
         input_text_dict_raw = yaml.safe_load(file)
     input_text_dict = {key: input_text_dict_raw[key][0] for key in input_text_dict_raw}
 
     stimuli: List[AStimulus] = []
+    untagged_stimuli: List[_UntaggedStimulus] = []
+    n_untagged_bytes = 0
     for i in range(n_repetitions):
 
         # draw what target is used
@@ -367,55 +479,69 @@ def generate_stimuli(n_repetitions: int,
         taggers_clone = taggers.copy()
         rng.shuffle(taggers_clone)
 
-        block_of_stimuli: List[AStimulus] = []
+        block_of_stimuli: List[_UntaggedStimulus] = []
         for tagger in taggers_clone:
-            loaded_intro, intro_text, loaded_numbers, number_stimuli, target \
+            loaded_intro, intro_text, loaded_numbers, number_stimuli, target, is_tagged \
                 = __make_generate_stimulus_parameters(target_number,
                                                       n_stimuli,
                                                       intros_indices,
                                                       number_stimuli_interval,
                                                       input_text_dict,
-                                                      voices_folders,
+                                                      voice_banks,
                                                       False,
-                                                      rng)
+                                                      rng,
+                                                      tagger,
+                                                      pretagged_banks_by_folder)
             assert target is not None
 
-            # generate stimulus
-            stimulus = generate_stimulus(loaded_intro,
-                                         intro_text,
-                                         loaded_numbers,
-                                         number_stimuli,
-                                         target,
-                                         pause_secs,
-                                         tagger)
+            # prepare the stimulus; it is tagged together with all other stimuli of the same tagger
+            stimulus = __prepare_stimulus(loaded_intro,
+                                          intro_text,
+                                          loaded_numbers,
+                                          number_stimuli,
+                                          target,
+                                          pause_secs,
+                                          tagger,
+                                          is_tagged)
             block_of_stimuli.append(stimulus)
 
         # TODO: I don't think this is the best place for this. An API user might not expect this function to do this.
 
         # generate an AttentionCheckStimulus
         attention_check_tagger = rng.choice(taggers_clone)
-        loaded_intro, intro_text, loaded_numbers, number_stimuli, target \
+        loaded_intro, intro_text, loaded_numbers, number_stimuli, target, is_tagged \
             = __make_generate_stimulus_parameters(target_number,
                                                   n_stimuli,
                                                   intros_indices,
                                                   number_stimuli_interval,
                                                   input_text_dict,
-                                                  voices_folders,
+                                                  voice_banks,
                                                   True,
-                                                  rng)
+                                                  rng,
+                                                  attention_check_tagger,
+                                                  pretagged_banks_by_folder)
         assert target is None
-        attention_check = generate_attention_check_stimulus(loaded_intro,
-                                                            intro_text,
-                                                            loaded_numbers,
-                                                            number_stimuli,
-                                                            pause_secs,
-                                                            str(target_number),
-                                                            attention_check_tagger)
+        attention_check = __prepare_attention_check_stimulus(loaded_intro,
+                                                             intro_text,
+                                                             loaded_numbers,
+                                                             number_stimuli,
+                                                             pause_secs,
+                                                             str(target_number),
+                                                             attention_check_tagger,
+                                                             is_tagged)
         block_of_stimuli.append(attention_check)
 
         # shuffle the block of stimuli and add them to the final list of stimuli
         rng.shuffle(block_of_stimuli)
-        stimuli += block_of_stimuli
+        untagged_stimuli += block_of_stimuli
+        n_untagged_bytes += sum(stimulus.audio.array.nbytes for stimulus in block_of_stimuli)
+
+        if n_untagged_bytes >= _TAGGING_BATCH_BYTES:
+            stimuli += __tag_stimuli(untagged_stimuli, compact_audio)
+            untagged_stimuli = []
+            n_untagged_bytes = 0
+
+    stimuli += __tag_stimuli(untagged_stimuli, compact_audio)
 
     # + 1 due to the attention check stimulus
     assert len(stimuli) == n_repetitions * (len(taggers) + 1)
@@ -430,8 +556,9 @@ def generate_example_stimuli(regular_stimuli_primer_prefix: Collection[str],
                              intros_indices: Sequence[int],
                              number_stimuli_interval: Tuple[int, int],
                              intro_transcription_path: PathLike,
-                             voices_folders: List[pathlib.Path],
-                             rng: Random) -> Collection[AStimulus]:
+                             voice_banks: Sequence[VoiceBank],
+                             rng: Random,
+                             compact_audio: bool = False) -> Collection[AStimulus]:
     """Generates a collection of stimuli to be used as an example for the experiment.
 
     TODO: The location of this function is not ideal as it incorporates a bit of experiment knowledge (how do I know
@@ -448,8 +575,9 @@ def generate_example_stimuli(regular_stimuli_primer_prefix: Collection[str],
     :param intros_indices: The indices of the intros which will be used in the generated stimuli.
     :param number_stimuli_interval: Defines from what number interval the stimuli will be drawn.
     :param intro_transcription_path: The path to the intro transcription file.
-    :param voices_folders: Paths to all folders of voices available.
+    :param voice_banks: The voice banks of all available voices.
     :param rng: The random number generator, used to generate all items in this function.
+    :param compact_audio: Whether the audio of the stimuli is stored compactly (16 bit PCM).
     :return: A list of the example stimuli.
     """
 
@@ -462,13 +590,13 @@ def generate_example_stimuli(regular_stimuli_primer_prefix: Collection[str],
     for tagger, prefix in zip(taggers, regular_stimuli_primer_prefix):
         # draw what target is used
 
-        loaded_intro, intro_text, loaded_numbers, number_stimuli, target \
+        loaded_intro, intro_text, loaded_numbers, number_stimuli, target, _ \
             = __make_generate_stimulus_parameters(target_number,
                                                   n_stimuli,
                                                   intros_indices,
                                                   number_stimuli_interval,
                                                   input_text_dict,
-                                                  voices_folders,
+                                                  voice_banks,
                                                   False,
                                                   rng)
         assert target is not None
@@ -480,7 +608,8 @@ def generate_example_stimuli(regular_stimuli_primer_prefix: Collection[str],
                                      number_stimuli,
                                      target,
                                      pause_secs,
-                                     tagger)
+                                     tagger,
+                                     compact_audio)
 
         new_primer = f"{stimulus.primer}\n\n{prefix}"
         new_stimulus = Stimulus(audio=stimulus.audio,
@@ -494,13 +623,13 @@ def generate_example_stimuli(regular_stimuli_primer_prefix: Collection[str],
         stimuli.append(new_stimulus)
 
     for prefix in attention_check_stimuli_primer_prefix:
-        loaded_intro, intro_text, loaded_numbers, number_stimuli, target \
+        loaded_intro, intro_text, loaded_numbers, number_stimuli, target, _ \
             = __make_generate_stimulus_parameters(target_number,
                                                   n_stimuli,
                                                   intros_indices,
                                                   number_stimuli_interval,
                                                   input_text_dict,
-                                                  voices_folders,
+                                                  voice_banks,
                                                   True,
                                                   rng)
         assert target is None
@@ -510,7 +639,8 @@ def generate_example_stimuli(regular_stimuli_primer_prefix: Collection[str],
                                                             number_stimuli,
                                                             pause_secs,
                                                             f"{str(target_number)}\n\n{prefix}",
-                                                            taggers[0])  # just pick the first tagger for all
+                                                            taggers[0],  # just pick the first tagger for all
+                                                            compact_audio)
         stimuli.append(attention_check)
 
     return stimuli
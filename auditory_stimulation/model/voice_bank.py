@@ -0,0 +1,271 @@
+import json
+import os
+import pathlib
+import sys
+from collections import OrderedDict
+from os import PathLike
+from typing import Optional, Dict, Any, List
+
+import numpy as np
+
+from auditory_stimulation.audio import Audio, load_wav_as_audio_memmap, is_pcm16_wav
+from auditory_stimulation.resampling import resample_audio
+
+_ARCHIVE_BLOB = "voice-bank.pcm"
+_ARCHIVE_INDEX = "voice-bank.json"
+_ARCHIVE_VERSION = 1
+_ARCHIVE_DTYPE = np.dtype("<i2")
+_TEMP_SUFFIX = ".tmp"
+
+
+class VoiceBank:
+    """Provides the clips (intros and numbers) of one voice. Every clip is decoded only once and then kept in memory, so
+    generating many stimuli from the same voice does not load the same wav file over and over again.
+
+    The handed out audios are shared, hence their arrays are read-only. If a memory limit is set, the least recently
+    used clips are evicted once the limit is exceeded.
+    """
+    __folder: pathlib.Path
+    __sampling_frequency: Optional[int]
+    __memory_limit: Optional[int]
+    __compact: bool
+
+    __clips: "OrderedDict[str, Audio]"
+    __used_memory: int
+
+    def __init__(self,
+                 folder: PathLike,
+                 sampling_frequency: Optional[int] = None,
+                 memory_limit: Optional[int] = None,
+                 compact: bool = False) -> None:
+        """Constructs the VoiceBank object
+
+        :param folder: The folder of the voice, containing a wav file for each clip.
+        :param sampling_frequency: If set, all clips are resampled to this sampling frequency when they are loaded.
+        :param memory_limit: If set, the maximum amount of bytes used by the kept clips. The most recently used clip is
+         always kept, even if it exceeds the limit by itself.
+        :param compact: Whether the clips are kept as compact (16 bit PCM) audio, halving the memory used.
+        """
+        if sampling_frequency is not None and sampling_frequency <= 0:
+            raise ValueError("The sampling frequency must be a positive integer!")
+
+        if memory_limit is not None and memory_limit < 0:
+            raise ValueError("The memory limit must be a non-negative integer!")
+
+        self.__folder = pathlib.Path(folder)
+        self.__sampling_frequency = sampling_frequency
+        self.__memory_limit = memory_limit
+        self.__compact = compact
+
+        self.__clips = OrderedDict()
+        self.__used_memory = 0
+
+    def _read_clip(self, name: str) -> Audio:
+        """Reads the clip with the given name, as it is stored.
+
+        :param name: The name of the clip, e.g. "intro-7" or "123".
+        :return: The read clip.
+        """
+        wav_path = self.__folder / f"{name}.wav"
+        # compact clips keep the 16 bit PCM samples of the file, as converting them to float32 and back is not lossless
+        return load_wav_as_audio_memmap(wav_path, compact=self.__compact and is_pcm16_wav(wav_path))
+
+    def _load_clip(self, name: str) -> Audio:
+        """Loads the clip with the given name and brings it into the form of this bank. Only called if the clip is not
+        kept in memory already.
+
+        :param name: The name of the clip, e.g. "intro-7" or "123".
+        :return: The loaded clip.
+        """
+        audio = self._read_clip(name)
+
+        if self.__sampling_frequency is not None:
+            audio = resample_audio(audio, self.__sampling_frequency)
+
+        if self.__compact:
+            audio = audio.compact()
+        else:
+            audio = audio.expand()
+
+        return audio
+
+    def __evict(self) -> None:
+        while self.__memory_limit is not None and self.__used_memory > self.__memory_limit and len(self.__clips) > 1:
+            _, evicted = self.__clips.popitem(last=False)
+            self.__used_memory -= evicted.array.nbytes
+
+    def get(self, name: str) -> Audio:
+        """Returns the clip with the given name, loading it if it is not kept in memory.
+
+        :param name: The name of the clip, e.g. "intro-7" or "123".
+        :return: The clip. Its array is read-only.
+        """
+        if name in self.__clips:
+            self.__clips.move_to_end(name)
+            return self.__clips[name]
+
+        audio = self._load_clip(name)
+        audio.array.flags.writeable = False
+
+        self.__clips[name] = audio
+        self.__used_memory += audio.array.nbytes
+        self.__evict()
+
+        return audio
+
+    def clear(self) -> None:
+        """Removes all clips from memory."""
+        self.__clips.clear()
+        self.__used_memory = 0
+
+    @property
+    def folder(self) -> pathlib.Path:
+        return self.__folder
+
+    @property
+    def used_memory(self) -> int:
+        return self.__used_memory
+
+    @property
+    def names(self) -> List[str]:
+        """The names of all clips of the voice, sorted."""
+        return sorted(wav_path.stem for wav_path in self.__folder.glob("*.wav"))
+
+    def __repr__(self) -> str:
+        return f"VoiceBank(folder={self.__folder}, sampling_frequency={self.__sampling_frequency}, " \
+               f"memory_limit={self.__memory_limit}, compact={self.__compact})"
+
+
+class PackedVoiceBank(VoiceBank):
+    """A VoiceBank reading its clips from the archive created by pack_voice_folder, instead of the separate wav files.
+    The archive is memory-mapped once, and every clip is a slice of it, so no further files are opened. If the clips
+    are kept compact and are not resampled, they are not even copied.
+
+    The archive is not updated automatically; after changing the wav files of the voice, the folder must be packed
+    again.
+    """
+    __index: Dict[str, Dict[str, Any]]
+    __samples: np.ndarray
+
+    def __init__(self,
+                 folder: PathLike,
+                 sampling_frequency: Optional[int] = None,
+                 memory_limit: Optional[int] = None,
+                 compact: bool = False) -> None:
+        """Constructs the PackedVoiceBank object
+
+        :param folder: The folder of the voice, containing the archive created by pack_voice_folder.
+        :param sampling_frequency: If set, all clips are resampled to this sampling frequency when they are loaded.
+        :param memory_limit: If set, the maximum amount of bytes used by the kept clips.
+        :param compact: Whether the clips are kept as compact (16 bit PCM) audio.
+        """
+        super().__init__(folder, sampling_frequency, memory_limit, compact)
+
+        with open(self.folder / _ARCHIVE_INDEX, "r") as file:
+            index = json.load(file)
+
+        if index.get("version") != _ARCHIVE_VERSION:
+            raise ValueError(f"The voice bank archive in {self.folder} has an unsupported version! Please pack the "
+                             f"folder again.")
+
+        self.__index = index["clips"]
+
+        blob_path = self.folder / _ARCHIVE_BLOB
+        if blob_path.stat().st_size == 0:
+            self.__samples = np.empty(0, dtype=_ARCHIVE_DTYPE)
+        else:
+            self.__samples = np.memmap(blob_path, dtype=_ARCHIVE_DTYPE, mode="r").view(np.ndarray)
+
+    def _read_clip(self, name: str) -> Audio:
+        if name not in self.__index:
+            raise FileNotFoundError(f"The clip {name} is not contained in the voice bank archive in {self.folder}!")
+
+        entry = self.__index[name]
+        start = entry["offset"] // _ARCHIVE_DTYPE.itemsize
+        end = start + entry["n_frames"] * entry["n_channels"]
+
+        samples = self.__samples[start:end].reshape((entry["n_frames"], entry["n_channels"]))
+        return Audio(samples, entry["sampling_frequency"])
+
+    @property
+    def names(self) -> List[str]:
+        return sorted(self.__index)
+
+    @property
+    def durations(self) -> Dict[str, float]:
+        """The duration in seconds of every clip in the archive, as stored (before any resampling)."""
+        return {name: entry["secs"] for name, entry in self.__index.items()}
+
+    def __repr__(self) -> str:
+        return "Packed" + super().__repr__()
+
+
+def pack_voice_folder(folder: PathLike) -> pathlib.Path:
+    """Packs all wav files of a voice folder into a single archive, stored in the folder itself. The archive consists of
+    a blob containing the 16 bit PCM samples of all clips and an index, mapping the name of each clip to its offset and
+    length within the blob, its sampling frequency and its duration. Only 16 bit PCM-wav files can be packed.
+
+    :param folder: The folder of the voice, containing a wav file for each clip.
+    :return: The path to the written blob.
+    """
+    folder = pathlib.Path(folder)
+    blob_path = folder / _ARCHIVE_BLOB
+    index_path = folder / _ARCHIVE_INDEX
+    # both files are written under temporary names and only moved into place once complete, so an interrupted packing
+    # neither truncates the blob of an existing archive nor leaves its index next to a blob it does not describe
+    temp_blob_path = folder / (_ARCHIVE_BLOB + _TEMP_SUFFIX)
+    temp_index_path = folder / (_ARCHIVE_INDEX + _TEMP_SUFFIX)
+
+    clips: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    with open(temp_blob_path, "wb") as blob:
+        for wav_path in sorted(folder.glob("*.wav")):
+            audio = load_wav_as_audio_memmap(wav_path, compact=True)
+            samples = audio.array.astype(_ARCHIVE_DTYPE, copy=False)
+            blob.write(samples.tobytes())
+
+            clips[wav_path.stem] = {"offset": offset,
+                                    "n_frames": samples.shape[0],
+                                    "n_channels": samples.shape[1],
+                                    "sampling_frequency": audio.sampling_frequency,
+                                    "secs": audio.secs}
+            offset += samples.nbytes
+
+    with open(temp_index_path, "w") as file:
+        json.dump({"version": _ARCHIVE_VERSION, "clips": clips}, file, indent=1)
+
+    # the old index is removed before the blob is replaced, so there is no moment at which it describes the new blob
+    index_path.unlink(missing_ok=True)
+    os.replace(temp_blob_path, blob_path)
+    os.replace(temp_index_path, index_path)
+
+    return blob_path
+
+
+def open_voice_bank(folder: PathLike,
+                    sampling_frequency: Optional[int] = None,
+                    memory_limit: Optional[int] = None,
+                    compact: bool = False) -> VoiceBank:
+    """Opens the voice bank of the given folder. If the folder was packed, the archive is used, otherwise the wav
+    files are loaded separately. For the parameters, see VoiceBank.
+    """
+    if (pathlib.Path(folder) / _ARCHIVE_INDEX).exists():
+        return PackedVoiceBank(folder, sampling_frequency, memory_limit, compact)
+    return VoiceBank(folder, sampling_frequency, memory_limit, compact)
+
+
+def main() -> None:
+    """Packs each voice folder given on the command line, e.g.:
+    python -m auditory_stimulation.model.voice_bank stimuli_sounds/eric stimuli_sounds/natasha
+    """
+    if len(sys.argv) < 2:
+        print("Usage: python -m auditory_stimulation.model.voice_bank <voice folder> [<voice folder> ...]")
+        sys.exit(1)
+
+    for folder in sys.argv[1:]:
+        blob_path = pack_voice_folder(pathlib.Path(folder))
+        print(f"Packed {folder} into {blob_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+from functools import lru_cache
+from math import gcd
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+from scipy.signal import firwin, resample_poly
+
+from auditory_stimulation.audio import Audio
+
+
+def _resampling_factors(source_fs: int, target_fs: int) -> Tuple[int, int]:
+    """Returns the smallest (up, down) factors, such that source_fs * up / down == target_fs."""
+    divisor = gcd(source_fs, target_fs)
+    return target_fs // divisor, source_fs // divisor
+
+
+@lru_cache(maxsize=None)
+def _polyphase_filter(up: int, down: int) -> npt.NDArray[np.float64]:
+    """Designs the anti-aliasing low-pass filter for the given factors. This is the same filter resample_poly designs by
+    default, but it is only designed once per pair of rates.
+    """
+    max_rate = max(up, down)
+    half_length = 10 * max_rate
+
+    fir_filter = firwin(2 * half_length + 1, 1 / max_rate, window=("kaiser", 5.0))
+    fir_filter.flags.writeable = False
+    return fir_filter
+
+
+def resample_audio(audio: Audio, target_fs: int) -> Audio:
+    """Resamples the given audio to the target sampling frequency, using polyphase filtering.
+
+    :param audio: The to be resampled audio.
+    :param target_fs: The sampling frequency of the resulting audio. Needs to be a positive integer.
+    :return: The resampled audio, or the given audio if it already has the target sampling frequency.
+    """
+    if target_fs <= 0:
+        raise ValueError("The target sampling frequency must be a positive integer!")
+
+    if audio.sampling_frequency == target_fs:
+        return audio
+
+    up, down = _resampling_factors(audio.sampling_frequency, target_fs)
+    resampled = resample_poly(audio.as_float32(), up, down, axis=0, window=_polyphase_filter(up, down))
+
+    # the filter may slightly overshoot close to full scale
+    resampled_clipped = np.clip(resampled, -1, 1).astype(np.float32)
+    return Audio(resampled_clipped, target_fs)
+
@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+from enum import Enum
+from typing import Iterator
+
+import numpy as np
+import numpy.typing as npt
+
+
+class EValidationLevel(Enum):
+    """Determines how thoroughly the sample ranges of audio (and tagging) signals are checked."""
+    STRICT = "strict"  # every check runs, as separate passes over the data
+    SINGLE_PASS = "single-pass"  # every check runs, but the data is only traversed once
+    TRUSTED = "trusted"  # range checks are skipped; only to be used once the data is known to be valid
+
+
+_BLOCK_SIZE = 2 ** 16
+
+_validation_level = EValidationLevel.STRICT
+
+
+def get_validation_level() -> EValidationLevel:
+    return _validation_level
+
+
+def set_validation_level(level: EValidationLevel) -> None:
+    """Sets the validation level for the entire process.
+
+    :param level: The new validation level.
+    :return: None
+    """
+    global _validation_level
+
+    if not isinstance(level, EValidationLevel):
+        raise TypeError("The validation level must be an EValidationLevel!")
+
+    _validation_level = level
+
+
+@contextmanager
+def validation_level(level: EValidationLevel) -> Iterator[None]:
+    """Temporarily changes the validation level. The previous level is restored when the context is exited.
+
+    :param level: The validation level used inside the context.
+    """
+    previous = get_validation_level()
+    set_validation_level(level)
+    try:
+        yield
+    finally:
+        set_validation_level(previous)
+
+
+def is_in_range(array: npt.NDArray, lower: float = -1, upper: float = 1) -> bool:
+    """Checks whether all elements of the array are contained in the interval [lower, upper], according to the current
+    validation level. In TRUSTED mode, this always returns True.
+
+    :param array: The to be checked array.
+    :param lower: The lower boundary of the interval.
+    :param upper: The upper boundary of the interval.
+    :return: Whether the array is contained in the interval.
+    """
+    if _validation_level == EValidationLevel.TRUSTED or array.size == 0:
+        return True
+
+    if _validation_level == EValidationLevel.STRICT:
+        return not (np.any(array > upper) or np.any(array < lower))
+
+    # go through the array in blocks, small enough to stay in the cache while both the minimum and maximum are computed
+    flat = array.reshape(-1)
+    for start in range(0, flat.shape[0], _BLOCK_SIZE):
+        block = flat[start:start + _BLOCK_SIZE]
+        if block.min() < lower or block.max() > upper:
+            return False
+
+    return True
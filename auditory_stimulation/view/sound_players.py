@@ -3,13 +3,14 @@ import psychopy.core
 from psychopy.sound.backend_pygame import SoundPygame
 
 from auditory_stimulation.audio import Audio
+from auditory_stimulation.validation import is_in_range
 
 
 def psychopy_player(audio: Audio, play_audio: bool = True) -> None:
     """ Plays the given audio. Function is blocking and returns after the audio has finished playing
 
     :param audio: a dataclass consisting of
-     * audio: Nx2 dimensional numpy array of the audio. Audio needs to be in the range [-1, 1]
+     * audio: Nx2 dimensional numpy array of the audio. Audio needs to be in the range [-1, 1], or compact (int16)
      * sampling frequency: positive integer
     :param play_audio: a flag to be used when debugging and testing to disable the playing of the audio
     :return:
@@ -18,11 +19,12 @@ def psychopy_player(audio: Audio, play_audio: bool = True) -> None:
     if audio.array.shape[1] != 2:
         raise ValueError("The audio has to be stereo! I.e. in the shape Nx2")
 
-    if audio.array.dtype != np.float32:
-        raise ValueError("The audio has to be of the type np.float32!")
+    if audio.array.dtype != np.float32 and audio.array.dtype != np.int16:
+        raise ValueError("The audio has to be of the type np.float32 or np.int16!")
 
-    assert np.max(audio.array) <= 1
-    assert np.min(audio.array) >= -1
+    # compact audio is only converted right before it is played
+    audio_array = audio.as_float32()
+    assert is_in_range(audio_array)
 
     if audio.sampling_frequency <= 0:
         raise ValueError("Sampling rate has to be > 0")
@@ -31,7 +33,7 @@ def psychopy_player(audio: Audio, play_audio: bool = True) -> None:
         return
 
     # use the pygame backend, as it allows to play sounds from arrays, not only from files
-    sound = SoundPygame(value=audio.array)
+    sound = SoundPygame(value=audio_array)
     sound.play()
     duration = sound.getDuration()
     psychopy.core.wait(duration)
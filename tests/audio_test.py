@@ -1,9 +1,11 @@
 import pathlib
+import wave
 
 import numpy as np
 import pytest
 
-from auditory_stimulation.audio import Audio, load_wav_as_audio, save_audio_as_wav
+from auditory_stimulation.audio import Audio, load_wav_as_audio, save_audio_as_wav, load_wav_as_audio_memmap, \
+    pcm16_to_float32, float32_to_pcm16, EWavSampleFormat
 
 rng = np.random.default_rng(123)
 
@@ -16,7 +18,7 @@ def audio_array_ones(shape):
     return np.ones(shape, dtype=np.float32)
 
 
-@pytest.mark.parametrize("shape", [(100, 2), (1000, 2), (1, 2), (10000, 2)])
+@pytest.mark.parametrize("shape", [(100, 2), (1000, 2), (1, 2), (10000, 2), (100, 1), (100, 3), (100, 1000)])
 @pytest.mark.parametrize("fs", [1, 2, 10, 20, 100, 1000])
 def test_audio_valid_call(shape, fs):
     audio_array = audio_array_zeros(shape)
@@ -26,6 +28,19 @@ def test_audio_valid_call(shape, fs):
     assert audio.sampling_frequency == fs
 
 
+@pytest.mark.parametrize("shape", [(100, 1), (100, 2), (100, 6)])
+def test_audio_n_channels_valid_call(shape):
+    audio = Audio(audio_array_zeros(shape), 10)
+
+    assert audio.n_channels == shape[1]
+
+
+@pytest.mark.parametrize("shape", [(100, 0), (100,), (100, 2, 1)])
+def test_audio_no_channels_should_fail(shape):
+    with pytest.raises(ValueError):
+        Audio(audio_array_zeros(shape), 10)
+
+
 def test_audio_sampling_frequency_zero_should_fail():
     audio_array = audio_array_zeros((100, 2))
     fs = 0
@@ -42,10 +57,10 @@ def test_audio_sampling_frequency_bellow_zero_should_fail(fs):
         audio = Audio(audio_array, fs)
 
 
-@pytest.mark.parametrize("shape", [(100, 3), (100, 1), (100, 1000), (100, 0)])
+@pytest.mark.parametrize("shape", [(), (100,), (100, 0), (0, 0), (100, 2, 1), (2, 100, 2)])
 def test_audio_array_invalid_shape_should_fail(shape):
     audio_array = audio_array_zeros(shape)
-    fs = -1
+    fs = 10
 
     with pytest.raises(ValueError):
         audio = Audio(audio_array, fs)
@@ -71,7 +86,7 @@ def test_load_wav_as_numpy_array_valid_call():
     assert result.sampling_frequency == 44100
 
 
-@pytest.mark.parametrize("shape", [(100, 2), (1000, 2), (1, 2), (10000, 2)])
+@pytest.mark.parametrize("shape", [(100, 2), (1000, 2), (1, 2), (10000, 2), (100, 1), (100, 4)])
 @pytest.mark.parametrize("fs", [1, 2, 10, 20, 100, 1000])
 def test_save_audio_as_wav_valid_call(tmp_path, shape, fs):
     audio_array = rng.random(shape, dtype=np.float32) * 2 - 1
@@ -87,3 +102,173 @@ def test_save_audio_as_wav_valid_call(tmp_path, shape, fs):
     allowed_delta = 0.001
     assert np.all(np.abs(loaded_audio.array - audio.array) <= allowed_delta)
     assert loaded_audio.sampling_frequency == audio.sampling_frequency
+
+
+@pytest.mark.parametrize("block_frames", [1, 1000, 2 ** 16, 10 ** 7])
+def test_load_wav_as_audio_memmap_equal_to_load_wav_as_audio(block_frames):
+    path = pathlib.Path("stimuli_sounds/legacy/test.wav")
+
+    expected = load_wav_as_audio(path)
+    result = load_wav_as_audio_memmap(path, block_frames)
+
+    assert result.sampling_frequency == expected.sampling_frequency
+    assert result.array.dtype == np.float32
+    assert np.all(result.array == expected.array)
+
+
+def test_load_wav_as_audio_memmap_saved_audio(tmp_path):
+    audio_array = rng.random((1000, 2), dtype=np.float32) * 2 - 1
+    file = tmp_path / "out.wav"
+    save_audio_as_wav(Audio(audio_array, 100), file)
+
+    result = load_wav_as_audio_memmap(file)
+
+    assert result == load_wav_as_audio(file)
+
+
+def test_load_wav_as_audio_memmap_not_a_wav_should_fail(tmp_path):
+    file = tmp_path / "out.wav"
+    file.write_bytes(b"definitely not a wav file")
+
+    with pytest.raises(ValueError):
+        load_wav_as_audio_memmap(file)
+
+
+def test_audio_digest_same_content_same_digest():
+    audio_array = rng.random((1000, 2), dtype=np.float32)
+
+    audio1 = Audio(audio_array, 100)
+    audio2 = Audio(np.copy(audio_array), 100)
+
+    assert audio1.digest == audio2.digest
+    assert hash(audio1) == hash(audio2)
+    assert audio1 == audio2
+
+
+def test_audio_digest_differs_in_the_middle_of_long_audio():
+    audio_array = audio_array_zeros((100000, 2))
+    modified_array = np.copy(audio_array)
+    modified_array[50000, 0] = 0.5
+
+    audio1 = Audio(audio_array, 100)
+    audio2 = Audio(modified_array, 100)
+
+    # str() of these arrays is the same, as numpy only prints the beginning and the end of long arrays
+    assert str(audio1.array) == str(audio2.array)
+    assert audio1.digest != audio2.digest
+    assert audio1 != audio2
+
+
+def test_audio_digest_differs_for_sampling_frequency():
+    audio_array = audio_array_zeros((100, 2))
+
+    assert Audio(audio_array, 100).digest != Audio(audio_array, 101).digest
+
+
+def test_audio_compact_valid_call():
+    audio_array = rng.random((1000, 2), dtype=np.float32) * 2 - 1
+    audio = Audio(audio_array, 100)
+
+    compact = audio.compact()
+
+    assert compact.is_compact
+    assert compact.array.dtype == np.int16
+    assert compact.array.nbytes == audio.array.nbytes // 2
+    assert compact.sampling_frequency == audio.sampling_frequency
+    assert np.all(np.abs(compact.as_float32() - audio.array) <= 2 ** -14)
+    assert np.all(compact.expand().array == compact.as_float32())
+    assert compact == compact.expand()
+    assert hash(compact) == hash(compact.expand())
+
+
+def test_audio_as_float32_does_not_copy_float_audio():
+    audio = Audio(audio_array_zeros((100, 2)), 10)
+
+    assert not audio.is_compact
+    assert audio.as_float32() is audio.array
+    assert audio.expand() is audio
+
+
+@pytest.mark.parametrize("dtype", [np.int32, np.float64, np.uint8])
+def test_audio_invalid_dtype_should_fail(dtype):
+    with pytest.raises(TypeError):
+        Audio(np.zeros((100, 2), dtype=dtype), 10)
+
+
+def test_float32_to_pcm16_same_as_wav_export():
+    array = rng.random((1000, 2), dtype=np.float32) * 2 - 1
+    array[:4, 0] = [-1, 1, 0, -0.0]
+
+    assert np.all(float32_to_pcm16(array) == (array * (2 ** 15 - 1)).astype(np.int16))
+
+
+def test_save_audio_as_wav_compact_same_as_float(tmp_path):
+    audio = Audio(rng.random((1000, 2), dtype=np.float32) * 2 - 1, 100)
+    float_file = tmp_path / "float.wav"
+    compact_file = tmp_path / "compact.wav"
+
+    save_audio_as_wav(audio, float_file)
+    save_audio_as_wav(audio.compact(), compact_file)
+
+    assert compact_file.read_bytes() == float_file.read_bytes()
+    assert load_wav_as_audio_memmap(compact_file, compact=True) == audio.compact()
+
+
+def test_load_wav_as_audio_memmap_compact():
+    path = pathlib.Path("stimuli_sounds/legacy/test.wav")
+
+    result = load_wav_as_audio_memmap(path, compact=True)
+
+    assert result.is_compact
+    assert result.expand() == load_wav_as_audio(path)
+
+
+def test_save_audio_as_wav_compact_is_lossless(tmp_path):
+    audio = load_wav_as_audio_memmap(pathlib.Path("stimuli_sounds/legacy/test.wav"), compact=True)
+    file = tmp_path / "out.wav"
+
+    save_audio_as_wav(audio, file)
+
+    assert load_wav_as_audio_memmap(file, compact=True) == audio
+
+
+@pytest.mark.parametrize("block_frames", [1, 7, 100, 2 ** 16])
+def test_save_audio_as_wav_block_size_does_not_change_file(tmp_path, block_frames):
+    audio = Audio(rng.random((1000, 2), dtype=np.float32) * 2 - 1, 100)
+    reference_file = tmp_path / "reference.wav"
+    file = tmp_path / "out.wav"
+
+    save_audio_as_wav(audio, reference_file)
+    save_audio_as_wav(audio, file, block_frames=block_frames)
+
+    assert file.read_bytes() == reference_file.read_bytes()
+
+
+def test_save_audio_as_wav_same_samples_as_wave_module(tmp_path):
+    audio = Audio(rng.random((1000, 2), dtype=np.float32) * 2 - 1, 100)
+    file = tmp_path / "out.wav"
+
+    save_audio_as_wav(audio, file)
+
+    with wave.open(str(file)) as f:
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype="<h").reshape((-1, 2))
+    assert np.all(samples == (audio.array * (2 ** 15 - 1)).astype("<h"))
+
+
+@pytest.mark.parametrize("shape", [(1000, 2), (1, 1), (100, 3)])
+def test_save_audio_as_wav_float32_is_lossless(tmp_path, shape):
+    audio = Audio(rng.random(shape, dtype=np.float32) * 2 - 1, 100)
+    file = tmp_path / "out.wav"
+
+    save_audio_as_wav(audio, file, EWavSampleFormat.FLOAT32, block_frames=64)
+
+    assert load_wav_as_audio_memmap(file) == audio
+
+
+def test_save_audio_as_wav_float32_compact_audio(tmp_path):
+    audio = load_wav_as_audio_memmap(pathlib.Path("stimuli_sounds/legacy/test.wav"), compact=True)
+    file = tmp_path / "out.wav"
+
+    save_audio_as_wav(audio, file, EWavSampleFormat.FLOAT32)
+
+    assert load_wav_as_audio_memmap(file) == audio.expand()
@@ -3,6 +3,7 @@ from typing import Tuple, List, Callable
 import numpy as np
 import numpy.typing as npt
 import pytest
+from scipy.signal import hilbert
 
 from auditory_stimulation.auditory_tagging.assr_tagger import AMTagger, FlippedFMTagger, FMTagger
 from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger
@@ -28,9 +29,14 @@ def get_fm_tagger(frequency: int) -> AAudioTagger:
     return FMTagger(frequency, 100)
 
 
+def get_legacy_fm_tagger(frequency: int) -> AAudioTagger:
+    return FMTagger(frequency, 100, legacy_mode=True)
+
+
 TAGGER_GETTERS: List[Callable[[int], AAudioTagger]] = [get_am_tagger,
                                                        get_flipped_fm_tagger,
-                                                       get_fm_tagger]
+                                                       get_fm_tagger,
+                                                       get_legacy_fm_tagger]
 
 
 @pytest.mark.parametrize("tagger_getter", TAGGER_GETTERS)
@@ -55,7 +61,8 @@ def test_ASSRTagger_create_validCall_audioShouldBeModified(tagger_getter):
 @pytest.mark.parametrize("tagger_getter", TAGGER_GETTERS)
 def test_ASSRTagger_create_validCall_audioShouldBeModifiedToHalfPoint(tagger_getter):
     n_input = 100
-    sampling_frequency = 2
+    # at low sampling frequencies, the FM tag of the FMTagger degenerates to a rotation by full turns (or none at all)
+    sampling_frequency = 12
     audio = get_mock_audio(n_input, sampling_frequency)
 
     stimulus_frequency = 1
@@ -119,3 +126,61 @@ def test_am_tagger_signal_interval_invalid_interval_should_throw(signal_interval
         signal = AMTagger(stimulus_frequency,
                           mock_stimulus_generation,
                           signal_interval)
+
+
+def get_random_chunk(n_samples: int, n_channels: int, dtype: type) -> npt.NDArray:
+    rng = np.random.default_rng(n_samples)
+    return ((rng.random((n_samples, n_channels)) - 0.5) * 0.8).astype(dtype)
+
+
+@pytest.mark.parametrize("n_samples, fs", [(1000, 100), (1001, 100), (30011, 44100), (44100, 44100)])
+@pytest.mark.parametrize("n_channels", [1, 2, 3])
+def test_fm_tagger_matches_legacy(n_samples, fs, n_channels):
+    chunk = get_random_chunk(n_samples, n_channels, np.float64)
+
+    legacy = FMTagger(40, 100, legacy_mode=True)._modify_chunk(chunk, fs)
+    modified = FMTagger(40, 100)._modify_chunk(chunk, fs)
+
+    assert modified.shape == chunk.shape
+    assert np.allclose(modified, legacy, atol=1e-9)
+
+
+def original_fm_modification(chunk: npt.NDArray, fs: int, frequency: int, modulation_factor: float) -> npt.NDArray:
+    """The FM modification, as originally implemented (before the legacy mode existed)."""
+    analytic = hilbert(chunk, axis=0)
+    amplitude, phase = np.abs(analytic), np.unwrap(np.angle(analytic))
+    inst_freq = np.diff(phase, axis=0) / (2 * np.pi) * fs
+    modulating_sine = np.sin(frequency / fs * 2 * np.pi * np.arange(inst_freq.shape[0]))
+    shifted_inst_freq = inst_freq + modulation_factor * np.array([modulating_sine, modulating_sine]).T
+    phase_shifted = np.append(np.reshape(phase[0, :], (1, 2)), shifted_inst_freq * (2 * np.pi) / fs,
+                              axis=0).cumsum(axis=0)
+    modified = np.real(np.array([a * np.e ** (1j * p) for a, p in zip(amplitude, phase_shifted)]))
+    max_value = np.max(np.abs(modified))
+    return modified if max_value <= 1 else modified / max_value
+
+
+@pytest.mark.parametrize("n_samples, fs", [(88200, 44100), (30011, 44100), (1000, 8000)])
+def test_fm_tagger_legacy_same_as_original(n_samples, fs):
+    chunk = get_random_chunk(n_samples, 2, np.float32)
+
+    legacy = FMTagger(40, 100, legacy_mode=True)._modify_chunk(chunk, fs)
+
+    assert np.array_equal(legacy, original_fm_modification(chunk, fs, 40, 100))
+
+
+def test_fm_tagger_single_precision_matches_legacy():
+    chunk = get_random_chunk(44100, 2, np.float32)
+
+    legacy = FMTagger(40, 100, legacy_mode=True)._modify_chunk(chunk, 44100)
+    modified = FMTagger(40, 100, single_precision=True)._modify_chunk(chunk, 44100)
+
+    assert modified.dtype == np.float32
+    assert np.allclose(modified, legacy, atol=1e-4)
+
+
+def test_fm_tagger_single_sample_chunk():
+    chunk = np.array([[0.5, -0.25]], dtype=np.float32)
+
+    modified = FMTagger(40, 100)._modify_chunk(chunk, 100)
+
+    assert np.allclose(modified, chunk)
@@ -1,10 +1,16 @@
+import pickle
+
 import numpy as np
 import numpy.typing as npt
 import pytest
 
+from auditory_stimulation.audio import Audio
+from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger, TaggerSpec
 from auditory_stimulation.auditory_tagging.assr_tagger import AMTagger, FMTagger, FlippedFMTagger
 from auditory_stimulation.auditory_tagging.noise_tagging_tagger import NoiseTaggingTagger
+from auditory_stimulation.auditory_tagging.raw_tagger import RawTagger
 from auditory_stimulation.auditory_tagging.shift_tagger import ShiftSumTagger, SpectrumShiftTagger, BinauralTagger
+from auditory_stimulation.auditory_tagging.tag_generators import sine_signal
 from tests.auditory_tagging.stimulus_test_helpers import get_mock_audio
 
 
@@ -45,3 +51,278 @@ def test_audio_taggers_create_valid_call_audio_should_be_modified_to_half_point(
     assert modified_audio.sampling_frequency == sampling_frequency
     assert np.any(modified_audio.array[:n_input // 2, :] != audio.array[:n_input // 2, :])
     assert np.all(modified_audio.array[n_input // 2:, :] == audio.array[n_input // 2:, :])
+
+
+@pytest.mark.parametrize("audio_tagger", AUDIO_TAGGERS)
+def test_audio_taggers_create_compact_audio_same_as_float_audio(audio_tagger):
+    n_input = 5000
+    audio = Audio(get_mock_audio(n_input, SAMPLING_FREQUENCY).array, SAMPLING_FREQUENCY).compact()
+    stimuli_intervals = [(0, n_input / SAMPLING_FREQUENCY / 2)]
+
+    modified_compact = audio_tagger.create(audio, stimuli_intervals)
+    modified_expanded = audio_tagger.create(audio.expand(), stimuli_intervals)
+
+    assert not modified_compact.is_compact
+    assert modified_compact == modified_expanded
+
+
+@pytest.mark.parametrize("n_channels", [1, 2, 5])
+@pytest.mark.parametrize("audio_tagger", [tagger for tagger in AUDIO_TAGGERS if not isinstance(tagger, BinauralTagger)])
+def test_audio_taggers_create_n_channels(audio_tagger, n_channels):
+    n_input = 5000
+    rng = np.random.default_rng(42)
+    channel = rng.random(n_input, dtype=np.float32)
+    audio = Audio(np.repeat(channel[:, np.newaxis], n_channels, axis=1), SAMPLING_FREQUENCY)
+
+    modified_audio = audio_tagger.create(audio, [(0, n_input / SAMPLING_FREQUENCY / 2)])
+
+    assert modified_audio.array.shape == audio.array.shape
+    # the same modulation is applied to every channel
+    assert np.all(modified_audio.array == modified_audio.array[:, :1])
+
+
+def test_binaural_tagger_mono_should_fail():
+    audio = Audio(np.zeros((1000, 1), dtype=np.float32), SAMPLING_FREQUENCY)
+
+    with pytest.raises(ValueError):
+        BinauralTagger(3).create(audio, [(0, 0.5)])
+
+
+BATCH_TAGGERS = AUDIO_TAGGERS + [RawTagger(), FMTagger(42, 100, legacy_mode=True), ShiftSumTagger(20, legacy_mode=True)]
+
+
+@pytest.mark.parametrize("audio_tagger", BATCH_TAGGERS)
+def test_audio_taggers_create_many_same_as_create(audio_tagger):
+    fs = SAMPLING_FREQUENCY
+    audios = [Audio(get_mock_audio(n_input, fs, seed).array, fs) for seed, n_input in enumerate([3000, 3000, 2500])]
+    # equally long chunks across the audios, a chunk of its own length and overlapping intervals (last audio)
+    intervals_per_audio = [[(0.5, 1.5), (2, 2.5)],
+                           [(0.2, 1.2), (1.5, 2.301)],
+                           [(0.1, 1.1), (0.6, 1.6)]]
+
+    modified_audios = audio_tagger.create_many(audios, intervals_per_audio)
+
+    assert len(modified_audios) == len(audios)
+    for audio, intervals, modified_audio in zip(audios, intervals_per_audio, modified_audios):
+        expected = audio_tagger.create(audio, intervals)
+        assert modified_audio.sampling_frequency == expected.sampling_frequency
+        assert np.allclose(modified_audio.array, expected.array, atol=1e-6)
+
+
+def test_audio_taggers_create_many_batches_equal_lengths():
+    tagger = RawTagger()
+    batch_shapes = []
+    modify_chunks = tagger._modify_chunks
+
+    def record_modify_chunks(audio_array_chunks, fs):
+        batch_shapes.append(audio_array_chunks.shape)
+        return modify_chunks(audio_array_chunks, fs)
+
+    tagger._modify_chunks = record_modify_chunks
+    audios = [Audio(get_mock_audio(2000, SAMPLING_FREQUENCY, seed).array, SAMPLING_FREQUENCY) for seed in range(3)]
+
+    tagger.create_many(audios, [[(0, 0.5), (1, 1.2)], [(0.5, 1)], [(1, 1.5)]])
+
+    assert sorted(batch_shapes) == [(1, 200, 2), (3, 500, 2)]
+
+
+def test_audio_taggers_create_many_mismatching_intervals_should_fail():
+    audio = Audio(get_mock_audio(2000, SAMPLING_FREQUENCY).array, SAMPLING_FREQUENCY)
+
+    with pytest.raises(ValueError):
+        RawTagger().create_many([audio, audio], [[(0, 1)]])
+
+
+ENVELOPE_TAGGERS = [AMTagger(3, sine_signal),
+                    AMTagger(3, sine_signal, (0, 1)),
+                    NoiseTaggingTagger(SAMPLING_FREQUENCY, 2, 10, np.random.default_rng(0))]
+
+
+@pytest.mark.parametrize("audio_tagger", ENVELOPE_TAGGERS)
+def test_envelope_taggers_create_same_as_chunk_wise(audio_tagger):
+    audio = Audio(get_mock_audio(3000, SAMPLING_FREQUENCY).array, SAMPLING_FREQUENCY)
+    intervals = [(0.2, 1.2), (1.5, 2.5), (2.6, 2.75)]
+
+    modified_audio = audio_tagger.create(audio, intervals)
+
+    expected = np.copy(audio.array)
+    for start, end in intervals:
+        start, end = int(start * SAMPLING_FREQUENCY), int(end * SAMPLING_FREQUENCY)
+        expected[start:end] = audio_tagger._modify_chunk(expected[start:end], SAMPLING_FREQUENCY)
+
+    assert modified_audio.array.dtype == np.float32
+    assert np.allclose(modified_audio.array, expected, atol=1e-7)
+    assert np.all(modified_audio.array[:200] == audio.array[:200])
+    assert np.all(modified_audio.array[2750:] == audio.array[2750:])
+
+
+def test_envelope_taggers_unbounded_envelope_is_scaled_down_per_interval():
+    audio = Audio(get_mock_audio(2000, SAMPLING_FREQUENCY).array * 0.5, SAMPLING_FREQUENCY)
+    tagger = AMTagger(3, sine_signal, (-4, 4))
+    intervals = [(0, 0.5), (1, 1.5)]
+
+    modified_audio = tagger.create(audio, intervals)
+
+    for start, end in [(0, 500), (1000, 1500)]:
+        assert np.max(np.abs(modified_audio.array[start:end])) == pytest.approx(1)
+    assert np.all(modified_audio.array[500:1000] == audio.array[500:1000])
+
+
+@pytest.mark.parametrize("audio_tagger", BATCH_TAGGERS + ENVELOPE_TAGGERS)
+def test_audio_taggers_create_in_place_same_as_create(audio_tagger):
+    audio = Audio(get_mock_audio(3000, SAMPLING_FREQUENCY).array * 0.9, SAMPLING_FREQUENCY)
+    intervals = [(0.2, 1.2), (1.5, 2.5), (2, 2.75)]
+    out = np.empty(audio.array.shape, dtype=np.float32)
+
+    modified_audio = audio_tagger.create(audio, intervals, out=out)
+
+    assert modified_audio.array is out
+    assert np.allclose(out, audio_tagger.create(audio, intervals).array, atol=1e-6)
+
+
+@pytest.mark.parametrize("view", [lambda array: array, lambda array: array[::2], lambda array: array[:, ::-1]])
+def test_audio_taggers_create_in_place_into_audio_array_should_fail(view):
+    array = get_mock_audio(2000, SAMPLING_FREQUENCY).array
+    audio = Audio(array, SAMPLING_FREQUENCY)
+    digest = audio.digest
+
+    with pytest.raises(ValueError):
+        ShiftSumTagger(20).create(Audio(view(array), SAMPLING_FREQUENCY), [(0.2, 0.5)], out=view(array))
+
+    assert audio.digest == digest
+    assert np.all(array == get_mock_audio(2000, SAMPLING_FREQUENCY).array)
+
+
+def test_audio_taggers_create_in_place_compact_audio():
+    audio = Audio(get_mock_audio(2000, SAMPLING_FREQUENCY).array, SAMPLING_FREQUENCY).compact()
+    out = np.empty(audio.array.shape, dtype=np.float32)
+
+    BinauralTagger(3).create(audio, [(0.5, 1.5)], out=out)
+
+    assert np.all(out == BinauralTagger(3).create(audio, [(0.5, 1.5)]).array)
+
+
+@pytest.mark.parametrize("out", [np.empty((2000, 2), dtype=np.float64), np.empty((2000, 1), dtype=np.float32)])
+def test_audio_taggers_create_in_place_invalid_out_should_fail(out):
+    audio = Audio(get_mock_audio(2000, SAMPLING_FREQUENCY).array, SAMPLING_FREQUENCY)
+
+    with pytest.raises((TypeError, ValueError)):
+        RawTagger().create(audio, [(0, 1)], out=out)
+
+
+def test_audio_taggers_scratch_is_reused():
+    tagger = RawTagger()
+
+    small = tagger._scratch((10, 2))
+    large = tagger._scratch((100, 2))
+    small_again = tagger._scratch((10, 2), np.float64)
+
+    assert small.shape == (10, 2) and large.shape == (100, 2) and small_again.dtype == np.float64
+    assert np.shares_memory(large, small_again)
+
+
+def test_audio_taggers_scratch_does_not_keep_large_arrays():
+    tagger = RawTagger()
+
+    small = tagger._scratch((10, 2))
+    large = tagger._scratch((2 ** 22, 2))
+
+    assert not np.shares_memory(small, large)
+    assert tagger._scratch_arena.nbytes == small.nbytes
+
+
+def test_audio_taggers_batched_binaural_tagging_does_not_keep_scratch():
+    tagger = BinauralTagger(3)
+    audios = [Audio(np.zeros((SAMPLING_FREQUENCY * 300, 2), dtype=np.float32), SAMPLING_FREQUENCY)] * 4
+
+    tagger.create_many(audios, [[(0, 300)]] * len(audios))
+
+    assert tagger._scratch_arena is None or tagger._scratch_arena.nbytes <= 2 ** 22
+
+
+def test_audio_taggers_scratch_is_not_pickled():
+    tagger = RawTagger()
+    tagger._scratch((100, 2))
+
+    assert "_scratch_arena" not in pickle.loads(pickle.dumps(tagger)).__dict__
+
+
+@pytest.mark.parametrize("audio_tagger", AUDIO_TAGGERS + [RawTagger(), AMTagger(42, sine_signal, (0.5, 1))])
+def test_audio_taggers_spec_round_trip(audio_tagger):
+    audio = get_mock_audio(2000, SAMPLING_FREQUENCY)
+    spec = audio_tagger.spec
+
+    restored = AAudioTagger.from_spec(spec)
+    unpickled = pickle.loads(pickle.dumps(audio_tagger))
+
+    assert hash(spec) == hash(restored.spec) and spec == restored.spec == unpickled.spec
+    assert repr(restored) == repr(audio_tagger)
+    assert np.all(restored.create(audio, [(0.2, 1.2)]).array == audio_tagger.create(audio, [(0.2, 1.2)]).array)
+    assert np.all(unpickled.create(audio, [(0.2, 1.2)]).array == audio_tagger.create(audio, [(0.2, 1.2)]).array)
+
+
+def test_audio_taggers_spec_differs_by_parameters():
+    assert ShiftSumTagger(20).spec == ShiftSumTagger(20).spec
+    assert ShiftSumTagger(20).spec != ShiftSumTagger(30).spec
+    assert ShiftSumTagger(20).spec != ShiftSumTagger(20, legacy_mode=True).spec
+    assert ShiftSumTagger(20).spec != SpectrumShiftTagger(20).spec
+
+
+def test_noise_tagging_tagger_spec_holds_code():
+    tagger = NoiseTaggingTagger(SAMPLING_FREQUENCY, 2, 4, code=[1, -1, -1, 1])
+
+    assert tagger.spec.kwargs["code"] == (1, -1, -1, 1)
+    assert np.all(tagger.code[:, 0] == np.repeat([1, -1, -1, 1], SAMPLING_FREQUENCY // 2))
+
+
+@pytest.mark.parametrize("code", [None, [1, -1, 1], [1, 0, -1, 1]])
+def test_noise_tagging_tagger_invalid_code_should_fail(code):
+    with pytest.raises(ValueError):
+        NoiseTaggingTagger(SAMPLING_FREQUENCY, 2, 4, code=code)
+
+
+def test_audio_taggers_from_spec_unknown_class_should_fail():
+    with pytest.raises(ValueError):
+        AAudioTagger.from_spec(TaggerSpec("unknown_module:UnknownTagger", ()))
+
+
+def test_tagger_spec_unhashable_parameter_should_fail():
+    with pytest.raises(TypeError):
+        TaggerSpec(RawTagger().spec.class_path, (("code", [1, -1]),))
+
+
+def test_am_tagger_spec_lambda_tag_generator_should_fail():
+    with pytest.raises(ValueError):
+        AMTagger(42, lambda length, frequency, fs: np.ones(length)).spec
+
+
+class SpeclessTagger(AAudioTagger):
+    def __init__(self, gain: float) -> None:
+        self.gain = gain
+
+    def _modify_chunk(self, audio_array_chunk, fs):
+        return audio_array_chunk * self.gain
+
+
+def test_audio_tagger_without_spec_is_pickled_with_its_state():
+    unpickled = pickle.loads(pickle.dumps(SpeclessTagger(0.5)))
+
+    assert isinstance(unpickled, SpeclessTagger) and unpickled.gain == 0.5
+    with pytest.raises(NotImplementedError):
+        unpickled.spec
+
+
+def test_audio_tagger_classes_of_the_same_name_do_not_collide():
+    class RawTagger(AAudioTagger):
+        def _modify_chunk(self, audio_array_chunk, fs):
+            return audio_array_chunk
+
+        def _spec_params(self):
+            return {}
+
+    local_spec = RawTagger().spec
+    spec = AAudioTagger.from_spec(TaggerSpec("auditory_stimulation.auditory_tagging.raw_tagger:RawTagger", ())).spec
+
+    assert local_spec != spec
+    assert type(AAudioTagger.from_spec(local_spec)) is RawTagger
+    assert type(AAudioTagger.from_spec(spec)) is not RawTagger
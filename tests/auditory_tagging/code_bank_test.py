@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from auditory_stimulation.auditory_tagging.code_bank import CodeBank, ECodeFamily, get_code_bank, lfsr_sequence
+from auditory_stimulation.auditory_tagging.noise_tagging_tagger import NoiseTaggingTagger
+
+
+def step_lfsr(degree, taps, length):
+    """The LFSR, stepped bit by bit."""
+    bits = [1] * degree
+    while len(bits) < length:
+        bits.append(np.bitwise_xor.reduce([bits[len(bits) - tap] for tap in taps]))
+    return np.array(bits, dtype=np.uint8)
+
+
+def circular_correlation(code_a, code_b):
+    return np.array([np.dot(code_a.astype(np.int64), np.roll(code_b, -shift)) for shift in range(code_a.shape[0])])
+
+
+@pytest.mark.parametrize("degree, taps", [(3, (3, 2)), (8, (8, 6, 5, 4)), (11, (11, 9))])
+def test_lfsr_sequence_same_as_stepped(degree, taps):
+    assert np.all(lfsr_sequence(degree, taps, 2 ** degree + 5) == step_lfsr(degree, taps, 2 ** degree + 5))
+
+
+@pytest.mark.parametrize("degree", [5, 6, 7])
+def test_m_sequence_bank_codes_are_m_sequences(degree):
+    bank = CodeBank(ECodeFamily.M_SEQUENCE, degree)
+    length = 2 ** degree - 1
+
+    assert bank.codes.shape[1] == bank.code_length == length
+    assert np.all(bank.peak_sidelobes == 1)
+    for code in bank.codes:
+        assert np.all(circular_correlation(code, code)[1:] == -1)
+    # no two codes are shifts of each other
+    assert bank.max_cross_correlation < length
+
+
+@pytest.mark.parametrize("degree", [5, 6, 7])
+def test_gold_bank_cross_correlation_is_three_valued(degree):
+    bank = CodeBank(ECodeFamily.GOLD, degree)
+    t = 1 + 2 ** ((degree + 2) // 2)
+
+    assert len(bank) == 2 ** degree + 1
+    assert bank.max_cross_correlation == t
+    assert set(np.unique(circular_correlation(bank.codes[3], bank.codes[7]))) <= {-t, -1, t - 2}
+
+
+@pytest.mark.parametrize("degree", [4, 6, 8])
+def test_kasami_bank_cross_correlation_is_bounded(degree):
+    bank = CodeBank(ECodeFamily.KASAMI, degree)
+
+    assert len(bank) == 2 ** (degree // 2)
+    assert bank.max_cross_correlation == 2 ** (degree // 2) + 1
+    assert np.all(bank.peak_sidelobes <= 2 ** (degree // 2) + 1)
+
+
+def test_cross_correlation_peaks_same_as_direct_computation():
+    bank = CodeBank(ECodeFamily.M_SEQUENCE, 5)
+
+    for i, j in [(0, 1), (2, 4), (3, 3)]:
+        correlation = circular_correlation(bank.codes[i], bank.codes[j])
+        expected = np.max(np.abs(correlation[1:] if i == j else correlation))
+        assert bank.cross_correlation_peaks[i, j] == expected
+
+
+def test_code_bank_draw_every_code_once():
+    bank = CodeBank(ECodeFamily.KASAMI, 6)
+
+    drawn = [bank.draw() for _ in range(len(bank))]
+
+    assert len({code.tobytes() for code in drawn}) == len(bank) == bank.n_drawn
+    with pytest.raises(ValueError):
+        bank.draw()
+
+    bank.reset()
+    assert np.all(bank.draw() == drawn[0])
+
+
+def test_m_sequence_bank_draws_low_correlation_codes_first():
+    bank = CodeBank(ECodeFamily.M_SEQUENCE, 7)
+    codes = [bank.draw() for _ in range(3)]
+    peaks = [np.max(np.abs(circular_correlation(a, b))) for a, b in [(codes[0], codes[1]), (codes[0], codes[2]),
+                                                                      (codes[1], codes[2])]]
+
+    assert max(peaks) <= np.median(bank.cross_correlation_peaks)
+
+
+def test_get_code_bank_is_shared():
+    assert get_code_bank(ECodeFamily.GOLD, 5) is get_code_bank(ECodeFamily.GOLD, 5)
+    assert get_code_bank(ECodeFamily.GOLD, 5) is not get_code_bank(ECodeFamily.GOLD, 5, (5, 2))
+
+
+@pytest.mark.parametrize("family, degree, taps", [(ECodeFamily.GOLD, 8, None),
+                                                  (ECodeFamily.KASAMI, 7, None),
+                                                  (ECodeFamily.M_SEQUENCE, 40, None),
+                                                  (ECodeFamily.M_SEQUENCE, 4, (4, 2)),
+                                                  (ECodeFamily.GOLD, 13, None)])
+def test_code_bank_invalid_parameters_should_fail(family, degree, taps):
+    with pytest.raises(ValueError):
+        CodeBank(family, degree, taps)
+
+
+def test_noise_tagging_tagger_from_code_bank():
+    bank = CodeBank(ECodeFamily.GOLD, 5)
+
+    taggers = [NoiseTaggingTagger.from_code_bank(bank, 1000, 10) for _ in range(2)]
+
+    assert np.all(taggers[0].code[::100, 0] == bank.codes[0])
+    assert np.all(taggers[1].code[::100, 0] == bank.codes[1])
+    assert taggers[0].spec.kwargs["length_bit"] == 31
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from auditory_stimulation.auditory_tagging import code_search
+from auditory_stimulation.auditory_tagging.code_bank import CodeBank, ECodeFamily
+from auditory_stimulation.auditory_tagging.code_search import score_codes, search_codes
+from auditory_stimulation.auditory_tagging.noise_tagging_tagger import NoiseTaggingTagger
+
+
+def circular_correlation(code_a, code_b):
+    return np.array([np.dot(np.asarray(code_a, dtype=np.int64), np.roll(code_b, -shift))
+                     for shift in range(len(code_a))])
+
+
+@pytest.mark.parametrize("length", [31, 64, 127])
+def test_score_codes_same_as_direct_computation(length):
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, 2, size=(20, length), dtype=np.int8) * 2 - 1
+    references = codes[:2]
+
+    peak_sidelobes, peak_cross_correlations = score_codes(codes[2:], references)
+
+    for code, peak_sidelobe, peak_cross_correlation in zip(codes[2:], peak_sidelobes, peak_cross_correlations):
+        assert peak_sidelobe == np.max(np.abs(circular_correlation(code, code)[1:]))
+        assert peak_cross_correlation == max(np.max(np.abs(circular_correlation(code, reference)))
+                                             for reference in references)
+
+
+def test_score_codes_m_sequence_has_peak_sidelobe_one():
+    peak_sidelobes, peak_cross_correlations = score_codes(CodeBank(ECodeFamily.M_SEQUENCE, 7).codes)
+
+    assert np.all(peak_sidelobes == 1)
+    assert np.all(peak_cross_correlations == 0)
+
+
+def test_search_codes_returns_best_codes_first():
+    found = search_codes(64, 20000, k=5, seed=1, n_workers=1)
+
+    assert len(found) == 5
+    assert [code.score for code in found] == sorted(code.score for code in found)
+    for code in found:
+        assert len(code.code) == 64 and set(code.code) <= {-1, 1}
+        assert code.peak_sidelobe == np.max(np.abs(circular_correlation(code.code, code.code)[1:]))
+
+
+def test_search_codes_with_references():
+    references = [CodeBank(ECodeFamily.M_SEQUENCE, 6).codes[0]]
+
+    found = search_codes(63, 5000, k=3, reference_codes=references, seed=1, n_workers=1)
+
+    for code in found:
+        assert code.peak_cross_correlation == np.max(np.abs(circular_correlation(code.code, references[0])))
+        assert code.score == max(code.peak_sidelobe, code.peak_cross_correlation)
+
+
+def test_search_codes_same_result_regardless_of_workers_and_batches(monkeypatch):
+    monkeypatch.setattr(code_search, "_CANDIDATES_PER_TASK", 3000)
+
+    expected = search_codes(32, 10000, k=4, seed=7, n_workers=1)
+
+    assert search_codes(32, 10000, k=4, seed=7, n_workers=2) == expected
+    assert search_codes(32, 10000, k=4, seed=7, n_workers=1, batch_size=333) == expected
+
+
+def test_search_codes_found_code_can_be_used_by_tagger():
+    found = search_codes(16, 1000, k=1, seed=3, n_workers=1)
+
+    tagger = NoiseTaggingTagger(1000, 10, 16, code=found[0].code)
+
+    assert tagger.spec.kwargs["code"] == found[0].code
+
+
+@pytest.mark.parametrize("kwargs", [{"length_bit": 1}, {"n_candidates": 0}, {"k": 0},
+                                    {"reference_codes": [[1, -1, 1]]}, {"reference_codes": [[1, 0] * 8]}])
+def test_search_codes_invalid_parameters_should_fail(kwargs):
+    with pytest.raises(ValueError):
+        search_codes(**{"length_bit": 16, "n_candidates": 100, "n_workers": 1, **kwargs})
@@ -85,3 +85,10 @@ def test_psychopy_player_sampling_rate_zero_should_throw():
 
     with pytest.raises(ValueError):
         psychopy_player(audio, False)
+
+
+def test_psychopy_player_compact_audio_valid_call():
+    audio_raw = np.array([[-2 ** 15, 0], [2 ** 15 - 1, 1]], dtype=np.int16)
+    audio = mock_audio(audio_raw, 1)
+
+    psychopy_player(audio, False)
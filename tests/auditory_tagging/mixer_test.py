@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from auditory_stimulation.audio import Audio
+from auditory_stimulation.auditory_tagging.assr_tagger import AMTagger
+from auditory_stimulation.auditory_tagging.auditory_tagger import _scale_down_signal
+from auditory_stimulation.auditory_tagging.mixer import FrequencyTaggingMixer
+from auditory_stimulation.auditory_tagging.tag_generators import sine_signal
+from tests.auditory_tagging.stimulus_test_helpers import get_mock_audio
+
+SAMPLING_FREQUENCY = 1000
+
+
+def get_audio(n_input: int, seed: int) -> Audio:
+    return Audio(get_mock_audio(n_input, SAMPLING_FREQUENCY, seed).array, SAMPLING_FREQUENCY)
+
+
+@pytest.mark.parametrize("signal_interval", [(-1, 1), (0.5, 1)])
+def test_mixer_mix_same_as_summed_am_taggers(signal_interval):
+    frequencies = [40, 42, 37]
+    audios = [get_audio(2000, seed) for seed in range(3)]
+
+    mixture = FrequencyTaggingMixer(frequencies, signal_interval).mix(audios)
+
+    expected = sum(AMTagger(frequency, sine_signal, signal_interval).create(audio, [(0, audio.secs)]).array
+                   for frequency, audio in zip(frequencies, audios))
+    assert mixture.sampling_frequency == SAMPLING_FREQUENCY
+    assert mixture.array.dtype == np.float32
+    assert np.allclose(mixture.array, _scale_down_signal(expected), atol=1e-6)
+
+
+def test_mixer_mix_pads_shorter_audios():
+    audios = [get_audio(2000, 0), get_audio(1500, 1).compact()]
+
+    mixture = FrequencyTaggingMixer([40, 42]).mix(audios)
+
+    padded = Audio(np.concatenate([audios[1].as_float32(), np.zeros((500, 2), dtype=np.float32)]), SAMPLING_FREQUENCY)
+    assert mixture.array.shape == (2000, 2)
+    assert np.allclose(mixture.array, FrequencyTaggingMixer([40, 42]).mix([audios[0], padded]).array, atol=1e-6)
+
+
+def test_mixer_mix_is_in_range():
+    audios = [Audio(np.ones((1000, 1), dtype=np.float32), SAMPLING_FREQUENCY) for _ in range(4)]
+
+    mixture = FrequencyTaggingMixer([40, 40, 40, 40]).mix(audios)
+
+    assert np.max(np.abs(mixture.array)) == pytest.approx(1)
+
+
+@pytest.mark.parametrize("audios", [[get_audio(100, 0)],
+                                    [get_audio(100, 0), Audio(get_audio(100, 1).array, 2000)],
+                                    [get_audio(100, 0), Audio(get_audio(100, 1).array[:, :1], SAMPLING_FREQUENCY)]])
+def test_mixer_mix_invalid_audios_should_fail(audios):
+    with pytest.raises(ValueError):
+        FrequencyTaggingMixer([40, 42]).mix(audios)
+
+
+@pytest.mark.parametrize("frequencies, signal_interval", [([], (-1, 1)), ([40, 0], (-1, 1)), ([40], (1, 0.5))])
+def test_mixer_invalid_parameters_should_fail(frequencies, signal_interval):
+    with pytest.raises(ValueError):
+        FrequencyTaggingMixer(frequencies, signal_interval)
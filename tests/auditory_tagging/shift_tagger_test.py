@@ -1,9 +1,12 @@
 import numpy as np
 import numpy.typing as npt
 import pytest
+from scipy.signal import hilbert
 
 from auditory_stimulation.audio import Audio
-from auditory_stimulation.auditory_tagging.shift_tagger import ShiftSumTagger, SpectrumShiftTagger, BinauralTagger
+from auditory_stimulation.auditory_tagging.shift_tagger import ShiftSumTagger, SpectrumShiftTagger, BinauralTagger, \
+    _shift_signal, _shift_spectrum
+from auditory_stimulation.auditory_tagging.spectral import SpectralConfiguration, spectral_configuration
 from tests.auditory_tagging.stimulus_test_helpers import get_mock_audio
 
 TAGGER_GETTERS = [ShiftSumTagger,
@@ -87,3 +90,89 @@ def test_spectrum_shift_tagger_constant_shifted_correctly():
     modified_peak = np.argmax(modified_spectrum)
 
     assert (modified_peak * freq_resolution) == (shift + note)
+
+
+def _shift_signal_fft(signal: npt.NDArray, fs: int, shift_by: int) -> npt.NDArray:
+    """The previous, full spectrum implementation of _shift_signal, which shifts by whole frequency bins only."""
+    n_shift_by = int(shift_by / (fs / signal.shape[0]))
+    spectrum_mid = signal.shape[0] // 2
+
+    signal_spectrum = np.fft.fftshift(np.fft.fft(signal, axis=0))
+    signal_spectrum_positive = signal_spectrum[spectrum_mid:, :]
+
+    signal_spectrum_positive_shifted = np.zeros_like(signal_spectrum_positive)
+    signal_spectrum_positive_shifted[n_shift_by:, :] = signal_spectrum_positive[:-n_shift_by, :]
+
+    signal_spectrum_shifted = np.zeros_like(signal_spectrum)
+    signal_spectrum_shifted[spectrum_mid:, :] = signal_spectrum_positive_shifted
+
+    return np.real(np.fft.ifft(np.fft.fftshift(signal_spectrum_shifted * 2), axis=0))
+
+
+def _get_sine(frequency: float, fs: int, length: int) -> npt.NDArray[np.float32]:
+    signal = np.sin(2 * np.pi * frequency / fs * np.arange(length)) * 0.5
+    return np.array([signal, signal], dtype=np.float32).T
+
+
+# the full spectrum shift only shifts by whole bins, hence only shifts by a whole number of bins can be compared. It
+# also only works for signals of even length (for odd lengths, fftshift is not its own inverse)
+@pytest.mark.parametrize("length, fs, shift_by", [(1000, 1000, 40), (2002, 7007, 14), (400, 8000, 60), (4410, 44100, 40)])
+def test_shift_signal_equals_full_spectrum_shift(length, fs, shift_by):
+    signal = np.random.default_rng(length).random((length, 2)) - 0.5
+
+    with spectral_configuration(SpectralConfiguration(pad_to_fast_length=False)):
+        shifted = _shift_signal(signal, fs, shift_by)
+
+    assert np.allclose(shifted, _shift_signal_fft(signal, fs, shift_by))
+
+
+@pytest.mark.parametrize("pad_to_fast_length", [False, True])
+def test_shift_signal_shifts_by_exact_frequency(pad_to_fast_length):
+    fs = 8000
+    # 30 Hz are 3.75 frequency bins of a signal of this length
+    signal = _get_sine(1000, fs, 1001)
+
+    with spectral_configuration(SpectralConfiguration(pad_to_fast_length=pad_to_fast_length)):
+        shifted = _shift_signal(signal, fs, 30)
+
+    phase = np.unwrap(np.angle(hilbert(shifted[:, 0])))
+    instantaneous_frequency = np.diff(phase) / (2 * np.pi) * fs
+    assert np.median(instantaneous_frequency[200:-200]) == pytest.approx(1030, abs=0.5)
+
+
+@pytest.mark.parametrize("length", [1000, 1001])
+def test_shift_signal_zero_shift_keeps_signal(length):
+    # an even length has a Nyquist bin, which must not be dropped either
+    signal = np.random.default_rng(length).random((length, 2), dtype=np.float32) - 0.5
+
+    assert np.all(_shift_signal(signal, 1000, 0) == signal)
+    assert np.all(SpectrumShiftTagger(0)._modify_chunk(signal, 1000) == signal)
+
+
+def test_shift_spectrum_zero_shift_keeps_nyquist_bin():
+    signal = np.random.default_rng(0).random((1000, 2)) - 0.5
+
+    restored = _shift_spectrum(np.fft.rfft(signal, axis=0), 1000, 1000, 0)
+
+    assert np.allclose(restored, signal)
+
+
+def test_shift_signal_beyond_nyquist_is_silent():
+    signal = _get_sine(100, 1000, 1000)
+
+    assert np.all(_shift_signal(signal, 1000, 500) == 0)
+
+
+def test_shift_signal_keeps_dtype():
+    signal = _get_sine(100, 1000, 1001)
+
+    assert _shift_signal(signal, 1000, 30).dtype == np.float32
+
+
+def test_binaural_tagger_keeps_channel_1():
+    audio = Audio(_get_sine(100, 1000, 1000), 1000)
+
+    modified_audio = BinauralTagger(40).create(audio, [(0, audio.secs)])
+
+    assert np.all(modified_audio.array[:, 1] == audio.array[:, 1])
+    assert np.allclose(modified_audio.array[:, 0], _shift_signal(audio.array[:, :1], 1000, 40)[:, 0], atol=1e-6)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from scipy.signal import hilbert
+
+from auditory_stimulation.auditory_tagging.spectral import SpectralConfiguration, analytic_signal, fast_length, \
+    get_spectral_configuration, spectral_configuration, rfft, irfft
+
+NO_PADDING = SpectralConfiguration(pad_to_fast_length=False)
+PADDING = SpectralConfiguration(pad_to_fast_length=True)
+
+
+def get_random_signal(n_samples: int, n_channels: int) -> np.ndarray:
+    rng = np.random.default_rng(n_samples)
+    return rng.random((n_samples, n_channels)) - 0.5
+
+
+@pytest.mark.parametrize("n_samples", [1, 2, 7, 100, 1009])
+@pytest.mark.parametrize("n_channels", [1, 2])
+def test_analytic_signal_equals_hilbert(n_samples, n_channels):
+    signal = get_random_signal(n_samples, n_channels)
+
+    # transforms are not padded by default
+    analytic = analytic_signal(signal)
+
+    assert np.allclose(analytic, hilbert(signal, axis=0))
+
+
+def test_analytic_signal_padded_keeps_signal():
+    signal = get_random_signal(1009, 2)
+
+    with spectral_configuration(PADDING):
+        analytic = analytic_signal(signal)
+
+    assert analytic.shape == signal.shape
+    # the real part of the analytic signal is the signal itself, regardless of the padding
+    assert np.allclose(analytic.real, signal)
+
+
+@pytest.mark.parametrize("complex_dtype", [np.complex64, np.complex128])
+def test_analytic_signal_dtype(complex_dtype):
+    signal = get_random_signal(100, 2).astype(np.float32)
+
+    assert analytic_signal(signal, complex_dtype).dtype == complex_dtype
+
+
+@pytest.mark.parametrize("length", [1, 97, 1009, 44101])
+def test_fast_length(length):
+    assert fast_length(length) == length
+
+    with spectral_configuration(PADDING):
+        assert fast_length(length) >= length
+
+
+def test_rfft_irfft_round_trip_with_workers():
+    signal = get_random_signal(1009, 2)
+
+    with spectral_configuration(SpectralConfiguration(workers=2, pad_to_fast_length=True)):
+        n_fft = fast_length(signal.shape[0])
+        restored = irfft(rfft(signal, n_fft), n_fft)[:signal.shape[0]]
+
+    assert np.allclose(restored, signal)
+
+
+@pytest.mark.parametrize("workers", [0, -2])
+def test_spectral_configuration_invalid_workers_should_fail(workers):
+    with pytest.raises(ValueError):
+        SpectralConfiguration(workers=workers)
+
+
+def test_spectral_configuration_context_restores_previous():
+    previous = get_spectral_configuration()
+
+    with pytest.raises(RuntimeError):
+        with spectral_configuration(NO_PADDING):
+            assert get_spectral_configuration() == NO_PADDING
+            raise RuntimeError()
+
+    assert get_spectral_configuration() == previous
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from auditory_stimulation.audio import Audio
+from auditory_stimulation.auditory_tagging import spectral
+from auditory_stimulation.auditory_tagging.assr_tagger import FMTagger, AMTagger
+from auditory_stimulation.auditory_tagging.shift_tagger import ShiftSumTagger, SpectrumShiftTagger, BinauralTagger
+from auditory_stimulation.auditory_tagging.sweep import TaggerSweep, sweep
+from auditory_stimulation.auditory_tagging.tag_generators import sine_signal
+from tests.auditory_tagging.stimulus_test_helpers import get_mock_audio
+
+SAMPLING_FREQUENCY = 1000
+INTERVALS = [(0.2, 0.7), (1.1, 1.6)]
+
+
+def get_audio() -> Audio:
+    return Audio(get_mock_audio(2000, SAMPLING_FREQUENCY).array, SAMPLING_FREQUENCY)
+
+
+@pytest.mark.parametrize("tagger_class, grid, fixed_parameters",
+                         [(FMTagger, {"frequency": [38, 40, 42], "modulation_factor": [50, 100]}, {}),
+                          (FMTagger, {"frequency": [38, 40]}, {"modulation_factor": 100, "single_precision": True}),
+                          (FMTagger, {"frequency": [38, 40]}, {"modulation_factor": 100, "legacy_mode": True}),
+                          (ShiftSumTagger, {"shift_by": [20, 25, 40]}, {}),
+                          (SpectrumShiftTagger, {"shift_by": [3, 20]}, {}),
+                          (BinauralTagger, {"shift_by": [3, 20]}, {}),
+                          (AMTagger, {"frequency": [40, 42]}, {"tag_generator": sine_signal})])
+def test_sweep_same_as_create(tagger_class, grid, fixed_parameters):
+    audio = get_audio()
+
+    tagger_sweep = sweep(audio, INTERVALS, tagger_class, grid, **fixed_parameters)
+    stacked = tagger_sweep.to_array()
+
+    assert len(tagger_sweep) == stacked.shape[0] == np.prod([len(values) for values in grid.values()])
+    for tagger, audio_array, tagged_audio in zip(tagger_sweep.taggers, stacked, tagger_sweep):
+        expected = tagger.create(audio, INTERVALS).array
+        assert np.allclose(audio_array, expected, atol=1e-6)
+        assert np.all(tagged_audio.array == audio_array)
+
+
+def test_sweep_parameters_last_changes_fastest():
+    tagger_sweep = sweep(get_audio(), INTERVALS, FMTagger, {"frequency": [38, 40], "modulation_factor": [50, 100]})
+
+    assert tagger_sweep.parameters == [{"frequency": 38, "modulation_factor": 50},
+                                       {"frequency": 38, "modulation_factor": 100},
+                                       {"frequency": 40, "modulation_factor": 50},
+                                       {"frequency": 40, "modulation_factor": 100}]
+    assert repr(tagger_sweep.taggers[1]) == repr(FMTagger(38, 100))
+
+
+def test_sweep_computes_shared_transform_once_per_chunk(monkeypatch):
+    n_transforms = []
+    analytic_signal = spectral.analytic_signal
+
+    def counting_analytic_signal(*args, **kwargs):
+        n_transforms.append(1)
+        return analytic_signal(*args, **kwargs)
+
+    monkeypatch.setattr("auditory_stimulation.auditory_tagging.assr_tagger.analytic_signal", counting_analytic_signal)
+    tagger_sweep = sweep(get_audio(), INTERVALS, FMTagger, {"frequency": [38, 40, 42], "modulation_factor": [50, 100]})
+
+    tagger_sweep.to_array()
+    tagger_sweep[-1]
+
+    assert len(n_transforms) == len(INTERVALS)
+
+
+def test_sweep_is_lazy():
+    tagger = ShiftSumTagger(20)
+    calls = []
+    tagger._transform = lambda audio_array_chunk, fs: calls.append(audio_array_chunk)
+
+    tagger_sweep = TaggerSweep(get_audio(), INTERVALS, [tagger])
+
+    assert calls == [] and len(tagger_sweep) == 1
+
+
+def test_sweep_overlapping_intervals_same_as_create():
+    audio = get_audio()
+    intervals = [(0.2, 0.7), (0.5, 1.0)]
+
+    tagger_sweep = sweep(audio, intervals, ShiftSumTagger, {"shift_by": [20, 40]})
+
+    for tagger, tagged_audio in zip(tagger_sweep.taggers, tagger_sweep):
+        assert np.allclose(tagged_audio.array, tagger.create(audio, intervals).array, atol=1e-6)
+
+
+def test_sweep_invalid_input_should_fail():
+    with pytest.raises(ValueError):
+        sweep(get_audio(), INTERVALS, FMTagger, {})
+
+    with pytest.raises(ValueError):
+        TaggerSweep(get_audio(), [(1.5, 2.5)], [ShiftSumTagger(20)])
+
+    with pytest.raises(ValueError):
+        TaggerSweep(get_audio(), INTERVALS, [ShiftSumTagger(20)], [{"shift_by": 20}, {"shift_by": 30}])
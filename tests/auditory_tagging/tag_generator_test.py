@@ -1,7 +1,8 @@
 import numpy as np
 import pytest
 
-from auditory_stimulation.auditory_tagging.tag_generators import clicking_signal, sine_signal
+from auditory_stimulation.auditory_tagging import tag_generators
+from auditory_stimulation.auditory_tagging.tag_generators import clicking_signal, sine_signal, sine_signals
 
 TAG_GENERATORS = [clicking_signal, sine_signal]
 
@@ -18,7 +19,8 @@ def test_tagGeneration_validCall_shouldHaveCorrectFrequency(tag_generation):
     for sampling_frequency, stimulus_frequency in zip(sampling_frequencies, stimulus_frequencies):
         modulating_stimulus = tag_generation(length, stimulus_frequency, sampling_frequency)
 
-        modulating_stimulus_spectrum = np.abs(np.real(np.fft.fftshift(np.fft.fft(modulating_stimulus))))
+        # the spectrum of a sine is imaginary, hence the magnitude (not the real part) has to be compared
+        modulating_stimulus_spectrum = np.abs(np.fft.fftshift(np.fft.fft(modulating_stimulus)))
         # cut of the irrelevant half of the spectrum
         modulating_stimulus_spectrum = modulating_stimulus_spectrum[modulating_stimulus_spectrum.shape[0] // 2:]
 
@@ -91,3 +93,74 @@ def test_clicking_signal_invalidFrequency_doesNotDivide_shouldThrow():
 
     with pytest.raises(ValueError):
         clicking_signal(length, frequency, sampling_frequency)
+
+
+@pytest.mark.parametrize("tag_generation", TAG_GENERATORS)
+@pytest.mark.parametrize("frequency, sampling_frequency", [(3, 12), (40, 8000), (42, 44100)])
+def test_tagGeneration_longerSignal_startsWithShorterSignal(tag_generation, frequency, sampling_frequency):
+    if sampling_frequency % (2 * frequency) != 0 and tag_generation is clicking_signal:
+        pytest.skip("The clicking signal requires 2 x frequency to divide the sampling frequency")
+
+    short = np.copy(tag_generation(1001, frequency, sampling_frequency))
+    long = tag_generation(30011, frequency, sampling_frequency)
+
+    assert long.shape == (30011,)
+    assert long.dtype == np.float32
+    assert np.all(long[:1001] == short)
+    assert np.all(tag_generation(1001, frequency, sampling_frequency) == short)
+
+
+def test_sine_signal_same_as_direct_computation():
+    signal = sine_signal(50000, 42, 44100, np.float64)
+
+    assert signal.dtype == np.float64
+    assert np.allclose(signal, np.sin(42 / 44100 * 2 * np.pi * np.arange(50000)), atol=1e-9)
+
+
+def test_sine_signals_same_as_sine_signal():
+    signals = sine_signals(5000, [40, 42, 37], 44100)
+
+    assert signals.shape == (3, 5000) and signals.dtype == np.float32
+    for signal, frequency in zip(signals, [40, 42, 37]):
+        assert np.all(signal == sine_signal(5000, frequency, 44100))
+
+    with pytest.raises(ValueError):
+        sine_signals(5000, [40, 0], 44100)
+
+
+def test_clicking_signal_alternates_half_periods():
+    signal = clicking_signal(11, 2, 8)
+
+    assert np.all(signal == [1, 1, -1, -1, 1, 1, -1, -1, 1, 1, -1])
+
+
+@pytest.mark.parametrize("tag_generation", TAG_GENERATORS)
+def test_tagGeneration_isReadOnly(tag_generation):
+    signal = tag_generation(100, 5, 20)
+
+    with pytest.raises(ValueError):
+        signal[0] = 0
+
+
+@pytest.mark.parametrize("tag_generation", TAG_GENERATORS)
+def test_tagGeneration_longerThanTable_continuesSignal(tag_generation, monkeypatch):
+    monkeypatch.setattr(tag_generators, "_MAX_TABLE_SAMPLES", 100)
+    monkeypatch.setattr(tag_generators, "_oscillator_bank", tag_generators._OscillatorBank())
+
+    signal = tag_generation(1001, 5, 40)
+
+    assert signal.shape == (1001,)
+    assert not signal.flags.writeable
+    assert np.all(signal[:-8] == signal[8:])
+    assert np.all(signal[:96] == tag_generation(96, 5, 40))
+
+
+def test_oscillator_bank_evicts_least_recently_used_tables():
+    bank = tag_generators._OscillatorBank(memory_limit=2 * 44100 * 4)
+
+    for frequency in [1, 2, 3]:
+        bank.get(tag_generators._sine_period, 44100, frequency, 44100)
+    assert bank.used_memory == 2 * 44100 * 4
+
+    signal = bank.get(tag_generators._sine_period, 44100, 1, 44100)
+    assert np.all(signal == sine_signal(44100, 1, 44100))
@@ -0,0 +1,113 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from auditory_stimulation.audio import Audio
+from auditory_stimulation.auditory_tagging.assr_tagger import AMTagger, FMTagger
+from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger
+from auditory_stimulation.auditory_tagging.noise_tagging_tagger import NoiseTaggingTagger
+from auditory_stimulation.auditory_tagging.raw_tagger import RawTagger
+from auditory_stimulation.auditory_tagging.shift_tagger import ShiftSumTagger, BinauralTagger
+from auditory_stimulation.auditory_tagging.tag_generators import sine_signal
+from auditory_stimulation.auditory_tagging.tagger_chain import TaggerChain
+from auditory_stimulation.auditory_tagging.tagging_cache import TaggingCache, tagging_cache
+from auditory_stimulation.eeg.common import get_target_trigger, get_option_trigger, ETrigger
+from tests.auditory_tagging.stimulus_test_helpers import get_mock_audio
+
+SAMPLING_FREQUENCY = 1000
+INTERVALS = [(0.2, 0.7), (1.1, 1.6), (2.0, 2.3)]
+
+TAGGER_SEQUENCES = [
+    [AMTagger(42, sine_signal), NoiseTaggingTagger(SAMPLING_FREQUENCY, 2, 10, code=[1, -1] * 5)],
+    [AMTagger(42, sine_signal), BinauralTagger(3)],
+    [ShiftSumTagger(20), AMTagger(40, sine_signal, (0.5, 1))],
+    [AMTagger(40, sine_signal), FMTagger(42, 100), RawTagger()],
+    [AMTagger(40, sine_signal, (0, 2)), AMTagger(42, sine_signal)]  # unbounded envelope
+]
+
+
+def create_sequentially(taggers, audio, intervals):
+    for tagger in taggers:
+        audio = tagger.create(audio, intervals)
+    return audio
+
+
+@pytest.mark.parametrize("taggers", TAGGER_SEQUENCES)
+def test_tagger_chain_create_same_as_sequential_create(taggers):
+    audio = get_mock_audio(3000, SAMPLING_FREQUENCY)
+
+    modified_audio = TaggerChain(taggers).create(audio, INTERVALS)
+
+    assert modified_audio.array.dtype == np.float32
+    assert np.allclose(modified_audio.array, create_sequentially(taggers, audio, INTERVALS).array, atol=1e-6)
+
+
+@pytest.mark.parametrize("taggers", TAGGER_SEQUENCES)
+def test_tagger_chain_create_many_same_as_create(taggers):
+    chain = TaggerChain(taggers)
+    audios = [get_mock_audio(3000, SAMPLING_FREQUENCY, seed) for seed in range(3)]
+
+    modified_audios = chain.create_many(audios, [INTERVALS] * 3)
+
+    for audio, modified_audio in zip(audios, modified_audios):
+        assert np.allclose(modified_audio.array, chain.create(audio, INTERVALS).array, atol=1e-6)
+
+
+def test_tagger_chain_create_in_place_into_audio_array_should_fail():
+    array = np.array(get_mock_audio(3000, SAMPLING_FREQUENCY).array)
+    audio = Audio(array, SAMPLING_FREQUENCY)
+
+    with pytest.raises(ValueError):
+        TaggerChain(TAGGER_SEQUENCES[1]).create(audio, INTERVALS, out=array)
+
+
+def test_tagger_chain_envelopes_are_folded():
+    chain = TaggerChain(TAGGER_SEQUENCES[0])
+    envelope_calls = []
+    for tagger in chain.taggers:
+        tagger._modify_chunk_into = lambda chunk, fs, out: envelope_calls.append(chunk.shape)
+
+    chain.create(get_mock_audio(3000, SAMPLING_FREQUENCY), INTERVALS)
+
+    assert envelope_calls == []
+
+
+def test_tagger_chain_spec_round_trip():
+    chain = TaggerChain(TAGGER_SEQUENCES[0])
+    audio = get_mock_audio(3000, SAMPLING_FREQUENCY)
+
+    restored = AAudioTagger.from_spec(chain.spec)
+    unpickled = pickle.loads(pickle.dumps(chain))
+
+    assert chain.spec == restored.spec == unpickled.spec
+    assert repr(chain) == repr(restored) == f"TaggerChain(taggers=[{repr(chain.taggers[0])}, {repr(chain.taggers[1])}])"
+    assert np.all(restored.create(audio, INTERVALS).array == chain.create(audio, INTERVALS).array)
+
+
+def test_tagger_chain_is_cached_only_if_all_taggers_are():
+    audio = get_mock_audio(3000, SAMPLING_FREQUENCY)
+    cache = TaggingCache(10 ** 6)
+
+    with tagging_cache(cache):
+        TaggerChain([ShiftSumTagger(20), BinauralTagger(3)]).create(audio, INTERVALS)
+        TaggerChain([ShiftSumTagger(20), AMTagger(42, sine_signal)]).create(audio, INTERVALS)
+
+    assert (cache.hits, cache.misses, len(cache)) == (0, 3, 3)
+
+
+def test_tagger_chain_invalid_taggers_should_fail():
+    with pytest.raises(ValueError):
+        TaggerChain([])
+
+    with pytest.raises(TypeError):
+        TaggerChain([RawTagger(), sine_signal])
+
+
+def test_tagger_chain_triggers_follow_existing_taggers():
+    chain = TaggerChain([RawTagger()])
+
+    assert get_target_trigger(chain) == ETrigger.TARGET_START.value + 8
+    assert get_option_trigger(chain) == ETrigger.OPTION_START.value + 8
+    assert get_target_trigger(NoiseTaggingTagger(SAMPLING_FREQUENCY, 2, 10, code=[1] * 10)) == \
+           ETrigger.TARGET_START.value + 7
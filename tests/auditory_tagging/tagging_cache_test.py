@@ -0,0 +1,149 @@
+import numpy as np
+import pytest
+
+from auditory_stimulation.audio import Audio
+from auditory_stimulation.auditory_tagging.assr_tagger import AMTagger, FMTagger, FlippedFMTagger
+from auditory_stimulation.auditory_tagging.shift_tagger import ShiftSumTagger, SpectrumShiftTagger, BinauralTagger
+from auditory_stimulation.auditory_tagging.spectral import SpectralConfiguration, spectral_configuration
+from auditory_stimulation.auditory_tagging.tag_generators import sine_signal
+from auditory_stimulation.auditory_tagging.tagging_cache import TaggingCache, tagging_cache, get_tagging_cache, \
+    set_tagging_cache
+from tests.auditory_tagging.stimulus_test_helpers import get_mock_audio
+
+SAMPLING_FREQUENCY = 1000
+
+CACHED_TAGGERS = [FMTagger(42, 100),
+                  FMTagger(42, 100, legacy_mode=True),
+                  FlippedFMTagger(42, 1),
+                  ShiftSumTagger(20),
+                  SpectrumShiftTagger(3),
+                  BinauralTagger(3, legacy_mode=True)]
+
+
+def get_repeating_audio() -> Audio:
+    """An audio, in which the first second is repeated once."""
+    array = get_mock_audio(1000, SAMPLING_FREQUENCY).array * 0.5
+    return Audio(np.concatenate([array, array]), SAMPLING_FREQUENCY)
+
+
+def test_tagging_cache_get_put():
+    cache = TaggingCache(1000)
+    chunk = np.ones((10, 2), dtype=np.float64)
+
+    assert cache.get(("a", b"0", 1)) is None
+    kept = cache.put(("a", b"0", 1), chunk)
+
+    assert kept.dtype == np.float32 and not kept.flags.writeable
+    assert cache.get(("a", b"0", 1)) is kept
+    assert (cache.hits, cache.misses, len(cache), cache.used_memory) == (1, 1, 1, 80)
+
+
+def test_tagging_cache_evicts_least_recently_used():
+    cache = TaggingCache(200)
+    for name in ["a", "b"]:
+        cache.put((name, b"", 1), np.zeros((10, 2), dtype=np.float32))
+
+    cache.get(("a", b"", 1))
+    cache.put(("c", b"", 1), np.zeros((10, 2), dtype=np.float32))
+
+    assert cache.used_memory == 160
+    assert cache.get(("b", b"", 1)) is None
+    assert cache.get(("a", b"", 1)) is not None and cache.get(("c", b"", 1)) is not None
+
+
+def test_tagging_cache_does_not_keep_chunks_above_limit():
+    cache = TaggingCache(10)
+
+    cache.put(("a", b"", 1), np.zeros((10, 2), dtype=np.float32))
+
+    assert len(cache) == 0 and cache.used_memory == 0
+
+
+def test_tagging_cache_invalid_memory_limit_should_fail():
+    with pytest.raises(ValueError):
+        TaggingCache(-1)
+
+
+def test_tagging_cache_context_restores_previous():
+    cache = TaggingCache(1000)
+    previous = get_tagging_cache()
+
+    with tagging_cache(cache):
+        assert get_tagging_cache() is cache
+
+    assert get_tagging_cache() is previous
+
+    with pytest.raises(TypeError):
+        set_tagging_cache(1000)
+
+
+@pytest.mark.parametrize("audio_tagger", CACHED_TAGGERS)
+def test_cached_create_same_as_uncached(audio_tagger):
+    audio = get_repeating_audio()
+    intervals = [(0.2, 0.7), (1.2, 1.7)]
+    cache = TaggingCache(10 ** 6)
+
+    with tagging_cache(cache):
+        modified_audio = audio_tagger.create(audio, intervals)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert np.all(modified_audio.array == audio_tagger.create(audio, intervals).array)
+
+
+@pytest.mark.parametrize("audio_tagger", CACHED_TAGGERS)
+def test_cached_create_in_place_same_as_uncached(audio_tagger):
+    audio = get_repeating_audio()
+    intervals = [(0.2, 0.7), (1.2, 1.7)]
+    cache = TaggingCache(10 ** 6)
+    out = np.empty(audio.array.shape, dtype=np.float32)
+
+    with tagging_cache(cache):
+        audio_tagger.create(audio, intervals, out=out)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert np.allclose(out, audio_tagger.create(audio, intervals).array, atol=1e-6)
+
+
+def test_cached_create_many_modifies_equal_chunks_once():
+    tagger = ShiftSumTagger(20)
+    batch_sizes = []
+    modify_chunks = tagger._modify_chunks
+
+    def record_modify_chunks(audio_array_chunks, fs):
+        batch_sizes.append(audio_array_chunks.shape[0])
+        return modify_chunks(audio_array_chunks, fs)
+
+    tagger._modify_chunks = record_modify_chunks
+    audio = get_repeating_audio()
+    cache = TaggingCache(10 ** 6)
+
+    with tagging_cache(cache):
+        modified_audios = tagger.create_many([audio, audio], [[(0.2, 0.7), (1.2, 1.7)], [(0.2, 0.7)]])
+        tagger.create_many([audio], [[(0.2, 0.7)]])
+
+    assert batch_sizes == [1]
+    assert cache.hits == 1
+    assert np.all(modified_audios[0].array == tagger.create(audio, [(0.2, 0.7), (1.2, 1.7)]).array)
+
+
+def test_cached_taggers_with_different_parameters_do_not_share_chunks():
+    audio = get_repeating_audio()
+    cache = TaggingCache(10 ** 6)
+
+    with tagging_cache(cache):
+        ShiftSumTagger(20).create(audio, [(0.2, 0.7)])
+        ShiftSumTagger(30).create(audio, [(0.2, 0.7)])
+        ShiftSumTagger(20, legacy_mode=True).create(audio, [(0.2, 0.7)])
+        with spectral_configuration(SpectralConfiguration(pad_to_fast_length=True)):
+            ShiftSumTagger(20).create(audio, [(0.2, 0.7)])
+
+    assert (cache.hits, cache.misses) == (0, 4)
+
+
+def test_envelope_taggers_are_not_cached():
+    cache = TaggingCache(10 ** 6)
+
+    with tagging_cache(cache):
+        AMTagger(42, sine_signal).create(get_repeating_audio(), [(0.2, 0.7), (1.2, 1.7)])
+
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
@@ -0,0 +1,95 @@
+from random import Random
+
+import numpy as np
+
+from auditory_stimulation.audio import Audio, save_audio_as_wav
+from auditory_stimulation.auditory_tagging.assr_tagger import AMTagger, FMTagger
+from auditory_stimulation.auditory_tagging.raw_tagger import RawTagger
+from auditory_stimulation.auditory_tagging.shift_tagger import ShiftSumTagger, BinauralTagger
+from auditory_stimulation.auditory_tagging.tag_generators import sine_signal
+from auditory_stimulation.model.pretagged_bank import build_pretagged_bank, open_pretagged_bank
+from auditory_stimulation.model.stimulus import generate_stimuli
+from auditory_stimulation.model.voice_bank import VoiceBank, pack_voice_folder, open_voice_bank
+from tests.model.stimulus_test import create_voice_folder, create_intro_transcriptions
+
+NUMBER_INTERVAL = (10, 14)
+
+
+class CountingShiftSumTagger(ShiftSumTagger):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.n_modified = 0
+
+    def _modify_chunks(self, audio_array_chunks, fs):
+        self.n_modified += audio_array_chunks.shape[0]
+        return super()._modify_chunks(audio_array_chunks, fs)
+
+
+def test_pretagged_bank_get_equals_tagged_clip(tmp_path):
+    folder = create_voice_folder(tmp_path / "voice", 8000, NUMBER_INTERVAL)
+    rendered = build_pretagged_bank(folder, [FMTagger(40, 100), RawTagger(), AMTagger(42, sine_signal)])
+
+    bank = open_pretagged_bank(folder)
+    clip = VoiceBank(folder).get("12")
+    tagged = bank.get("12", clip, FMTagger(40, 100))
+
+    assert [repr(tagger) for tagger in rendered] == [repr(FMTagger(40, 100))]
+    assert tagged.array.dtype == np.float32
+    assert np.all(tagged.array == FMTagger(40, 100).create(clip, [(0, clip.secs)]).array)
+    assert bank.get("intro-0", VoiceBank(folder).get("intro-0"), FMTagger(40, 100)) is None
+    assert bank.get("12", clip, FMTagger(41, 100)) is None
+    assert bank.get("12", clip, RawTagger()) is None
+
+
+def test_pretagged_bank_changed_clip_is_not_used(tmp_path):
+    folder = create_voice_folder(tmp_path / "voice", 8000, NUMBER_INTERVAL)
+    build_pretagged_bank(folder, [BinauralTagger(40)])
+    save_audio_as_wav(Audio(np.zeros((2000, 2), dtype=np.float32), 8000), folder / "12.wav")
+
+    bank = open_pretagged_bank(folder)
+
+    assert bank.get("12", VoiceBank(folder).get("12"), BinauralTagger(40)) is None
+    assert bank.get("13", VoiceBank(folder).get("13"), BinauralTagger(40)) is not None
+    assert bank.get("12", VoiceBank(folder, 16000).get("12"), BinauralTagger(40)) is None
+
+
+def test_pretagged_bank_packed_voice_folder(tmp_path):
+    folder = create_voice_folder(tmp_path / "voice", 8000, NUMBER_INTERVAL)
+    pack_voice_folder(folder)
+    build_pretagged_bank(folder, [BinauralTagger(40)])
+
+    clip = open_voice_bank(folder, compact=True).get("10")
+
+    assert open_pretagged_bank(folder).get("10", clip, BinauralTagger(40)) is not None
+
+
+def test_open_pretagged_bank_not_built(tmp_path):
+    folder = create_voice_folder(tmp_path / "voice", 8000, NUMBER_INTERVAL)
+
+    assert open_pretagged_bank(folder) is None
+
+
+def test_generate_stimuli_pretagged_same_as_tagged(tmp_path):
+    folders = [create_voice_folder(tmp_path / "voice-a", 8000, NUMBER_INTERVAL),
+               create_voice_folder(tmp_path / "voice-b", 12000, NUMBER_INTERVAL)]
+    # only the first voice is pre-tagged
+    build_pretagged_bank(folders[0], [CountingShiftSumTagger(20)])
+    intro_transcriptions = create_intro_transcriptions(tmp_path)
+
+    def generate(tagger, pretagged_banks):
+        voice_banks = [VoiceBank(folder) for folder in folders]
+        return generate_stimuli(4, [tagger, RawTagger()], 3, 0.1, [0], NUMBER_INTERVAL, intro_transcriptions,
+                                voice_banks, Random(1), pretagged_banks=pretagged_banks)
+
+    tagger = CountingShiftSumTagger(20)
+    expected = generate(tagger, [])
+    n_modified = tagger.n_modified
+
+    tagger = CountingShiftSumTagger(20)
+    stimuli = generate(tagger, [open_pretagged_bank(folders[0])])
+
+    assert 0 < tagger.n_modified < n_modified
+    for stimulus, expected_stimulus in zip(stimuli, expected):
+        assert repr(stimulus.used_tagger) == repr(expected_stimulus.used_tagger)
+        assert stimulus.time_stamps == expected_stimulus.time_stamps
+        assert np.allclose(stimulus.audio.array, expected_stimulus.audio.array, atol=1e-6)
@@ -1,11 +1,17 @@
+from random import Random
+
 import mockito
+import numpy as np
 import pytest
 import yaml
 from mockito import when
 
-from auditory_stimulation.audio import Audio
-from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger
-from auditory_stimulation.model.stimulus import Stimulus, load_stimuli, generate_stimulus, AttentionCheckStimulus
+from auditory_stimulation.audio import Audio, save_audio_as_wav
+from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger, to_sample
+from auditory_stimulation.auditory_tagging.raw_tagger import RawTagger
+from auditory_stimulation.model.stimulus import Stimulus, load_stimuli, generate_stimulus, AttentionCheckStimulus, \
+    generate_stimuli
+from auditory_stimulation.model.voice_bank import VoiceBank
 from tests.auditory_tagging.stimulus_test_helpers import get_mock_audio
 
 
@@ -35,6 +41,23 @@ def get_generate_stimulus_parameters(intro_length: int, option_length: int, fs:
     return intro_audio, intro_text, option_audios, option_texts, target, pause_secs, tagger
 
 
+def create_voice_folder(folder, fs, number_interval):
+    folder.mkdir()
+    rng = np.random.default_rng(fs)
+    names = ["intro-0"] + [str(num) for num in range(number_interval[0], number_interval[1] + 1)]
+    for name in names:
+        samples = rng.random((fs // 4, 2), dtype=np.float32) * 0.5
+        save_audio_as_wav(Audio(samples, fs), folder / f"{name}.wav")
+
+    return folder
+
+
+def create_intro_transcriptions(tmp_path):
+    file = tmp_path / "intro-transcriptions.yaml"
+    create_yaml({"intro-0": ["intro"]}, file)
+    return file
+
+
 def stimulus_checks(stimulus, audio, tagger, prompt, primer, options, time_stamps, target):
     assert stimulus.audio == audio
     assert stimulus.used_tagger == tagger
@@ -352,6 +375,34 @@ def test_generate_stimulus_valid_call(n_options: int):
     assert len(stimulus.options) == len(option_texts)
 
 
+@pytest.mark.parametrize("pause_secs", [0, 0.33, 0.5, 0.123456])
+@pytest.mark.parametrize("option_length", [15, 92, 4410])
+def test_generate_stimulus_time_stamps_match_option_samples(pause_secs, option_length):
+    fs = 44100
+    intro_audio, intro_text, option_audios, option_texts, target, _, tagger = \
+        get_generate_stimulus_parameters(1001, option_length, fs, 5)
+
+    stimulus = generate_stimulus(intro_audio, intro_text, option_audios, option_texts, target, pause_secs, tagger)
+
+    n_break = int(pause_secs * fs)
+    assert stimulus.audio.array.shape[0] == 1001 + 5 * (option_length + n_break)
+    for (start, end), option_audio in zip(stimulus.time_stamps, option_audios):
+        option_samples = stimulus.audio.array[to_sample(start, fs):to_sample(end, fs)]
+        assert np.all(option_samples == option_audio.array)
+
+
+def test_generate_stimulus_compact_audio():
+    intro_audio, intro_text, option_audios, option_texts, target, pause_secs, tagger = \
+        get_generate_stimulus_parameters(100, 20, 10, 2)
+    when(tagger).create(mockito.ANY, mockito.ANY).thenAnswer(
+        lambda audio, interval: Audio(audio.array * 0.5, audio.sampling_frequency))
+
+    stimulus = generate_stimulus(intro_audio, intro_text, option_audios, option_texts, target, pause_secs, tagger,
+                                 compact_audio=True)
+
+    assert stimulus.audio.is_compact
+
+
 @pytest.mark.parametrize("target", [-10, -1, 2, 3, 4])
 def test_generate_stimulus_invalid_target_should_fail(target: int):
     intro_length = 1000
@@ -376,3 +427,48 @@ def test_generate_stimulus_invalid_pause_secs_should_fail(pause_secs: float):
 
     with pytest.raises(ValueError):
         stimulus = generate_stimulus(intro_audio, intro_text, option_audios, option_texts, target, pause_secs, tagger)
+
+
+def test_generate_stimuli_mixed_sampling_frequencies_resampled(tmp_path):
+    number_interval = (10, 19)
+    voice_banks = [VoiceBank(create_voice_folder(tmp_path / "voice-a", 8000, number_interval), 16000),
+                   VoiceBank(create_voice_folder(tmp_path / "voice-b", 12000, number_interval), 16000)]
+    taggers = [RawTagger(), RawTagger()]
+    n_repetitions = 3
+
+    stimuli = generate_stimuli(n_repetitions, taggers, 3, 0.1, [0], number_interval,
+                               create_intro_transcriptions(tmp_path), voice_banks, Random(1))
+
+    assert len(stimuli) == n_repetitions * (len(taggers) + 1)
+    assert all(stimulus.audio.sampling_frequency == 16000 for stimulus in stimuli)
+
+
+class CountingRawTagger(RawTagger):
+    def __init__(self):
+        self.batch_sizes = []
+
+    def create_many(self, audios, intervals_per_audio):
+        self.batch_sizes.append(len(audios))
+        return super().create_many(audios, intervals_per_audio)
+
+
+def test_generate_stimuli_tags_in_bounded_batches(tmp_path, monkeypatch):
+    number_interval = (10, 19)
+    voice_banks = [VoiceBank(create_voice_folder(tmp_path / "voice", 8000, number_interval))]
+    transcriptions = create_intro_transcriptions(tmp_path)
+    n_repetitions = 4
+
+    tagger = CountingRawTagger()
+    one_batch = generate_stimuli(n_repetitions, [tagger], 3, 0.1, [0], number_interval, transcriptions, voice_banks,
+                                 Random(1), compact_audio=True)
+    assert tagger.batch_sizes == [n_repetitions * 2]
+
+    # every block is tagged (and compacted) before the next one is built
+    monkeypatch.setattr("auditory_stimulation.model.stimulus._TAGGING_BATCH_BYTES", 1)
+    tagger = CountingRawTagger()
+    batched = generate_stimuli(n_repetitions, [tagger], 3, 0.1, [0], number_interval, transcriptions, voice_banks,
+                               Random(1), compact_audio=True)
+
+    assert tagger.batch_sizes == [2] * n_repetitions
+    assert [stimulus.audio for stimulus in batched] == [stimulus.audio for stimulus in one_batch]
+    assert all(stimulus.audio.is_compact for stimulus in batched)
@@ -0,0 +1,217 @@
+import numpy as np
+import pytest
+
+from auditory_stimulation.audio import Audio, save_audio_as_wav, load_wav_as_audio, EWavSampleFormat
+from auditory_stimulation.model import voice_bank
+from auditory_stimulation.model.voice_bank import VoiceBank, PackedVoiceBank, pack_voice_folder, open_voice_bank
+
+
+def create_clips(folder, names, fs=8000, n_samples=800):
+    rng = np.random.default_rng(0)
+    for name in names:
+        samples = rng.random((n_samples, 2), dtype=np.float32) * 0.5
+        save_audio_as_wav(Audio(samples, fs), folder / f"{name}.wav")
+
+
+class CountingVoiceBank(VoiceBank):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loaded = []
+
+    def _load_clip(self, name):
+        self.loaded.append(name)
+        return super()._load_clip(name)
+
+
+def test_voice_bank_get_equals_loaded_wav(tmp_path):
+    create_clips(tmp_path, ["intro-0"])
+    bank = VoiceBank(tmp_path)
+
+    assert bank.get("intro-0") == load_wav_as_audio(tmp_path / "intro-0.wav")
+
+
+def test_voice_bank_decodes_each_clip_once(tmp_path):
+    create_clips(tmp_path, ["intro-0", "1", "2"])
+    bank = CountingVoiceBank(tmp_path)
+
+    first = bank.get("intro-0")
+    bank.get("1")
+    second = bank.get("intro-0")
+
+    assert first is second
+    assert bank.loaded == ["intro-0", "1"]
+
+
+def test_voice_bank_clips_are_read_only(tmp_path):
+    create_clips(tmp_path, ["1"])
+    bank = VoiceBank(tmp_path)
+
+    with pytest.raises(ValueError):
+        bank.get("1").array[0, 0] = 0
+
+
+def test_voice_bank_memory_limit_evicts_least_recently_used(tmp_path):
+    create_clips(tmp_path, ["1", "2", "3"])
+    clip_bytes = 800 * 2 * 4
+    bank = CountingVoiceBank(tmp_path, memory_limit=2 * clip_bytes)
+
+    bank.get("1")
+    bank.get("2")
+    bank.get("1")
+    bank.get("3")  # evicts "2", as "1" was used more recently
+    bank.get("1")
+    bank.get("2")
+
+    assert bank.loaded == ["1", "2", "3", "2"]
+    assert bank.used_memory <= 2 * clip_bytes
+
+
+def test_voice_bank_keeps_clip_larger_than_memory_limit(tmp_path):
+    create_clips(tmp_path, ["1"])
+    bank = CountingVoiceBank(tmp_path, memory_limit=10)
+
+    assert bank.get("1") is bank.get("1")
+    assert bank.loaded == ["1"]
+
+
+def test_voice_bank_resamples_and_compacts(tmp_path):
+    create_clips(tmp_path, ["1"], fs=8000, n_samples=800)
+    bank = VoiceBank(tmp_path, sampling_frequency=16000, compact=True)
+
+    audio = bank.get("1")
+
+    assert audio.sampling_frequency == 16000
+    assert audio.array.shape[0] == 1600
+    assert audio.is_compact
+
+
+def test_voice_bank_compact_clips_keep_stored_samples(tmp_path):
+    create_clips(tmp_path, ["1"])
+    bank = VoiceBank(tmp_path, compact=True)
+
+    audio = bank.get("1")
+
+    assert audio.is_compact
+    assert audio == load_wav_as_audio(tmp_path / "1.wav")
+
+
+def test_voice_bank_clear(tmp_path):
+    create_clips(tmp_path, ["1"])
+    bank = CountingVoiceBank(tmp_path)
+
+    bank.get("1")
+    bank.clear()
+    bank.get("1")
+
+    assert bank.loaded == ["1", "1"]
+    assert bank.used_memory == 800 * 2 * 4
+
+
+def test_voice_bank_missing_clip_should_fail(tmp_path):
+    bank = VoiceBank(tmp_path)
+
+    with pytest.raises(FileNotFoundError):
+        bank.get("intro-0")
+
+
+@pytest.mark.parametrize("sampling_frequency, memory_limit", [(0, None), (-1, None), (None, -1)])
+def test_voice_bank_invalid_parameters_should_fail(tmp_path, sampling_frequency, memory_limit):
+    with pytest.raises(ValueError):
+        VoiceBank(tmp_path, sampling_frequency, memory_limit)
+
+
+def test_packed_voice_bank_equals_voice_bank(tmp_path):
+    names = ["intro-0", "1", "22"]
+    create_clips(tmp_path, names)
+    pack_voice_folder(tmp_path)
+
+    bank = VoiceBank(tmp_path)
+    packed_bank = PackedVoiceBank(tmp_path)
+
+    for name in names:
+        assert packed_bank.get(name) == bank.get(name)
+        assert packed_bank.get(name).array.dtype == np.float32
+
+
+def test_packed_voice_bank_compact_clips_are_not_copied(tmp_path):
+    create_clips(tmp_path, ["1", "2"])
+    pack_voice_folder(tmp_path)
+
+    packed_bank = PackedVoiceBank(tmp_path, compact=True)
+    first = packed_bank.get("1")
+    second = packed_bank.get("2")
+
+    assert first.is_compact
+    assert np.shares_memory(first.array.base, second.array.base)
+    assert not first.array.flags.writeable
+
+
+def test_packed_voice_bank_durations(tmp_path):
+    create_clips(tmp_path, ["1"], fs=8000, n_samples=2000)
+    pack_voice_folder(tmp_path)
+
+    assert PackedVoiceBank(tmp_path).durations == {"1": 0.25}
+
+
+def test_packed_voice_bank_resamples(tmp_path):
+    create_clips(tmp_path, ["1"], fs=8000, n_samples=800)
+    pack_voice_folder(tmp_path)
+
+    audio = PackedVoiceBank(tmp_path, sampling_frequency=16000).get("1")
+
+    assert audio.sampling_frequency == 16000
+    assert audio.array.shape[0] == 1600
+
+
+def test_packed_voice_bank_missing_clip_should_fail(tmp_path):
+    create_clips(tmp_path, ["1"])
+    pack_voice_folder(tmp_path)
+
+    with pytest.raises(FileNotFoundError):
+        PackedVoiceBank(tmp_path).get("2")
+
+
+def test_pack_voice_folder_non_pcm16_should_fail(tmp_path):
+    save_audio_as_wav(Audio(np.zeros((10, 2), dtype=np.float32), 8000), tmp_path / "1.wav", EWavSampleFormat.FLOAT32)
+
+    with pytest.raises(ValueError):
+        pack_voice_folder(tmp_path)
+
+
+def test_pack_voice_folder_repack_replaces_archive(tmp_path):
+    create_clips(tmp_path, ["1"], n_samples=800)
+    pack_voice_folder(tmp_path)
+    old_bank = PackedVoiceBank(tmp_path)
+    old_clip = load_wav_as_audio(tmp_path / "1.wav")
+
+    create_clips(tmp_path, ["1", "2"], n_samples=400)
+    pack_voice_folder(tmp_path)
+
+    assert PackedVoiceBank(tmp_path).get("1") == VoiceBank(tmp_path).get("1")
+    assert PackedVoiceBank(tmp_path).names == ["1", "2"]
+    # an archive opened before still serves its own clips
+    assert old_bank.get("1") == old_clip
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_pack_voice_folder_interrupted_repack_keeps_archive(tmp_path, monkeypatch):
+    create_clips(tmp_path, ["1", "2"])
+    pack_voice_folder(tmp_path)
+    expected = PackedVoiceBank(tmp_path).get("2")
+
+    def failing_load(wav_path, compact):
+        raise RuntimeError()
+
+    monkeypatch.setattr(voice_bank, "load_wav_as_audio_memmap", failing_load)
+    with pytest.raises(RuntimeError):
+        pack_voice_folder(tmp_path)
+
+    assert PackedVoiceBank(tmp_path).get("2") == expected
+
+
+def test_open_voice_bank_uses_archive_if_packed(tmp_path):
+    create_clips(tmp_path, ["1"])
+    assert type(open_voice_bank(tmp_path)) is VoiceBank
+
+    pack_voice_folder(tmp_path)
+    assert type(open_voice_bank(tmp_path)) is PackedVoiceBank
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from auditory_stimulation.audio import Audio
+from auditory_stimulation.resampling import resample_audio, _polyphase_filter
+
+
+def get_sine_audio(frequency: int, fs: int, secs: float) -> Audio:
+    signal = np.sin(2 * np.pi * frequency / fs * np.arange(int(fs * secs))) * 0.5
+    return Audio(np.array([signal, signal], dtype=np.float32).T, fs)
+
+
+def get_peak_frequency(audio: Audio) -> float:
+    spectrum = np.abs(np.fft.rfft(audio.array[:, 0]))
+    return np.argmax(spectrum) * audio.sampling_frequency / audio.array.shape[0]
+
+
+@pytest.mark.parametrize("source_fs, target_fs", [(44100, 48000), (48000, 44100), (8000, 16000), (16000, 8000)])
+def test_resample_audio_keeps_frequency(source_fs, target_fs):
+    audio = get_sine_audio(440, source_fs, 1)
+
+    resampled = resample_audio(audio, target_fs)
+
+    assert resampled.sampling_frequency == target_fs
+    assert resampled.array.shape[0] == target_fs
+    assert resampled.array.shape[1] == audio.array.shape[1]
+    assert resampled.array.dtype == np.float32
+    assert get_peak_frequency(resampled) == pytest.approx(440, abs=1)
+
+
+def test_resample_audio_same_sampling_frequency_returns_audio():
+    audio = get_sine_audio(440, 8000, 0.1)
+
+    assert resample_audio(audio, 8000) is audio
+
+
+@pytest.mark.parametrize("target_fs", [0, -1])
+def test_resample_audio_invalid_target_should_fail(target_fs):
+    with pytest.raises(ValueError):
+        resample_audio(get_sine_audio(440, 8000, 0.1), target_fs)
+
+
+def test_polyphase_filter_is_designed_once():
+    assert _polyphase_filter(160, 147) is _polyphase_filter(160, 147)
+
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from auditory_stimulation import validation
+from auditory_stimulation.audio import Audio, trusted_audio
+from auditory_stimulation.auditory_tagging.assr_tagger import AMTagger, FMTagger
+from auditory_stimulation.auditory_tagging.auditory_tagger import AAudioTagger
+from auditory_stimulation.auditory_tagging.tag_generators import sine_signal
+from auditory_stimulation.auditory_tagging.tagger_chain import TaggerChain
+from auditory_stimulation.validation import EValidationLevel, get_validation_level, is_in_range, validation_level
+
+CHECKING_LEVELS = [EValidationLevel.STRICT, EValidationLevel.SINGLE_PASS]
+
+
+@pytest.mark.parametrize("level", CHECKING_LEVELS)
+@pytest.mark.parametrize("shape", [(10,), (100, 2), (200000, 2)])
+def test_is_in_range_valid_array(level, shape):
+    array = np.ones(shape, dtype=np.float32) * 0.5
+    array[-1] = -1
+
+    with validation_level(level):
+        assert is_in_range(array)
+
+
+@pytest.mark.parametrize("level", CHECKING_LEVELS)
+@pytest.mark.parametrize("value", [1.01, -1.01, 2, -2])
+def test_is_in_range_value_out_of_range(level, value):
+    array = np.zeros((200000, 2), dtype=np.float32)
+    array[150000, 1] = value
+
+    with validation_level(level):
+        assert not is_in_range(array)
+
+
+def test_is_in_range_trusted_skips_check():
+    array = np.ones((100, 2), dtype=np.float32) * 2
+
+    with validation_level(EValidationLevel.TRUSTED):
+        assert is_in_range(array)
+
+
+def test_audio_trusted_out_of_range_does_not_fail():
+    array = np.ones((100, 2), dtype=np.float32) * 2
+
+    with validation_level(EValidationLevel.TRUSTED):
+        Audio(array, 10)
+
+    with pytest.raises(ValueError):
+        Audio(array, 10)
+
+
+def test_validation_level_context_restores_previous_level():
+    previous = get_validation_level()
+
+    with pytest.raises(RuntimeError):
+        with validation_level(EValidationLevel.TRUSTED):
+            assert get_validation_level() == EValidationLevel.TRUSTED
+            raise RuntimeError()
+
+    assert get_validation_level() == previous
+
+
+def test_trusted_audio_skips_only_range_check():
+    array = np.ones((100, 2), dtype=np.float32) * 2
+
+    assert trusted_audio(array, 10).array is array
+    assert get_validation_level() == EValidationLevel.STRICT
+
+    with pytest.raises(ValueError):
+        trusted_audio(array[:, 0], 10)
+
+
+def test_trusted_audio_does_not_change_validation_level(monkeypatch):
+    def failing_set_validation_level(level):
+        raise AssertionError("trusted_audio must not change the process-wide validation level")
+
+    monkeypatch.setattr(validation, "set_validation_level", failing_set_validation_level)
+    array = np.ones((100, 2), dtype=np.float32) * 2
+
+    audio = trusted_audio(array, 10)
+
+    assert audio.array is array
+    assert audio.sampling_frequency == 10
+    with pytest.raises(ValueError):
+        Audio(array, 10)
+
+
+def test_tagger_chain_create_validates_input_once(monkeypatch):
+    calls = []
+    validate_input = AAudioTagger._validate_input
+
+    def counting_validate_input(audio, stimuli_intervals):
+        calls.append(1)
+        validate_input(audio, stimuli_intervals)
+
+    monkeypatch.setattr(AAudioTagger, "_validate_input", staticmethod(counting_validate_input))
+    audio = Audio(np.zeros((1000, 1), dtype=np.float32), 1000)
+
+    TaggerChain([AMTagger(40, sine_signal), FMTagger(40, 100)]).create(audio, [(0.1, 0.5)])
+
+    assert len(calls) == 1